@@ -1,17 +1,19 @@
 import streamlit as st
-import pandas as pd
-import re
-import io
-import openpyxl
-from copy import copy
-from datetime import datetime
-from pathlib import Path
-from zoneinfo import ZoneInfo
-
-try:
-    import xlwt
-except ImportError:
-    xlwt = None
+
+from delivery_helper.cache import cache_key
+from delivery_helper.config import (
+    JOB_POLL_SECONDS,
+    NAVER_DELIVERY_TEMPLATE_NAME,
+    NAVER_DELIVERY_XLS_MIME,
+    PRODUCT_SUMMARY_ORDER,
+    XLSX_MIME,
+)
+from delivery_helper.invoices import InvoiceStore
+from delivery_helper.jobs import job_runner
+from delivery_helper.order_store import OrderStore
+from delivery_helper.pipeline import build_order_file, build_order_management, now_kst, output_filenames
+from delivery_helper.sales import PasteAggregator
+from delivery_helper.timing import StageTimer, stage_summary, total_seconds
 
 # 페이지 설정
 st.set_page_config(
@@ -20,663 +22,6 @@ st.set_page_config(
     layout="wide"
 )
 
-# ==========================================
-# 설정 및 함수들
-# ==========================================
-MARKET_CONFIG = {
-    'naver': {'key': '스마트스토어', 'skip': 1, 'order': 1},
-    'coupang': {'key': 'DeliveryList', 'skip': 0, 'order': 2},
-    'own': {'key': 'orders', 'skip': 0, 'order': 3},
-    'esm': {'key': '신규주문', 'skip': 0, 'order': 4},
-    '11st': {'key': 'allList', 'skip': 2, 'order': 5},
-    '11st_manual': {'key': '11번가', 'skip': 0, 'order': 5},
-    'wadiz': {'key': '발송 처리용 주문', 'skip': 0, 'order': 6}
-}
-
-NAVER_DELIVERY_TEMPLATE_NAME = "excelUploadSample.xls"
-NAVER_DELIVERY_COLUMNS = ['상품주문번호', '배송방법', '택배사', '송장번호']
-NAVER_DELIVERY_COLUMN_ALIASES = {
-    '상품주문번호': ['상품주문번호'],
-    '배송방법': ['배송방법', '배송 방법'],
-    '택배사': ['택배사', '택배사명'],
-    '송장번호': ['송장번호', '운송장번호']
-}
-NAVER_DELIVERY_METHOD = "택배,등기,소포"
-NAVER_DELIVERY_COMPANY = "CJ대한통운"
-NAVER_DELIVERY_XLS_MIME = "application/vnd.ms-excel"
-NAVER_DELIVERY_XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-
-def find_naver_delivery_template():
-    for path in (
-        Path("sample_data") / NAVER_DELIVERY_TEMPLATE_NAME,
-        Path(NAVER_DELIVERY_TEMPLATE_NAME),
-    ):
-        if path.exists():
-            return path
-    return None
-
-def clean_phone(phone):
-    if pd.isna(phone): return ""
-    return re.sub(r'[^0-9]', '', str(phone))
-
-def normalize_excel_id(value):
-    if pd.isna(value):
-        return ""
-    if isinstance(value, float) and value.is_integer():
-        return str(int(value))
-    text = str(value).strip()
-    if re.fullmatch(r'\d+\.0', text):
-        return text[:-2]
-    return text
-
-def identify_product(name):
-    name_str = str(name)
-    name_upper = name_str.upper()
-    name_lower = name_str.lower()
-    
-    # 리퍼 제품 여부 확인 (_Re 표기 또는 한글 '리퍼'/'리퍼제품')
-    is_refurb = '_RE' in name_upper or '리퍼' in name_str
-
-    # IH, OH, PH, SH 코드 우선 확인 (리퍼면 _Re 접미사 부착)
-    for code in ('IH', 'OH', 'PH', 'SH'):
-        if code in name_upper:
-            return f"{code}_Re" if is_refurb else code
-    
-    # 기타 제품 매핑
-    if '케이블s' in name_lower:
-        return '케이블s'
-    if '케이블' in name_str:
-        if '스위치' in name_str:
-            return '케이블s'
-        else:
-            return '케이블(일반)'
-    if '거치대' in name_str or '휴대폰' in name_str:
-        return '휴대폰거치대'
-    if '번호판' in name_str or '차량번호' in name_str:
-        return '차량번호판'
-    if '망치' in name_str or '차량용망치' in name_str:
-        return '차량용망치'
-    if '도막' in name_str or '측정기' in name_str:
-        return '도막측정기'
-
-    return name
-
-# 판매자/업체 상품코드(예: 'PH', 'SH_Re')를 표준 품목명으로 정규화
-# 네이버 '판매자 상품코드', 쿠팡 '업체상품코드'처럼 코드가 명시된 컬럼을 우선 신뢰한다.
-_CODE_RE = re.compile(r'^(IH|OH|PH|SH)(?:[ _\-]?(RE))?$')
-def code_to_item(raw):
-    if raw is None or (isinstance(raw, float) and pd.isna(raw)):
-        return None
-    s = str(raw).strip()
-    if not s:
-        return None
-    m = _CODE_RE.match(s.upper())
-    if not m:
-        return None
-    return f"{m.group(1)}_Re" if m.group(2) else m.group(1)
-
-def get_message(row, cols):
-    for col in cols:
-        if col in row and pd.notna(row[col]) and str(row[col]).strip() != "":
-            return str(row[col]).strip()
-    return ""
-
-def pick_first_col(columns, candidates):
-    for col in candidates:
-        if col in columns:
-            return col
-    return None
-
-def format_date(value):
-    if pd.isna(value):
-        return ""
-    try:
-        return pd.to_datetime(value).strftime('%Y.%m.%d')
-    except Exception:
-        return str(value)
-
-def detect_market_by_columns(df):
-    cols = set(df.columns.astype(str))
-
-    # 와디즈 감지 (고유 컬럼)
-    required_wadiz = {'주문 번호', '주문 상품', '주문 수량', '받는 분'}
-    if required_wadiz.issubset(cols):
-        return 'wadiz'
-
-    required_11st = {'주문번호', '주소', '상품명', '수량'}
-    name_cols_11st = {'수취인', '받는분'}
-    phone_cols_11st = {'휴대폰번호', '수취인연락처'}
-    if required_11st.issubset(cols) and cols.intersection(name_cols_11st) and cols.intersection(phone_cols_11st):
-        return '11st_manual'
-
-    return None
-
-def sort_xlsx_preserving_format(file_content, target_col_name):
-    """원본 서식을 유지하며 업체상품코드 기준으로 정렬"""
-    try:
-        wb = openpyxl.load_workbook(io.BytesIO(file_content))
-        ws = wb.active
-        header = [cell.value for cell in ws[1]]
-        
-        try:
-            col_idx = header.index(target_col_name)
-        except:
-            return None
-
-        rows = list(ws.iter_rows(min_row=2, values_only=False))
-        rows.sort(key=lambda x: str(x[col_idx].value) if x[col_idx].value is not None else "")
-
-        data_styles = []
-        for row in rows:
-            data_styles.append([(cell.value, cell._style) for cell in row])
-
-        ws.delete_rows(2, ws.max_row)
-        for r_idx, row_data in enumerate(data_styles, start=2):
-            for c_idx, (val, style) in enumerate(row_data, start=1):
-                cell = ws.cell(row=r_idx, column=c_idx, value=val)
-                if style:
-                    cell._style = style
-        
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        return output.getvalue()
-    except Exception as e:
-        return None
-
-def _set_text_format_for_columns(ws, header, target_cols=None, keyword_cols=None):
-    target_cols = target_cols or []
-    keyword_cols = keyword_cols or []
-    col_indexes = set()
-
-    for col_name in target_cols:
-        if col_name in header:
-            col_indexes.add(header.index(col_name) + 1)
-
-    for idx, name in enumerate(header, start=1):
-        name_str = str(name) if name is not None else ""
-        if any(keyword in name_str for keyword in keyword_cols):
-            col_indexes.add(idx)
-
-    if not col_indexes:
-        return
-
-    for col_idx in col_indexes:
-        for row_idx in range(2, ws.max_row + 1):
-            cell = ws.cell(row=row_idx, column=col_idx)
-            if cell.value is not None:
-                cell.value = str(cell.value)
-            cell.number_format = '@'
-
-def apply_text_format_to_excel_bytes(file_bytes, target_cols=None, keyword_cols=None):
-    try:
-        wb = openpyxl.load_workbook(io.BytesIO(file_bytes))
-        ws = wb.active
-        header = [cell.value for cell in ws[1]]
-        _set_text_format_for_columns(ws, header, target_cols=target_cols, keyword_cols=keyword_cols)
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        return output.getvalue()
-    except Exception:
-        return file_bytes
-
-def _read_tabular_file(file_content, file_name, skiprows=0):
-    name = file_name.lower()
-    if name.endswith('.csv'):
-        return pd.read_csv(io.BytesIO(file_content), skiprows=skiprows)
-    return pd.read_excel(io.BytesIO(file_content), skiprows=skiprows)
-
-def _read_naver_order_df(file_content, file_name):
-    for skiprows in (MARKET_CONFIG['naver']['skip'], 0):
-        try:
-            df = _read_tabular_file(file_content, file_name, skiprows=skiprows)
-            df.columns = df.columns.astype(str).str.strip()
-            if '상품주문번호' in df.columns:
-                return df
-        except Exception:
-            continue
-    return None
-
-def _find_header_row(ws, required_header):
-    for row_idx in range(1, min(ws.max_row, 20) + 1):
-        values = [cell.value for cell in ws[row_idx]]
-        if required_header in values:
-            return row_idx, values
-    return 1, [cell.value for cell in ws[1]]
-
-def _ensure_columns(ws, header_row_idx, header, columns):
-    header = list(header)
-    for col_name in columns:
-        if col_name not in header:
-            header.append(col_name)
-            ws.cell(row=header_row_idx, column=len(header), value=col_name)
-    return header
-
-def _find_naver_delivery_header(header, canonical_name):
-    for alias in NAVER_DELIVERY_COLUMN_ALIASES[canonical_name]:
-        if alias in header:
-            return alias
-    return None
-
-def _ensure_naver_delivery_columns(ws, header_row_idx, header):
-    header = list(header)
-    for col_name in NAVER_DELIVERY_COLUMNS:
-        if _find_naver_delivery_header(header, col_name) is None:
-            header.append(col_name)
-            ws.cell(row=header_row_idx, column=len(header), value=col_name)
-    return header
-
-def _read_template_header(template_content, template_name):
-    if not template_content or not template_name:
-        return None
-    try:
-        preview = pd.read_excel(io.BytesIO(template_content), header=None, nrows=20)
-        for _, row in preview.iterrows():
-            values = [str(value).strip() if pd.notna(value) else None for value in row.tolist()]
-            if '상품주문번호' in values:
-                while values and values[-1] is None:
-                    values.pop()
-                return values
-    except Exception:
-        return None
-    return None
-
-def _write_naver_delivery_xlsx(rows, template_content=None, template_name=None):
-    template_is_xlsx = template_content and template_name and template_name.lower().endswith('.xlsx')
-
-    if template_is_xlsx:
-        wb = openpyxl.load_workbook(io.BytesIO(template_content))
-        ws = wb.active
-        header_row_idx, header = _find_header_row(ws, '상품주문번호')
-        header = _ensure_naver_delivery_columns(ws, header_row_idx, header)
-    else:
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        header_row_idx = 1
-        header = _read_template_header(template_content, template_name) or list(NAVER_DELIVERY_COLUMNS)
-        header = _ensure_naver_delivery_columns(ws, header_row_idx, header)
-        for col_idx, col_name in enumerate(header, start=1):
-            ws.cell(row=header_row_idx, column=col_idx, value=col_name)
-
-    style_row_idx = header_row_idx + 1 if ws.max_row > header_row_idx else None
-    style_by_col = {}
-    if style_row_idx:
-        for col_idx in range(1, len(header) + 1):
-            style_by_col[col_idx] = copy(ws.cell(row=style_row_idx, column=col_idx)._style)
-
-    if ws.max_row > header_row_idx:
-        ws.delete_rows(header_row_idx + 1, ws.max_row - header_row_idx)
-
-    column_indexes = {
-        col_name: header.index(_find_naver_delivery_header(header, col_name)) + 1
-        for col_name in NAVER_DELIVERY_COLUMNS
-    }
-    for row_offset, row_data in enumerate(rows, start=1):
-        row_idx = header_row_idx + row_offset
-        for col_name in NAVER_DELIVERY_COLUMNS:
-            col_idx = column_indexes[col_name]
-            cell = ws.cell(row=row_idx, column=col_idx, value=row_data[col_name])
-            if col_idx in style_by_col:
-                cell._style = copy(style_by_col[col_idx])
-            if col_name in ('상품주문번호', '송장번호'):
-                cell.number_format = '@'
-
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-    return output.getvalue()
-
-def _write_naver_delivery_xls(rows):
-    if xlwt is None:
-        return None
-
-    wb = xlwt.Workbook(encoding='utf-8')
-    ws = wb.add_sheet('발송처리')
-    text_style = xlwt.easyxf(num_format_str='@')
-
-    for col_idx, col_name in enumerate(NAVER_DELIVERY_COLUMNS):
-        ws.write(0, col_idx, col_name)
-
-    for row_idx, row_data in enumerate(rows, start=1):
-        for col_idx, col_name in enumerate(NAVER_DELIVERY_COLUMNS):
-            value = row_data.get(col_name, "")
-            ws.write(row_idx, col_idx, str(value), text_style)
-
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-    return output.getvalue()
-
-def create_naver_delivery_file(file_content, file_name, invoice_map, template_content=None, template_name=None):
-    df = _read_naver_order_df(file_content, file_name)
-    if df is None or df.empty:
-        return None
-
-    product_order_col = '상품주문번호'
-    order_col = pick_first_col(df.columns, ['주문번호', '고객주문번호'])
-
-    rows = []
-    for _, row in df.iterrows():
-        product_order_no = normalize_excel_id(row.get(product_order_col))
-        if not product_order_no or product_order_no.lower() == 'nan':
-            continue
-
-        order_no = normalize_excel_id(row.get(order_col)) if order_col else ""
-        invoice = invoice_map.get(product_order_no) or invoice_map.get(order_no, "")
-        rows.append({
-            '상품주문번호': product_order_no,
-            '배송방법': NAVER_DELIVERY_METHOD,
-            '택배사': NAVER_DELIVERY_COMPANY,
-            '송장번호': invoice
-        })
-
-    if not rows:
-        return None
-
-    xls_output = _write_naver_delivery_xls(rows)
-    if xls_output:
-        return {
-            'data': xls_output,
-            'extension': 'xls',
-            'mime': NAVER_DELIVERY_XLS_MIME
-        }
-
-    xlsx_output = _write_naver_delivery_xlsx(
-        rows,
-        template_content=template_content,
-        template_name=template_name
-    )
-    return {
-        'data': xlsx_output,
-        'extension': 'xlsx',
-        'mime': NAVER_DELIVERY_XLSX_MIME
-    }
-
-def add_invoice_to_coupang(file_content, file_name, invoice_map):
-    """쿠팡 파일에 운송장번호 추가 (서식 유지)"""
-    try:
-        wb = openpyxl.load_workbook(io.BytesIO(file_content))
-        ws = wb.active
-        header = [cell.value for cell in ws[1]]
-        
-        # 주문번호와 운송장번호 컬럼 찾기
-        try:
-            order_col_idx = header.index('주문번호') + 1
-        except:
-            return None
-        
-        # 운송장번호 컬럼이 있는지 확인
-        if '운송장번호' in header:
-            invoice_col_idx = header.index('운송장번호') + 1
-        else:
-            # 없으면 맨 끝에 추가
-            invoice_col_idx = len(header) + 1
-            ws.cell(row=1, column=invoice_col_idx, value='운송장번호')
-        
-        # 데이터 행에 운송장번호 추가
-        for row_idx in range(2, ws.max_row + 1):
-            order_no = normalize_excel_id(ws.cell(row=row_idx, column=order_col_idx).value)
-            invoice = invoice_map.get(order_no, '')
-            
-            cell = ws.cell(row=row_idx, column=invoice_col_idx)
-            cell.value = invoice
-            # 숫자를 텍스트로 저장하여 E 표기 방지
-            if invoice:
-                cell.number_format = '@'  # 텍스트 형식
-
-        _set_text_format_for_columns(
-            ws,
-            header,
-            keyword_cols=['전화', '연락처', '휴대폰']
-        )
-        
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        return output.getvalue()
-    except Exception as e:
-        st.warning(f"쿠팡 정렬 중 오류: {e}")
-        return None
-
-def _split_paste_line(line):
-    if '\t' in line:
-        return [c.strip() for c in line.split('\t')]
-    if ',' in line:
-        return [c.strip() for c in line.split(',')]
-    return [line.strip()]
-
-def parse_pasted_sales(text, normalize=True):
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
-    if not lines:
-        return pd.DataFrame(columns=['상품명', '수량']), 0
-
-    name_idx = None
-    qty_idx = None
-    start_idx = 0
-
-    header_cols = _split_paste_line(lines[0])
-    for idx, col in enumerate(header_cols):
-        col_str = str(col)
-        if any(k in col_str for k in ['상품', '품목']):
-            name_idx = idx
-        if '수량' in col_str:
-            qty_idx = idx
-    if name_idx is not None and qty_idx is not None:
-        start_idx = 1
-
-    parsed = []
-    for line in lines[start_idx:]:
-        cols = _split_paste_line(line)
-
-        name = ""
-        qty_str = ""
-
-        if name_idx is not None and qty_idx is not None and len(cols) > max(name_idx, qty_idx):
-            name = cols[name_idx]
-            qty_str = cols[qty_idx]
-        elif len(cols) >= 2:
-            name = cols[0]
-            for c in cols[1:]:
-                if re.search(r'\d', c):
-                    qty_str = c
-                    break
-        else:
-            match = re.search(r'(\d+)\s*$', line)
-            if match:
-                qty_str = match.group(1)
-                name = line[:match.start()].strip()
-
-        if not name:
-            continue
-
-        qty_val = int(re.sub(r'[^0-9]', '', str(qty_str)) or 0)
-        if qty_val <= 0:
-            continue
-
-        raw_name = str(name).strip()
-        name_parts = [n.strip() for n in raw_name.split(',') if n.strip()]
-        if not name_parts:
-            continue
-
-        if len(name_parts) == 1:
-            final_name = identify_product(name_parts[0]) if normalize else name_parts[0]
-            parsed.append({'상품명': final_name, '수량': qty_val})
-        else:
-            # Split total quantity across items (e.g., 4 items with qty 4 -> 1 each)
-            base_qty = qty_val // len(name_parts)
-            remainder = qty_val % len(name_parts)
-            for idx, part in enumerate(name_parts):
-                part_qty = base_qty + (1 if idx < remainder else 0)
-                if part_qty <= 0:
-                    continue
-                final_name = identify_product(part) if normalize else part
-                parsed.append({'상품명': final_name, '수량': part_qty})
-
-    if not parsed:
-        return pd.DataFrame(columns=['상품명', '수량']), 0
-
-    df = pd.DataFrame(parsed)
-    summary = df.groupby('상품명')['수량'].sum().reset_index()
-    total_qty = int(summary['수량'].sum())
-    return summary, total_qty
-
-def process_data(file_name, content):
-    market_key = 'unknown'
-    config = {}
-    for k, v in MARKET_CONFIG.items():
-        if v['key'] in file_name:
-            market_key = k
-            config = v
-            break
-
-    if market_key == 'unknown':
-        # 파일명으로 매칭되지 않는 경우 컬럼 기반 탐지 시도 (11번가 주문시트 등)
-        try:
-            df_probe = pd.read_csv(io.BytesIO(content)) if file_name.endswith('.csv') \
-                else pd.read_excel(io.BytesIO(content))
-            detected = detect_market_by_columns(df_probe)
-            if detected:
-                market_key = detected
-                config = MARKET_CONFIG[detected]
-            else:
-                # 11번가 주문시트가 상단에 안내 행이 있는 경우를 위한 추가 시도
-                df_probe = pd.read_csv(io.BytesIO(content), skiprows=2) if file_name.endswith('.csv') \
-                    else pd.read_excel(io.BytesIO(content), skiprows=2)
-                detected = detect_market_by_columns(df_probe)
-                if detected:
-                    market_key = detected
-                    config = dict(MARKET_CONFIG[detected])
-                    config['skip'] = 2
-        except Exception:
-            pass
-
-    if market_key == 'unknown':
-        return pd.DataFrame()
-
-    try:
-        df = pd.read_csv(io.BytesIO(content), skiprows=config.get('skip', 0)) if file_name.endswith('.csv') \
-             else pd.read_excel(io.BytesIO(content), skiprows=config.get('skip', 0))
-
-        # 11번가 주문시트는 파일명 매칭이 되더라도 헤더 위치가 다를 수 있어 재시도
-        if market_key in ['11st', '11st_manual']:
-            required_11st = {'주문번호', '주소', '상품명', '수량'}
-            if not required_11st.issubset(set(df.columns.astype(str))):
-                df_retry = pd.read_csv(io.BytesIO(content), skiprows=2) if file_name.endswith('.csv') \
-                    else pd.read_excel(io.BytesIO(content), skiprows=2)
-                if required_11st.issubset(set(df_retry.columns.astype(str))):
-                    df = df_retry
-
-        if market_key == 'naver':
-            df['final_msg'] = df.apply(lambda r: get_message(r, ['배송메세지', '비고']), axis=1)
-            mapped = pd.DataFrame({
-                '고객주문번호': df['주문번호'].astype(str),
-                '받는분성명': df['수취인명'],
-                '받는분전화번호': df['수취인연락처1'].apply(clean_phone),
-                '받는분주소': df['통합배송지'],
-                '배송메세지': df['final_msg'],
-                '품목': df.apply(lambda r: code_to_item(r.get('판매자 상품코드')) or identify_product(r.get('상품명', '')), axis=1),
-                '수량': df['수량'],
-                '내부정렬키': df['상품명'].astype(str)
-            })
-        elif market_key == 'coupang':
-            df['final_msg'] = df.apply(lambda r: get_message(r, ['배송메세지', '비고']), axis=1)
-            mapped = pd.DataFrame({
-                '고객주문번호': df['주문번호'].astype(str),
-                '받는분성명': df['수취인이름'],
-                '받는분전화번호': df['수취인전화번호'].apply(clean_phone),
-                '받는분주소': df['수취인 주소'],
-                '배송메세지': df['final_msg'],
-                '품목': df.apply(lambda r: code_to_item(r.get('업체상품코드')) or identify_product(r.get('등록상품명', '')), axis=1),
-                '수량': df['구매수(수량)'],
-                '내부정렬키': df['업체상품코드'].astype(str)
-            })
-        elif market_key == 'esm':
-            df['final_msg'] = df.apply(lambda r: get_message(r, ['배송시 요구사항', '배송메세지', '비고']), axis=1)
-            mapped = pd.DataFrame({
-                '고객주문번호': df['주문번호'].astype(str),
-                '받는분성명': df['수령인명'],
-                '받는분전화번호': df['수령인 휴대폰'].apply(clean_phone),
-                '받는분주소': df['주소'],
-                '배송메세지': df['final_msg'],
-                '품목': df['상품명'].apply(identify_product),
-                '수량': df['수량'],
-                '내부정렬키': df['상품명'].astype(str)
-            })
-        elif market_key in ['11st', '11st_manual']:
-            name_col = '수취인' if '수취인' in df.columns else '받는분'
-            phone_col = '휴대폰번호' if '휴대폰번호' in df.columns else (
-                '수취인연락처' if '수취인연락처' in df.columns else '전화번호'
-            )
-            df['final_msg'] = df.apply(lambda r: get_message(r, ['배송메시지', '배송메세지', '비고']), axis=1)
-            mapped = pd.DataFrame({
-                '고객주문번호': df['주문번호'].astype(str),
-                '받는분성명': df[name_col],
-                '받는분전화번호': df[phone_col].apply(clean_phone),
-                '받는분주소': df['주소'],
-                '배송메세지': df['final_msg'],
-                '품목': df['상품명'].apply(identify_product),
-                '수량': df['수량'],
-                '내부정렬키': df['상품명'].astype(str)
-            })
-        elif market_key == 'wadiz':
-            df['final_msg'] = df.apply(lambda r: get_message(r, ['배송 요청 사항', '주문 요청 사항']), axis=1)
-            mapped = pd.DataFrame({
-                '고객주문번호': df['주문 번호'].astype(str),
-                '받는분성명': df['받는 분'],
-                '받는분전화번호': df['받는 분 연락처'].apply(clean_phone),
-                '받는분주소': df['배송지 주소'],
-                '배송메세지': df['final_msg'],
-                '품목': df['주문 상품'].apply(identify_product),
-                '수량': df['주문 수량'],
-                '내부정렬키': df['주문 상품'].astype(str)
-            })
-        elif market_key == 'own':
-            df['final_msg'] = df.apply(lambda r: get_message(r, ['비고', '배송메세지']), axis=1)
-            mapped = pd.DataFrame({
-                '고객주문번호': df['주문번호'].astype(str),
-                '받는분성명': df['수령인'],
-                '받는분전화번호': df['핸드폰'].apply(clean_phone),
-                '받는분주소': df['주소'],
-                '배송메세지': df['final_msg'],
-                '품목': df['주문상품명'].apply(identify_product),
-                '수량': df['수량'],
-                '내부정렬키': df['주문상품명'].astype(str)
-            })
-        else:
-            return pd.DataFrame()
-
-        mapped['마켓순서'] = config['order']
-        return mapped
-    except Exception as e:
-        st.error(f"❌ {file_name} 처리 실패: {e}")
-        return pd.DataFrame()
-
-def consolidate(group):
-    prod_counts = group.groupby('품목')['수량'].sum().reset_index()
-    def sort_key(item):
-        order = {'IH_RE': 0, 'OH': 1, 'OH_RE': 2, 'PH': 3, 'PH_RE': 4, 'SH': 5, 'SH_RE': 6}
-        return (order.get(str(item).upper(), 7), str(item))
-
-    formatted = [f"{row['품목']} {int(row['수량'])}개" if row['수량'] > 1 else str(row['품목']) 
-                 for _, row in prod_counts.iterrows()]
-    formatted.sort(key=lambda x: sort_key(x.split(' ')[0]))
-
-    non_empty_msgs = group['배송메세지'][group['배송메세지'] != ""].unique()
-    final_msg = non_empty_msgs[0] if len(non_empty_msgs) > 0 else ""
-
-    return {
-        '고객주문번호': group.iloc[0]['고객주문번호'],
-        '받는분성명': group.iloc[0]['받는분성명'],
-        '받는분전화번호': group.iloc[0]['받는분전화번호'],
-        '받는분주소': group.iloc[0]['받는분주소'],
-        '배송메세지': final_msg,
-        '품목명': ", ".join(formatted),
-        '기타1': group['수량'].sum(),
-        '마켓순서': group.iloc[0]['마켓순서'],
-        '최종정렬키': group['내부정렬키'].min()
-    }
-
 # ==========================================
 # Streamlit UI
 # ==========================================
@@ -708,6 +53,23 @@ if 'naver_delivery_info' not in st.session_state:
     st.session_state.naver_delivery_info = None
 if 'uploaded_market_files' not in st.session_state:
     st.session_state.uploaded_market_files = None
+if 'order_table' not in st.session_state:
+    st.session_state.order_table = None
+if 'upload_key' not in st.session_state:
+    # 업로드 파일 목록 [(파일명, 파일 id, 크기)] (바뀌었는지 비교용)
+    st.session_state.upload_key = None
+if 'order_timings' not in st.session_state:
+    st.session_state.order_timings = None
+if 'order_mgmt_timings' not in st.session_state:
+    st.session_state.order_mgmt_timings = None
+if 'pending_batch' not in st.session_state:
+    # 발주 확정 전인 새 주문 라인 (OrderStore.pending_batch 결과)
+    st.session_state.pending_batch = None
+if 'confirmed_batch_id' not in st.session_state:
+    st.session_state.confirmed_batch_id = None
+if 'jobs' not in st.session_state:
+    # 세션별 작업 목록 {'order' / 'order_mgmt': 작업 id}
+    st.session_state.jobs = {}
 
 # 사용법 안내
 with st.expander("📖 사용법", expanded=False):
@@ -723,6 +85,8 @@ with st.expander("📖 사용법", expanded=False):
     3. 생성된 파일을 다운로드하세요 (여러 번 가능)
        - `MMDD_HH.xlsx`: CJ택배 업로드용 통합 발주 파일
        - `MMDD_HH_쿠팡_원본정렬.xlsx`: 쿠팡 파일 정렬본 (쿠팡 파일이 있는 경우)
+       - "이미 발주한 주문 제외"를 켰다면 파일을 받은 뒤 **발주 확정**을 눌러야 발주 기록에 남습니다
+         (잘못 확정했다면 "오늘 발주 기록"에서 취소)
     4. 새로운 파일을 처리하려면 **초기화** 버튼을 누르고 다시 시작하세요
     
     ---
@@ -782,6 +146,46 @@ with st.expander("📖 사용법", expanded=False):
     - 정렬 순서: 네이버→쿠팡→자사몰→ESM→11번가→와디즈 / IH_Re→OH→OH_Re→PH→PH_Re→SH→SH_Re→기타
     """)
 
+def session_job(kind):
+    """이 세션에서 제출한 작업 (없으면 None, 작업 목록에서 밀려난 작업은 세션에서도 지움)"""
+    job_id = st.session_state.jobs.get(kind)
+    job = job_runner.get(job_id) if job_id else None
+    if job is None:
+        st.session_state.jobs.pop(kind, None)
+    return job
+
+def job_running(kind):
+    job = session_job(kind)
+    return job is not None and not job.finished
+
+def show_job_progress(job):
+    """작업 진행 상황 (현재 단계, 파일별 감지 마켓/행 수/상태)"""
+    st.info(f"⏳ {job.label} 중... {job.stage_label} ({job.elapsed:.0f}초)")
+    files = job.file_table()
+    if not files.empty:
+        st.dataframe(files, use_container_width=True, hide_index=True)
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def job_progress(kind):
+    """실행 중인 작업 진행 상황 (이 부분만 주기적으로 다시 그리고, 끝나면 전체를 다시 실행해 결과 반영)"""
+    job = session_job(kind)
+    if job is None:
+        return
+    if job.finished:
+        st.rerun()
+    show_job_progress(job)
+
+def file_key_parts(files):
+    # (파일명, 내용) 목록 → 작업 키용 값 목록
+    return [part for file_name, content in files for part in (file_name, content)]
+
+def show_stage_timings(records):
+    """처리 성능 패널 (단계별 처리 시간, 입력/출력 행 수와 크기)"""
+    if not records:
+        return
+    with st.expander(f"⏱️ 처리 성능 (총 {total_seconds(records):.2f}초)"):
+        st.dataframe(stage_summary(records), use_container_width=True, hide_index=True)
+
 st.markdown("### 📂 파일 업로드")
 
 # 초기화 버튼 (생성된 파일이 있을 때만 표시)
@@ -791,6 +195,8 @@ if st.session_state.generated_file:
         st.session_state.coupang_file = None
         st.session_state.file_info = None
         st.session_state.preview_data = None
+        st.session_state.pending_batch = None
+        st.session_state.confirmed_batch_id = None
         st.rerun()
 
 uploaded_files = st.file_uploader(
@@ -804,82 +210,137 @@ uploaded_files = st.file_uploader(
 if uploaded_files and not st.session_state.generated_file:
     st.success(f"✅ {len(uploaded_files)}개 파일 업로드됨")
     
-    # 세션에 파일 저장 (주문관리시트에서 재사용 가능)
-    st.session_state.uploaded_market_files = [(f.name, f.read()) for f in uploaded_files]
+    # 세션에 파일 저장 (주문관리시트에서 재사용 가능). 업로드 목록이 바뀔 때만 다시 읽고,
+    # 그때만 이전 발주 파일의 주문 테이블을 버린다 (재실행마다 비우면 새 주문이 없던 결과도 사라짐)
+    upload_key = [(f.name, f.file_id, f.size) for f in uploaded_files]
+    if st.session_state.upload_key != upload_key:
+        st.session_state.upload_key = upload_key
+        st.session_state.uploaded_market_files = [(f.name, f.getvalue()) for f in uploaded_files]
+        st.session_state.order_table = None
     
     # 업로드된 파일 목록 표시
     with st.expander("업로드된 파일 목록"):
         for file in uploaded_files:
             st.write(f"- {file.name}")
 
-if st.button("🚀 발주 파일 생성", type="primary", disabled=not uploaded_files or st.session_state.generated_file is not None):
-    with st.spinner("파일 처리 중..."):
-        combined_list = []
-        coupang_sorted = None
-        
-        now = datetime.now(ZoneInfo("Asia/Seoul"))
-        date_prefix = now.strftime('%m%d')
-        time_suffix = now.strftime('%H')
-        
-        # 파일 처리 (세션에 저장된 파일 사용)
-        for file_name, content in st.session_state.uploaded_market_files:
-            
-            # 쿠팡 파일인 경우 정렬된 버전 생성
-            if 'DeliveryList' in file_name:
-                coupang_sorted = sort_xlsx_preserving_format(content, '업체상품코드')
-                if coupang_sorted:
-                    coupang_sorted = apply_text_format_to_excel_bytes(
-                        coupang_sorted,
-                        keyword_cols=['전화', '연락처', '휴대폰']
-                    )
-            
-            # 데이터 처리
-            temp_df = process_data(file_name, content)
-            if not temp_df.empty:
-                combined_list.append(temp_df)
-        
-        if combined_list:
-            # 데이터 병합 및 처리
-            full_df = pd.concat(combined_list, ignore_index=True)
-            
-            final_data = []
-            groups = full_df.groupby(['받는분성명', '받는분전화번호', '받는분주소'], sort=False)
-            for name, group in groups:
-                final_data.append(consolidate(group))
-            
-            final_df = pd.DataFrame(final_data)
-            final_df = final_df.sort_values(by=['마켓순서', '최종정렬키'])
-            
-            # 최종 파일 생성
-            final_filename = f"{date_prefix}_{time_suffix}.xlsx"
-            final_cols = ['고객주문번호', '받는분성명', '받는분전화번호', '받는분주소(전체, 분할)', '배송메세지1', '품목명', '기타1']
-            
-            output = io.BytesIO()
-            final_df.rename(columns={
-                '받는분주소': '받는분주소(전체, 분할)',
-                '배송메세지': '배송메세지1'
-            }).to_excel(output, index=False, columns=final_cols)
-            output.seek(0)
-            formatted_order_file = apply_text_format_to_excel_bytes(
-                output.getvalue(),
-                target_cols=['받는분전화번호'],
-                keyword_cols=['전화', '연락처', '휴대폰']
-            )
-            
-            # 세션 상태에 저장
-            st.session_state.generated_file = formatted_order_file
-            st.session_state.coupang_file = coupang_sorted
-            st.session_state.file_info = {
-                'filename': final_filename,
-                'coupang_filename': f"{date_prefix}_{time_suffix}_쿠팡_원본정렬.xlsx",
-                'order_count': len(final_df)
-            }
-            st.session_state.preview_data = final_df[['고객주문번호', '받는분성명', '품목명', '기타1']]
-            
-            st.success("✅ 발주 파일 생성 완료!")
-            st.rerun()
-        else:
-            st.error("❌ 처리할 수 있는 파일이 없습니다. 파일 형식을 확인해주세요.")
+exclude_dispatched = st.checkbox(
+    "이미 발주한 주문 제외",
+    value=False,
+    key="exclude_dispatched",
+    help="하루에 여러 번 발주할 때, 앞서 발주를 확정한 주문은 빼고 새 주문만 발주 파일로 만듭니다 (오전/오후 주문 파일이 겹쳐도 중복 없음). "
+         "발주 파일을 받은 뒤 '발주 확정'을 눌러야 기록됩니다.",
+    disabled=st.session_state.generated_file is not None
+)
+
+def dispatched_batches():
+    """오늘 확정한 발주 배치 목록 (OrderStore.batches)"""
+    with OrderStore() as order_store:
+        return order_store.batches(now_kst().strftime('%Y-%m-%d'))
+
+# 체크박스와 관계없이 오늘 확정한 배치가 있으면 표시 (잘못 확정한 배치 취소)
+today_batches = dispatched_batches()
+if today_batches:
+    with st.expander(f"🗂️ 오늘 발주 기록 ({len(today_batches)}회)"):
+        st.caption("취소한 배치의 주문은 다음 발주 파일에 다시 들어갑니다.")
+        for batch_id, created_at, line_count, skipped_count, batch_files in today_batches:
+            col1, col2 = st.columns([4, 1])
+            col1.write(f"#{batch_id} {created_at[11:]} | 주문 라인 {line_count}건 | {', '.join(batch_files)}")
+            if col2.button("취소", key=f"undo_batch_{batch_id}"):
+                with OrderStore() as order_store:
+                    removed = order_store.undo_batch(batch_id)
+                if st.session_state.confirmed_batch_id == batch_id:
+                    st.session_state.confirmed_batch_id = None
+                st.toast(f"발주 기록 #{batch_id} 취소 (주문 라인 {removed}건)")
+                st.rerun()
+
+def run_order_job(job, market_files, exclude_dispatched):
+    """발주 파일 생성 작업 (작업 스레드에서 실행, 화면에 필요한 결과만 반환)"""
+    options = dict(on_error=job.report, timer=StageTimer(on_stage=job.set_stage), progress=job.progress)
+    if exclude_dispatched:
+        with OrderStore() as order_store:
+            result = build_order_file(market_files, order_store=order_store, **options)
+    else:
+        result = build_order_file(market_files, **options)
+    if result is None:
+        return None
+    preview = result['order_df']
+    return {
+        'order_file': result['order_file'],
+        'coupang_sorted': result['coupang_sorted'],
+        'order_table': result['order_table'],
+        'timings': result['timings'],
+        'order_count': result['order_count'],
+        'skipped_count': result['skipped_count'],
+        'pending_batch': result['pending_batch'],
+        'preview': preview[['고객주문번호', '받는분성명', '품목명', '기타1']] if preview is not None else None,
+    }
+
+def show_quantity_changes(pending_batch):
+    """이미 발주한 라인 중 수량이 바뀐 라인 (다시 발주하지 않으므로 직접 처리하도록 알림)"""
+    changes = pending_batch['quantity_changes'] if pending_batch else None
+    if changes is None or changes.empty:
+        return
+    st.warning(f"⚠️ 이미 발주한 주문 라인 {len(changes)}건의 수량이 바뀌었습니다. "
+               "발주 파일에는 다시 넣지 않았으니 차이만큼 직접 처리해주세요.")
+    st.dataframe(changes, use_container_width=True, hide_index=True)
+
+def apply_order_job(job):
+    """끝난 발주 파일 작업 결과를 세션에 반영"""
+    del st.session_state.jobs['order']
+    for message in job.messages():
+        st.error(message)
+    result = job.result
+    if job.status == 'failed':
+        st.error(f"❌ 오류 발생: {job.error}")
+    elif result and not result['order_file']:
+        # 주문관리시트는 그날 발주한 전체 주문으로 만들 수 있도록 테이블은 보관
+        st.session_state.order_table = result['order_table']
+        st.warning(f"새로 발주할 주문이 없습니다. (이미 발주한 주문 라인 {result['skipped_count']}건 제외)")
+        show_quantity_changes(result['pending_batch'])
+    elif result:
+        names = output_filenames(now_kst())
+
+        # 세션 상태에 저장
+        st.session_state.generated_file = result['order_file']
+        st.session_state.coupang_file = result['coupang_sorted']
+        # 정규화 주문 테이블 보관 (주문관리시트에서 파일을 다시 파싱하지 않음)
+        st.session_state.order_table = result['order_table']
+        st.session_state.order_timings = result['timings']
+        st.session_state.file_info = {
+            'filename': names['order'],
+            'coupang_filename': names['coupang_sorted'],
+            'order_count': result['order_count'],
+            'skipped_count': result['skipped_count']
+        }
+        st.session_state.preview_data = result['preview']
+        st.session_state.pending_batch = result['pending_batch']
+        st.session_state.confirmed_batch_id = None
+
+        st.success("✅ 발주 파일 생성 완료!")
+        st.rerun()
+    else:
+        st.error("❌ 처리할 수 있는 파일이 없습니다. 파일 형식을 확인해주세요.")
+
+if st.button("🚀 발주 파일 생성", type="primary",
+             disabled=not uploaded_files or st.session_state.generated_file is not None or job_running('order')):
+    # 백그라운드 작업으로 실행 (같은 입력의 완료 결과가 저장되어 있으면 재사용)
+    files = st.session_state.uploaded_market_files
+    # 이미 발주한 주문 제외 결과는 발주 기록에 따라 달라지므로 오늘 확정한 배치 목록도 키에 포함
+    day = now_kst().strftime('%Y-%m-%d') if exclude_dispatched else None
+    dispatched = [batch[:3] for batch in dispatched_batches()] if exclude_dispatched else None
+    job = job_runner.submit(
+        cache_key('order_job', exclude_dispatched, day, dispatched, *file_key_parts(files)),
+        lambda job: run_order_job(job, files, exclude_dispatched),
+        label="발주 파일 생성"
+    )
+    st.session_state.jobs['order'] = job.id
+
+order_job = session_job('order')
+if order_job is not None:
+    if order_job.finished:
+        apply_order_job(order_job)
+    else:
+        job_progress('order')
 
 # 생성된 파일이 있으면 다운로드 섹션 표시
 if st.session_state.generated_file:
@@ -894,7 +355,7 @@ if st.session_state.generated_file:
             label="📄 발주 파일 다운로드",
             data=st.session_state.generated_file,
             file_name=st.session_state.file_info['filename'],
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            mime=XLSX_MIME,
             use_container_width=True
         )
     
@@ -904,14 +365,32 @@ if st.session_state.generated_file:
                 label="📄 쿠팡 정렬 파일 다운로드",
                 data=st.session_state.coupang_file,
                 file_name=st.session_state.file_info['coupang_filename'],
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                mime=XLSX_MIME,
                 use_container_width=True
             )
-    
+
+    # 발주 기록은 파일을 받은 뒤 확정할 때만 (생성만 하고 받지 못한 주문이 빠지지 않도록)
+    pending_batch = st.session_state.pending_batch
+    if st.session_state.confirmed_batch_id is not None:
+        st.success(f"🗂️ 발주 확정됨 (발주 기록 #{st.session_state.confirmed_batch_id}). "
+                   "다음 발주 파일에서는 이 주문들이 제외됩니다.")
+    elif pending_batch is not None and pending_batch['keys']:
+        st.warning("⚠️ 발주 파일을 받아 CJ택배에 올린 뒤 **발주 확정**을 눌러주세요. "
+                   "확정하지 않으면 다음 발주 파일에 이 주문들이 다시 들어갑니다.")
+        if st.button("✅ 발주 확정", type="primary"):
+            with OrderStore() as order_store:
+                st.session_state.confirmed_batch_id = order_store.record(pending_batch)
+            st.rerun()
+
     # 미리보기
     with st.expander("📊 데이터 미리보기", expanded=True):
         st.dataframe(st.session_state.preview_data, use_container_width=True)
         st.info(f"총 주문 건수: {st.session_state.file_info['order_count']}건")
+        if st.session_state.file_info.get('skipped_count'):
+            st.caption(f"이미 발주한 주문 라인 {st.session_state.file_info['skipped_count']}건은 제외했습니다.")
+    show_quantity_changes(st.session_state.pending_batch)
+
+    show_stage_timings(st.session_state.order_timings)
 
 
 # 주문관리시트 생성 섹션 추가 코드
@@ -956,7 +435,7 @@ with col_b:
         "위에서 업로드한 파일 사용하기",
         value=False,
         disabled=not st.session_state.uploaded_market_files,
-        help="발주 파일 생성에서 업로드한 마켓 주문시트를 재사용합니다"
+        help="발주 파일 생성에서 업로드한 마켓 주문시트를 재사용합니다 (이미 발주한 주문 제외를 켰다면 오늘 발주한 전체 주문으로 생성)"
     )
     
     if use_existing and st.session_state.uploaded_market_files:
@@ -973,400 +452,110 @@ naver_template_file = st.file_uploader(
     help=f"업로드하지 않으면 sample_data/{NAVER_DELIVERY_TEMPLATE_NAME} 공식 샘플 규격을 자동으로 사용합니다."
 )
 
-if st.button("🔗 주문관리시트 생성", type="primary", key="gen_order_mgmt"):
-    if not cj_files:
+with InvoiceStore() as invoice_store:
+    indexed_invoice_count = len(invoice_store)
+    indexed_cj_files = invoice_store.files()
+if indexed_cj_files:
+    with st.expander(f"🗂️ 저장된 송장번호 {indexed_invoice_count}건 (CJ 파일 {len(indexed_cj_files)}개)"):
+        st.caption("이전에 업로드한 CJ택배 파일의 송장번호도 함께 매칭합니다. 같은 파일은 다시 반영하지 않습니다.")
+        for indexed_name, indexed_count, ingested_at in indexed_cj_files[-20:]:
+            st.write(f"- {indexed_name} ({indexed_count}건, {ingested_at})")
+
+def run_order_mgmt_job(job, market_files, cj_uploads, naver_template, order_table):
+    """주문관리시트 생성 작업 (작업 스레드에서 실행, 화면에 필요한 결과만 반환)"""
+    with InvoiceStore() as invoice_store:
+        result = build_order_management(
+            market_files,
+            cj_uploads,
+            naver_template=naver_template,
+            on_error=job.report,
+            invoice_store=invoice_store,
+            order_table=order_table,
+            timer=StageTimer(on_stage=job.set_stage),
+            progress=job.progress
+        )
+    if not result:
+        return None
+    return {key: result[key] for key in (
+        'order_mgmt_file', 'count', 'matched', 'consolidated', 'raw_orders', 'timings',
+        'coupang_delivery', 'naver_delivery'
+    )}
+
+def apply_order_mgmt_job(job):
+    """끝난 주문관리시트 작업 결과를 세션에 반영"""
+    del st.session_state.jobs['order_mgmt']
+    for message in job.messages():
+        st.warning(message)
+    result = job.result
+    if job.status == 'failed':
+        st.error(f"❌ 오류 발생: {job.error}")
+    elif result:
+        naver_delivery = result['naver_delivery']
+
+        st.session_state.order_mgmt_file = result['order_mgmt_file']
+        st.session_state.order_mgmt_info = {
+            'filename': output_filenames(now_kst())['order_mgmt'],
+            'count': result['count'],
+            'matched': result['matched']
+        }
+        st.session_state.order_mgmt_preview = result['consolidated']
+        st.session_state.order_mgmt_raw_data = result['raw_orders']
+        st.session_state.order_mgmt_timings = result['timings']
+        st.session_state.coupang_delivery_file = result['coupang_delivery']
+        st.session_state.naver_delivery_file = naver_delivery['data'] if naver_delivery else None
+        st.session_state.naver_delivery_info = {
+            'extension': naver_delivery['extension'],
+            'mime': naver_delivery['mime'],
+            'count': naver_delivery['count'],
+            'files': naver_delivery['files']
+        } if naver_delivery else None
+
+        st.success("✅ 주문관리시트 생성 완료!")
+        st.rerun()
+    else:
+        st.error("❌ 처리할 수 있는 주문 데이터가 없습니다.")
+
+if st.button("🔗 주문관리시트 생성", type="primary", key="gen_order_mgmt", disabled=job_running('order_mgmt')):
+    if not cj_files and not indexed_invoice_count:
         st.error("CJ택배 파일을 업로드해주세요")
     elif not use_existing and not market_files:
         st.error("마켓 주문시트를 업로드하거나 위의 파일을 사용하도록 체크해주세요")
     else:
-        with st.spinner("주문관리시트 생성 중..."):
-            try:
-                # CJ택배 파일 읽기
-                cj_dfs = []
-                for cj_file in cj_files:
-                    cj_content = cj_file.read()
-                    cj_df = pd.read_csv(io.BytesIO(cj_content)) if cj_file.name.endswith('.csv') \
-                        else pd.read_excel(io.BytesIO(cj_content))
-                    cj_df.columns = cj_df.columns.astype(str).str.strip()
-                    cj_dfs.append(cj_df)
-
-                if not cj_dfs:
-                    st.error("CJ택배 파일을 업로드해주세요")
-                    st.stop()
-
-                cj_df = pd.concat(cj_dfs, ignore_index=True)
-                
-                # 운송장번호와 고객주문번호 매핑
-                invoice_map = {}
-                if '운송장번호' in cj_df.columns and '고객주문번호' in cj_df.columns:
-                    for _, row in cj_df.iterrows():
-                        order_no = normalize_excel_id(row['고객주문번호'])
-                        invoice = normalize_excel_id(row['운송장번호'])
-                        if order_no and invoice and invoice != 'nan':
-                            invoice_map[order_no] = invoice
-                
-                today_str = datetime.now(ZoneInfo("Asia/Seoul")).strftime('%Y.%m.%d')
-
-                # 마켓 주문시트 처리
-                all_orders = []
-                
-                # 사용할 파일 결정
-                files_to_process = []
-                if use_existing and st.session_state.uploaded_market_files:
-                    files_to_process = st.session_state.uploaded_market_files
-                else:
-                    files_to_process = [(f.name, f.read()) for f in market_files]
-                
-                for file_name, content in files_to_process:
-                    
-                    # 마켓별 상세 데이터 추출
-                    market_key = 'unknown'
-                    config = {}
-                    for k, v in MARKET_CONFIG.items():
-                        if v['key'] in file_name:
-                            market_key = k
-                            config = v
-                            break
-                    
-                    # 컬럼 기반 탐지
-                    if market_key == 'unknown':
-                        try:
-                            df_probe = pd.read_csv(io.BytesIO(content)) if file_name.endswith('.csv') \
-                                else pd.read_excel(io.BytesIO(content))
-                            detected = detect_market_by_columns(df_probe)
-                            if detected:
-                                market_key = detected
-                                config = MARKET_CONFIG[detected]
-                            else:
-                                df_probe = pd.read_csv(io.BytesIO(content), skiprows=2) if file_name.endswith('.csv') \
-                                    else pd.read_excel(io.BytesIO(content), skiprows=2)
-                                detected = detect_market_by_columns(df_probe)
-                                if detected:
-                                    market_key = detected
-                                    config = dict(MARKET_CONFIG[detected])
-                                    config['skip'] = 2
-                        except Exception:
-                            pass
-                    
-                    if market_key == 'unknown':
-                        continue
-                    
-                    # 데이터 읽기
-                    df = pd.read_csv(io.BytesIO(content), skiprows=config.get('skip', 0)) if file_name.endswith('.csv') \
-                        else pd.read_excel(io.BytesIO(content), skiprows=config.get('skip', 0))
-                    df.columns = df.columns.astype(str).str.strip()
-                    
-                    # 11번가 헤더 재시도
-                    if market_key in ['11st', '11st_manual']:
-                        required_11st = {'주문번호', '주소', '상품명', '수량'}
-                        if not required_11st.issubset(set(df.columns.astype(str))):
-                            df_retry = pd.read_csv(io.BytesIO(content), skiprows=2) if file_name.endswith('.csv') \
-                                else pd.read_excel(io.BytesIO(content), skiprows=2)
-                            if required_11st.issubset(set(df_retry.columns.astype(str))):
-                                df = df_retry
-                                df.columns = df.columns.astype(str).str.strip()
-                    
-                    # 마켓별 데이터 추출
-                    channel_name = {
-                        'naver': '네이버',
-                        'coupang': '쿠팡',
-                        'own': '자사몰',
-                        'esm': '지마켓',
-                        '11st': '11번가',
-                        '11st_manual': '11번가',
-                        'wadiz': '와디즈'
-                    }.get(market_key, '기타')
-                    
-                    if market_key == 'naver':
-                        date_col = pick_first_col(df.columns, ['결제일', '주문일', '결제일시', '주문일시'])
-                        buyer_col = pick_first_col(df.columns, ['구매자명', '주문자명', '구매자', '주문자'])
-                        df['final_msg'] = df.apply(lambda r: get_message(r, ['배송메세지', '비고']), axis=1)
-                        
-                        for _, row in df.iterrows():
-                            order_no = normalize_excel_id(row['주문번호'])
-                            all_orders.append({
-                                '날짜': today_str,
-                                '채널': channel_name,
-                                '주문번호': order_no,
-                                '상품명': code_to_item(row.get('판매자 상품코드')) or identify_product(row.get('상품명', '')),
-                                '상품명_원문': str(row.get('상품명', '')).strip(),
-                                '수량': row.get('수량', ''),
-                                '주문인': row.get(buyer_col, '') if buyer_col else '',
-                                '수취인': row.get('수취인명', ''),
-                                '전화번호': clean_phone(row.get('수취인연락처1', '')),
-                                '주소': row.get('통합배송지', ''),
-                                '비고': row.get('final_msg', ''),
-                                '송장번호': invoice_map.get(order_no, '')
-                            })
-                    
-                    elif market_key == 'coupang':
-                        date_col = pick_first_col(df.columns, ['주문일', '결제완료시각', '결제일시', '주문일시'])
-                        buyer_col = pick_first_col(df.columns, ['주문자명', '구매자', '주문자', '구매자명'])
-                        df['final_msg'] = df.apply(lambda r: get_message(r, ['배송메세지', '비고']), axis=1)
-                        
-                        for _, row in df.iterrows():
-                            order_no = normalize_excel_id(row['주문번호'])
-                            all_orders.append({
-                                '날짜': today_str,
-                                '채널': channel_name,
-                                '주문번호': order_no,
-                                '상품명': code_to_item(row.get('업체상품코드')) or identify_product(row.get('등록상품명', '')),
-                                '상품명_원문': str(row.get('등록상품명', '')).strip(),
-                                '수량': row.get('구매수(수량)', ''),
-                                '주문인': row.get(buyer_col, '') if buyer_col else '',
-                                '수취인': row.get('수취인이름', ''),
-                                '전화번호': clean_phone(row.get('수취인전화번호', '')),
-                                '주소': row.get('수취인 주소', ''),
-                                '비고': row.get('final_msg', ''),
-                                '송장번호': invoice_map.get(order_no, '')
-                            })
-                    
-                    elif market_key == 'esm':
-                        date_col = pick_first_col(df.columns, ['결제일시', '주문일', '결제일', '주문일시'])
-                        buyer_col = pick_first_col(df.columns, ['주문자명', '구매자명', '주문자', '구매자'])
-                        df['final_msg'] = df.apply(lambda r: get_message(r, ['배송시 요구사항', '배송메세지', '비고']), axis=1)
-                        
-                        for _, row in df.iterrows():
-                            order_no = normalize_excel_id(row['주문번호'])
-                            
-                            # 주문번호 패턴으로 옥션/지마켓 구분
-                            if len(order_no) == 10:
-                                if order_no.startswith('2'):
-                                    actual_channel = '옥션'
-                                elif order_no.startswith('4'):
-                                    actual_channel = '지마켓'
-                                else:
-                                    actual_channel = channel_name
-                            else:
-                                actual_channel = channel_name
-                            
-                            all_orders.append({
-                                '날짜': today_str,
-                                '채널': actual_channel,
-                                '주문번호': order_no,
-                                '상품명': identify_product(row.get('상품명', '')),
-                                '상품명_원문': str(row.get('상품명', '')).strip(),
-                                '수량': row.get('수량', ''),
-                                '주문인': row.get(buyer_col, '') if buyer_col else '',
-                                '수취인': row.get('수령인명', ''),
-                                '전화번호': clean_phone(row.get('수령인 휴대폰', '')),
-                                '주소': row.get('주소', ''),
-                                '비고': row.get('final_msg', ''),
-                                '송장번호': invoice_map.get(order_no, '')
-                            })
-                    
-                    elif market_key in ['11st', '11st_manual']:
-                        date_col = pick_first_col(df.columns, ['결제일시', '주문일', '결제일', '주문일시'])
-                        buyer_col = pick_first_col(df.columns, ['구매자', '주문자', '구매자명', '주문자명'])
-                        name_col = pick_first_col(df.columns, ['수취인', '받는분'])
-                        phone_col = pick_first_col(df.columns, ['휴대폰번호', '수취인연락처', '전화번호'])
-                        df['final_msg'] = df.apply(lambda r: get_message(r, ['배송메시지', '배송메세지', '비고']), axis=1)
-                        
-                        for _, row in df.iterrows():
-                            order_no = normalize_excel_id(row['주문번호'])
-                            all_orders.append({
-                                '날짜': today_str,
-                                '채널': channel_name,
-                                '주문번호': order_no,
-                                '상품명': identify_product(row.get('상품명', '')),
-                                '상품명_원문': str(row.get('상품명', '')).strip(),
-                                '수량': row.get('수량', ''),
-                                '주문인': row.get(buyer_col, '') if buyer_col else '',
-                                '수취인': row.get(name_col, '') if name_col else '',
-                                '전화번호': clean_phone(row.get(phone_col, '')) if phone_col else '',
-                                '주소': row.get('주소', ''),
-                                '비고': row.get('final_msg', ''),
-                                '송장번호': invoice_map.get(order_no, '')
-                            })
-                    
-                    elif market_key == 'own':
-                        date_col = pick_first_col(df.columns, ['주문일시', '주문일', '결제일', '결제일시'])
-                        buyer_col = pick_first_col(df.columns, ['주문자', '구매자', '주문자명', '구매자명'])
-                        df['final_msg'] = df.apply(lambda r: get_message(r, ['비고', '배송메세지']), axis=1)
-                        
-                        for _, row in df.iterrows():
-                            order_no = normalize_excel_id(row['주문번호'])
-                            all_orders.append({
-                                '날짜': today_str,
-                                '채널': channel_name,
-                                '주문번호': order_no,
-                                '상품명': identify_product(row.get('주문상품명', '')),
-                                '상품명_원문': str(row.get('주문상품명', '')).strip(),
-                                '수량': row.get('수량', ''),
-                                '주문인': row.get(buyer_col, '') if buyer_col else '',
-                                '수취인': row.get('수령인', ''),
-                                '전화번호': clean_phone(row.get('핸드폰', '')),
-                                '주소': row.get('주소', ''),
-                                '비고': row.get('final_msg', ''),
-                                '송장번호': invoice_map.get(order_no, '')
-                            })
-                    elif market_key == 'wadiz':
-                        buyer_col = pick_first_col(df.columns, ['서포터 이름', '주문자', '구매자', '주문자명', '구매자명'])
-                        df['final_msg'] = df.apply(lambda r: get_message(r, ['배송 요청 사항', '주문 요청 사항']), axis=1)
-
-                        for _, row in df.iterrows():
-                            order_no = normalize_excel_id(row.get('주문 번호', ''))
-                            all_orders.append({
-                                '날짜': today_str,
-                                '채널': channel_name,
-                                '주문번호': order_no,
-                                '상품명': identify_product(row.get('주문 상품', '')),
-                                '상품명_원문': str(row.get('주문 상품', '')).strip(),
-                                '수량': row.get('주문 수량', ''),
-                                '주문인': row.get(buyer_col, '') if buyer_col else '',
-                                '수취인': row.get('받는 분', ''),
-                                '전화번호': clean_phone(row.get('받는 분 연락처', '')),
-                                '주소': row.get('배송지 주소', ''),
-                                '비고': row.get('final_msg', ''),
-                                '송장번호': invoice_map.get(order_no, '')
-                            })
-                
-                # 주문관리시트 생성
-                if all_orders:
-                    mgmt_df = pd.DataFrame(all_orders)
-                    
-                    # 같은 주문번호로 제품 통합
-                    consolidated_list = []
-                    
-                    for (channel, order_no), group in mgmt_df.groupby(['채널', '주문번호']):
-                        # 제품별 수량 집계
-                        prod_counts = {}
-                        for _, row in group.iterrows():
-                            prod = row['상품명']
-                            qty = row['수량']
-                            if prod in prod_counts:
-                                prod_counts[prod] += qty
-                            else:
-                                prod_counts[prod] = qty
-                        
-                        # IH_Re, OH, OH_Re, PH, PH_Re, SH, SH_Re 순서로 정렬
-                        def get_sort_priority(prod_name):
-                            prod_upper = str(prod_name).strip().upper()
-                            order = {'IH_RE': 0, 'OH': 1, 'OH_RE': 2, 'PH': 3, 'PH_RE': 4, 'SH': 5, 'SH_RE': 6}
-                            return (order.get(prod_upper, 7), prod_name)
-                        
-                        sorted_prods = sorted(prod_counts.items(), key=lambda x: get_sort_priority(x[0]))
-                        
-                        # "OH 2개, PH 1개" 형태로 포맷팅
-                        formatted = []
-                        for prod, qty in sorted_prods:
-                            if qty > 1:
-                                formatted.append(f"{prod} {int(qty)}개")
-                            else:
-                                formatted.append(str(prod))
-                        
-                        # 첫 번째 제품으로 정렬키 결정
-                        first_prod = sorted_prods[0][0] if sorted_prods else ''
-                        first_prod_priority = get_sort_priority(first_prod)[0]
-                        
-                        # 마켓 순서 매핑
-                        market_order_map = {
-                            '네이버': 1,
-                            '쿠팡': 2,
-                            '자사몰': 3,
-                            '옥션': 4,
-                            '지마켓': 4,
-                            '11번가': 5,
-                            '와디즈': 6
-                        }
-                        market_order = market_order_map.get(channel, 99)
-                        
-                        consolidated_list.append({
-                            '날짜': group.iloc[0]['날짜'],
-                            '채널': channel,
-                            '주문번호': order_no,
-                            '상품명': ", ".join(formatted),
-                            '수량': int(group['수량'].sum()),
-                            '주문인': group.iloc[0]['주문인'],
-                            '수취인': group.iloc[0]['수취인'],
-                            '전화번호': group.iloc[0]['전화번호'],
-                            '주소': group.iloc[0]['주소'],
-                            '비고': group.iloc[0]['비고'],
-                            '송장번호': group.iloc[0]['송장번호'],
-                            '마켓순서': market_order,
-                            '상품순서': first_prod_priority
-                        })
-                    
-                    consolidated = pd.DataFrame(consolidated_list)
-                    # 발주파일과 같은 순서로 정렬: 마켓 → 상품
-                    consolidated = consolidated.sort_values(by=['마켓순서', '상품순서'])
-                    # 정렬용 컬럼 제거
-                    consolidated = consolidated.drop(columns=['마켓순서', '상품순서'])
-                    
-                    # 쿠팡 발송 파일 생성
-                    coupang_delivery = None
-                    for file_name, content in files_to_process:
-                        if 'DeliveryList' in file_name:
-                            coupang_delivery = add_invoice_to_coupang(content, file_name, invoice_map)
-                            if coupang_delivery:
-                                coupang_delivery = apply_text_format_to_excel_bytes(
-                                    coupang_delivery,
-                                    keyword_cols=['전화', '연락처', '휴대폰']
-                                )
-                            break
-
-                    # 네이버 엑셀발송 파일 생성
-                    naver_delivery = None
-                    naver_delivery_info = None
-                    naver_template_content = None
-                    naver_template_name = None
-
-                    if naver_template_file:
-                        naver_template_content = naver_template_file.read()
-                        naver_template_name = naver_template_file.name
-                    else:
-                        local_template = find_naver_delivery_template()
-                        if local_template:
-                            naver_template_content = local_template.read_bytes()
-                            naver_template_name = local_template.name
-
-                    for file_name, content in files_to_process:
-                        naver_delivery = create_naver_delivery_file(
-                            content,
-                            file_name,
-                            invoice_map,
-                            template_content=naver_template_content,
-                            template_name=naver_template_name
-                        )
-                        if naver_delivery:
-                            naver_delivery_info = {
-                                'extension': naver_delivery['extension'],
-                                'mime': naver_delivery['mime']
-                            }
-                            break
-                    
-                    # 엑셀 파일 생성
-                    output = io.BytesIO()
-                    consolidated.to_excel(output, index=False)
-                    output.seek(0)
-                    formatted_order_mgmt = apply_text_format_to_excel_bytes(
-                        output.getvalue(),
-                        target_cols=['전화번호'],
-                        keyword_cols=['전화', '연락처', '휴대폰']
-                    )
-                    
-                    now = datetime.now(ZoneInfo("Asia/Seoul"))
-                    filename = f"주문관리_{now.strftime('%m%d_%H')}.xlsx"
-                    
-                    st.session_state.order_mgmt_file = formatted_order_mgmt
-                    st.session_state.order_mgmt_info = {
-                        'filename': filename,
-                        'count': len(consolidated),
-                        'matched': len(consolidated[consolidated['송장번호'] != ''])
-                    }
-                    st.session_state.order_mgmt_preview = consolidated
-                    st.session_state.order_mgmt_raw_data = all_orders
-                    st.session_state.coupang_delivery_file = coupang_delivery
-                    st.session_state.naver_delivery_file = naver_delivery['data'] if naver_delivery else None
-                    st.session_state.naver_delivery_info = naver_delivery_info
-                    
-                    st.success("✅ 주문관리시트 생성 완료!")
-                    st.rerun()
-                else:
-                    st.error("❌ 처리할 수 있는 주문 데이터가 없습니다.")
-                    
-            except Exception as e:
-                st.error(f"❌ 오류 발생: {e}")
+        # CJ택배 파일 읽기
+        cj_uploads = [(cj_file.name, cj_file.read()) for cj_file in cj_files or []]
+
+        # 사용할 파일 결정
+        order_table = None
+        if use_existing and st.session_state.uploaded_market_files:
+            files_to_process = st.session_state.uploaded_market_files
+            order_table = st.session_state.order_table
+        else:
+            files_to_process = [(f.name, f.read()) for f in market_files]
+
+        naver_template = None
+        if naver_template_file:
+            naver_template = (naver_template_file.read(), naver_template_file.name)
+
+        # 백그라운드 작업으로 실행. 키에는 이번에 올리지 않은 인덱스의 CJ 파일 목록도 포함
+        # (다른 CJ 파일이 인덱스에 추가되면 매칭 결과가 달라지므로 다시 계산)
+        cj_names = {file_name for file_name, _ in cj_uploads}
+        indexed_state = [(name, count) for name, count, _ in indexed_cj_files if name not in cj_names]
+        job = job_runner.submit(
+            cache_key(
+                'order_mgmt_job', now_kst().strftime('%Y.%m.%d'), indexed_state, order_table,
+                *(naver_template or (None, None)), *file_key_parts(cj_uploads), *file_key_parts(files_to_process)
+            ),
+            lambda job: run_order_mgmt_job(job, files_to_process, cj_uploads, naver_template, order_table),
+            label="주문관리시트 생성"
+        )
+        st.session_state.jobs['order_mgmt'] = job.id
+
+order_mgmt_job = session_job('order_mgmt')
+if order_mgmt_job is not None:
+    if order_mgmt_job.finished:
+        apply_order_mgmt_job(order_mgmt_job)
+    else:
+        job_progress('order_mgmt')
 
 # 주문관리시트 다운로드
 if st.session_state.order_mgmt_file:
@@ -1379,28 +568,26 @@ if st.session_state.order_mgmt_file:
             label="📋 주문관리시트 다운로드",
             data=st.session_state.order_mgmt_file,
             file_name=st.session_state.order_mgmt_info['filename'],
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            mime=XLSX_MIME,
             use_container_width=True
         )
     
     if st.session_state.coupang_delivery_file:
         with col2:
-            now = datetime.now(ZoneInfo("Asia/Seoul"))
-            coupang_filename = f"쿠팡발송_{now.strftime('%m%d_%H')}.xlsx"
+            coupang_filename = output_filenames(now_kst())['coupang_delivery']
             st.download_button(
                 label="📦 쿠팡 발송 파일 다운로드",
                 data=st.session_state.coupang_delivery_file,
                 file_name=coupang_filename,
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                mime=XLSX_MIME,
                 use_container_width=True
             )
 
     if st.session_state.naver_delivery_file:
         with col3:
-            now = datetime.now(ZoneInfo("Asia/Seoul"))
             naver_ext = (st.session_state.naver_delivery_info or {}).get('extension', 'xls')
             naver_mime = (st.session_state.naver_delivery_info or {}).get('mime', NAVER_DELIVERY_XLS_MIME)
-            naver_filename = f"네이버발송_{now.strftime('%m%d_%H')}.{naver_ext}"
+            naver_filename = f"{output_filenames(now_kst())['naver_delivery']}.{naver_ext}"
             st.download_button(
                 label="📦 네이버 발송 파일 다운로드",
                 data=st.session_state.naver_delivery_file,
@@ -1408,17 +595,35 @@ if st.session_state.order_mgmt_file:
                 mime=naver_mime,
                 use_container_width=True
             )
+            naver_files = (st.session_state.naver_delivery_info or {}).get('files', [])
+            if len(naver_files) > 1:
+                st.caption(f"네이버 주문 파일 {len(naver_files)}개 통합 ({st.session_state.naver_delivery_info['count']}건)")
     
     st.info(f"총 {st.session_state.order_mgmt_info['count']}건 | 송장번호 매칭 {st.session_state.order_mgmt_info['matched']}건")
-    
+
+    # 발주 기록은 파일을 받은 뒤 확정할 때만 (생성만 하고 받지 못한 주문이 빠지지 않도록)
+    pending_batch = st.session_state.pending_batch
+    if st.session_state.confirmed_batch_id is not None:
+        st.success(f"🗂️ 발주 확정됨 (발주 기록 #{st.session_state.confirmed_batch_id}). "
+                   "다음 발주 파일에서는 이 주문들이 제외됩니다.")
+    elif pending_batch is not None and pending_batch['keys']:
+        st.warning("⚠️ 발주 파일을 받아 CJ택배에 올린 뒤 **발주 확정**을 눌러주세요. "
+                   "확정하지 않으면 다음 발주 파일에 이 주문들이 다시 들어갑니다.")
+        if st.button("✅ 발주 확정", type="primary"):
+            with OrderStore() as order_store:
+                st.session_state.confirmed_batch_id = order_store.record(pending_batch)
+            st.rerun()
+
     # 미리보기
     with st.expander("📊 데이터 미리보기", expanded=True):
         st.dataframe(st.session_state.order_mgmt_preview, use_container_width=True)
+
+    show_stage_timings(st.session_state.order_mgmt_timings)
     
     # 품목별 판매 집계
-    if st.session_state.order_mgmt_raw_data:
+    raw_df = st.session_state.order_mgmt_raw_data
+    if raw_df is not None and not raw_df.empty:
         with st.expander("📈 품목별 판매 집계", expanded=False):
-            raw_df = pd.DataFrame(st.session_state.order_mgmt_raw_data)
             use_normalized = st.checkbox(
                 "상품명 자동 분류 적용 (OH/PH/SH 등)",
                 value=False,
@@ -1430,28 +635,11 @@ if st.session_state.order_mgmt_file:
             if summary_col not in raw_df.columns:
                 summary_col = '상품명'
 
-            product_summary = raw_df.groupby(summary_col)['수량'].sum().reset_index()
+            product_summary = raw_df.groupby(summary_col, observed=True)['수량'].sum().reset_index()
             product_summary.columns = ['품목', '판매 수량']
-            
-            # 품목 순서 정의
-            product_order = {
-                'IH_Re': 0,
-                'OH': 1,
-                'OH_Re': 2,
-                'PH': 3,
-                'PH_Re': 4,
-                'SH': 5,
-                'SH_Re': 6,
-                '케이블(일반)': 7,
-                '케이블s': 8,
-                '휴대폰거치대': 9,
-                '차량번호판': 10,
-                '차량용망치': 11,
-                '도막측정기': 12
-            }
-            
+
             # 정렬키 추가
-            product_summary['순서'] = product_summary['품목'].map(lambda x: product_order.get(x, 99))
+            product_summary['순서'] = product_summary['품목'].map(lambda x: PRODUCT_SUMMARY_ORDER.get(x, 99))
             product_summary = product_summary.sort_values(by=['순서', '품목'])
             product_summary = product_summary[['품목', '판매 수량']]
             
@@ -1489,6 +677,9 @@ with toggle_col2:
 
 if 'paste_summary_ready' not in st.session_state:
     st.session_state.paste_summary_ready = False
+if 'paste_aggregator' not in st.session_state:
+    # 직전 붙여넣기와 달라진 줄만 다시 집계
+    st.session_state.paste_aggregator = PasteAggregator()
 
 def _mark_paste_ready():
     st.session_state.paste_summary_ready = True
@@ -1507,26 +698,11 @@ with col_calc:
         st.session_state.paste_summary_ready = True
 
 if st.session_state.paste_summary_ready and pasted_text.strip():
-    summary_df, total_qty = parse_pasted_sales(pasted_text, normalize=normalize_names)
+    summary_df, total_qty = st.session_state.paste_aggregator.update(pasted_text, normalize=normalize_names)
     if summary_df.empty:
         st.warning("집계할 데이터가 없습니다. 붙여넣은 내용을 확인해주세요.")
     else:
-        product_order = {
-            'IH_Re': 0,
-            'OH': 1,
-            'OH_Re': 2,
-            'PH': 3,
-            'PH_Re': 4,
-            'SH': 5,
-            'SH_Re': 6,
-            '케이블(일반)': 7,
-            '케이블s': 8,
-            '휴대폰거치대': 9,
-            '차량번호판': 10,
-            '차량용망치': 11,
-            '도막측정기': 12
-        }
-        summary_df['순서'] = summary_df['상품명'].map(lambda x: product_order.get(x, 99))
+        summary_df['순서'] = summary_df['상품명'].map(lambda x: PRODUCT_SUMMARY_ORDER.get(x, 99))
         summary_df = summary_df.sort_values(by=['순서', '상품명']).drop(columns=['순서'])
         summary_df.columns = ['품목', '판매 수량']
         st.dataframe(summary_df, use_container_width=True, hide_index=True)
@@ -0,0 +1,45 @@
+"""상품명 분류 마이크로 벤치마크
+
+분류 비용이 주문 행 수가 아니라 고유 상품명 수(어휘 크기)에 비례하는지 확인한다.
+
+    python -m benchmarks.bench_classify
+"""
+import random
+import time
+
+import pandas as pd
+
+from delivery_helper.products import _classify_product, _classify_product_cached, identify_products
+
+BASE_NAMES = [
+    "[정품] 스마트 OH 헤드", "PH 리퍼제품", "SH_Re 교체형", "IH 리퍼", "충전 케이블 1m", "스위치 케이블",
+    "케이블s 세트", "휴대폰 거치대", "차량번호판 가드", "차량용망치", "도막 측정기", "기타 상품",
+]
+
+
+def make_names(vocab_size, rows, seed=0):
+    rng = random.Random(seed)
+    vocab = [f"{BASE_NAMES[i % len(BASE_NAMES)]} 옵션{i}" for i in range(vocab_size)]
+    return pd.Series([rng.choice(vocab) for _ in range(rows)])
+
+def _time(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        _classify_product_cached.cache_clear()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+def main():
+    print(f"{'고유 상품명':>10} {'행 수':>10} {'일괄 분류(ms)':>14} {'행별 분류(ms)':>14}")
+    for vocab_size in (10, 100, 1000):
+        for rows in (1_000, 10_000, 100_000):
+            names = make_names(vocab_size, rows)
+            batch_ms = _time(lambda: identify_products(names))
+            row_ms = _time(lambda: names.map(_classify_product), repeat=1)
+            print(f"{vocab_size:>10} {rows:>10} {batch_ms:>14.1f} {row_ms:>14.1f}")
+
+if __name__ == '__main__':
+    main()
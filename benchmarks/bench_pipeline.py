@@ -0,0 +1,180 @@
+"""발주 / 주문관리 파이프라인 단계별 벤치마크
+
+합성 마켓 파일(benchmarks.fixtures)로 단계별 처리 시간을 재고 결과를 JSON으로 저장한다.
+--compare로 이전 결과 JSON을 주면 단계별 시간 비율을 함께 출력한다.
+
+    python -m benchmarks.bench_pipeline --rows 100 1000 10000 --formats xlsx csv -o result.json
+    python -m benchmarks.bench_pipeline --rows 10000 --compare result.json
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from delivery_helper import polars_engine
+from delivery_helper.cache import clear_result_cache
+from delivery_helper.consolidate import consolidate_order_mgmt, consolidate_orders
+from delivery_helper.excel import add_invoice_to_coupang
+from delivery_helper.markets import process_data, read_order_table, to_order_mgmt_frame
+from delivery_helper.naver import create_naver_delivery_file, load_naver_delivery_template
+from delivery_helper.pipeline import build_invoice_map, build_order_file, build_order_management, consolidation_engine
+from delivery_helper.reader import clear_upload_cache, excel_engine
+from delivery_helper.sales import PasteAggregator, parse_pasted_sales
+
+from .fixtures import FORMATS, make_cj_files, make_market_files, make_paste_text
+
+TODAY = '2026.02.10'
+
+
+def _clear_caches():
+    clear_upload_cache()
+    clear_result_cache()
+
+def _time(func, repeat):
+    """캐시를 비우고 repeat번 실행해 (최소 시간(초), 마지막 결과) 반환"""
+    best, result = None, None
+    for _ in range(repeat):
+        _clear_caches()
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def _count(value):
+    return 0 if value is None else len(value)
+
+def run_case(rows, fmt, repeat=1, seed=0):
+    """행 수/파일 형식 하나에 대한 단계별 측정 결과 목록"""
+    market_files, frames = make_market_files(rows, fmt, seed)
+    cj_files = make_cj_files(frames, fmt, seed=seed)
+    paste_text = make_paste_text(rows, seed)
+    input_bytes = sum(len(content) for _, content in market_files)
+    template_content, template_name = load_naver_delivery_template()
+    coupang = next(((name, content) for name, content in market_files if 'DeliveryList' in name), None)
+    naver = next(((name, content) for name, content in market_files if '스마트스토어' in name), None)
+
+    order_df = pd.concat([process_data(name, content) for name, content in market_files], ignore_index=True)
+    order_table = pd.concat([read_order_table(name, content)['table'] for name, content in market_files],
+                            ignore_index=True)
+    invoice_map = build_invoice_map(cj_files)
+    paste_aggregator = PasteAggregator()
+    paste_aggregator.update(paste_text)
+    mgmt_df = to_order_mgmt_frame(order_table, TODAY, invoice_map)
+
+    # 단계명: (실행 함수, 입력 행 수, 결과 → 출력 행 수)
+    stages = {
+        'process_data': (
+            lambda: [process_data(name, content) for name, content in market_files],
+            len(order_df), lambda frames: sum(len(df) for df in frames)),
+        'consolidate_orders': (lambda: consolidate_orders(order_df), len(order_df), _count),
+        'invoice_match': (
+            lambda: to_order_mgmt_frame(order_table, TODAY, build_invoice_map(cj_files)),
+            len(order_table), lambda df: int((df['송장번호'] != '').sum())),
+        'consolidate_order_mgmt': (lambda: consolidate_order_mgmt(mgmt_df), len(mgmt_df), _count),
+        'add_invoice_to_coupang': (
+            lambda: add_invoice_to_coupang(coupang[1], coupang[0], invoice_map, on_error=lambda message: None),
+            rows, lambda content: rows if content else 0),
+        'create_naver_delivery_file': (
+            lambda: create_naver_delivery_file(naver[1], naver[0], invoice_map, template_content, template_name),
+            rows, lambda result: rows if result else 0),
+        'parse_pasted_sales': (lambda: parse_pasted_sales(paste_text), rows, lambda result: _count(result[0])),
+        # 한 줄 추가 후 되돌리기 (증분 갱신 두 번)
+        'paste_incremental': (
+            lambda: [paste_aggregator.update(text) for text in (paste_text + "\nOH\t1", paste_text)][-1],
+            rows, lambda result: _count(result[0])),
+        'build_order_file': (
+            lambda: build_order_file(market_files, workers=1),
+            len(order_df), lambda result: result['order_count'] if result else 0),
+        'build_order_management': (
+            lambda: build_order_management(market_files, cj_files, today_str=TODAY, workers=1),
+            len(order_table), lambda result: result['count'] if result else 0),
+    }
+
+    if polars_engine.is_available():
+        # Polars 엔진 통합 단계 (pandas 단계와 같은 입력/결과)
+        stages['consolidate_orders_polars'] = (
+            lambda: polars_engine.consolidate_orders(order_df), len(order_df), _count)
+        stages['consolidate_order_mgmt_polars'] = (
+            lambda: polars_engine.consolidate_order_mgmt(mgmt_df), len(mgmt_df), _count)
+
+    if fmt != 'xlsx':
+        # 쿠팡 발송 파일은 xlsx 원본에만 만들 수 있음
+        del stages['add_invoice_to_coupang']
+
+    results = []
+    for stage, (func, rows_in, count_out) in stages.items():
+        seconds, output = _time(func, repeat)
+        results.append({
+            'stage': stage,
+            'format': fmt,
+            'rows': rows,
+            'seconds': round(seconds, 4),
+            'rows_in': rows_in,
+            'rows_out': count_out(output),
+            'input_bytes': input_bytes,
+        })
+    return results
+
+def compare(results, previous):
+    """이전 결과와 (stage, format, rows)가 같은 항목의 시간 비율 (1보다 작으면 빨라짐)"""
+    baseline = {(r['stage'], r['format'], r['rows']): r['seconds'] for r in previous['results']}
+    ratios = {}
+    for result in results:
+        key = (result['stage'], result['format'], result['rows'])
+        if baseline.get(key):
+            ratios[key] = result['seconds'] / baseline[key]
+    return ratios
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="발주/주문관리 파이프라인 단계별 벤치마크")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000, 10000],
+                        help="마켓 파일별 주문 행 수 (여러 개 가능, 100 ~ 1000000)")
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=['xlsx'])
+    parser.add_argument('--repeat', type=int, default=1, help="단계별 반복 횟수 (최소 시간 기록)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help="결과 JSON 경로 (기본: bench_pipeline_<시각>.json)")
+    parser.add_argument('--compare', help="비교할 이전 결과 JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'형식':>5} {'행 수':>8} {'단계':<30} {'시간(s)':>9} {'입력 행':>9} {'출력 행':>9}")
+    for fmt in args.formats:
+        for rows in args.rows:
+            try:
+                case = run_case(rows, fmt, args.repeat, args.seed)
+            except ValueError as e:
+                print(f"{fmt:>5} {rows:>8} 건너뜀: {e}")
+                continue
+            for r in case:
+                print(f"{fmt:>5} {rows:>8} {r['stage']:<30} {r['seconds']:>9.3f} {r['rows_in']:>9} {r['rows_out']:>9}")
+            results.extend(case)
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'reader_engine': excel_engine(),
+        'pipeline_engine': consolidation_engine(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+    output = args.output or f"bench_pipeline_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"✅ 결과 저장: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+        print(f"\n이전 결과({previous.get('created_at')}) 대비 시간 비율")
+        for (stage, fmt, rows), ratio in compare(results, previous).items():
+            print(f"{fmt:>5} {rows:>8} {stage:<30} {ratio:>6.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""벤치마크용 합성 마켓 주문 파일 / CJ 실적 파일 생성기
+
+실제 마켓 양식과 같은 파일명, 헤더, 상단 안내 행(네이버 1행, 11번가 allList 2행)을 갖는
+파일을 xlsx, xls, csv로 만든다. 같은 seed면 같은 파일이 나온다.
+
+    python -m benchmarks.fixtures --rows 10000 --format xlsx -o /tmp/fixtures
+"""
+import argparse
+import csv
+import io
+from pathlib import Path
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+FORMATS = ('xlsx', 'xls', 'csv')
+
+# 파일 형식별 최대 행 수 (헤더/안내 행 포함)
+FORMAT_MAX_ROWS = {'xlsx': 1_048_576, 'xls': 65_536, 'csv': None}
+
+MARKET_FILE_NAMES = {
+    'naver': "스마트스토어_전체주문발주발송관리_20260210",
+    'coupang': "DeliveryList(2026-02-10)_(0)",
+    'own': "orders_20260210",
+    'esm': "신규주문_20260210",
+    '11st': "allList_20260210",
+    'wadiz': "와디즈_발송 처리용 주문_20260210",
+}
+
+# 상단 안내 행 수 (MARKET_CONFIG의 skip과 같음)
+BANNER_ROWS = {'naver': 1, '11st': 2}
+
+PRODUCT_NAMES = [
+    "[정품] 스마트 OH 헤드", "PH 리퍼제품", "SH_Re 교체형", "IH 리퍼", "충전 케이블 1m", "스위치 케이블",
+    "케이블s 세트", "휴대폰 거치대", "차량번호판 가드", "차량용망치", "도막 측정기", "기타 상품",
+    "oh 소형", "무선 PH", "ph_re 리퍼", "sh",
+]
+PRODUCT_CODES = ["OH", "PH", "SH_RE", "PH_RE", "IH_RE", "", "X1"]
+MESSAGES = ["", "문앞에 놓아주세요", "부재시 연락 바랍니다", "경비실에 맡겨주세요", "  "]
+DISTRICTS = ["강남구", "마포구", "종로구", "해운대구", "수성구", "유성구"]
+PASTE_NAMES = ["OH", "PH", "SH_Re", "IH_Re", "케이블", "케이블s", "휴대폰거치대", "OH, PH", "도막측정기"]
+
+
+def _choice(rng, values, rows):
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), rows)]
+
+def _people(rng, rows):
+    """주문 행마다 (이름, 전화번호, 주소). 같은 사람이 여러 번 주문하도록 인원은 행 수의 절반"""
+    people = max(2, rows // 2)
+    idx = rng.integers(0, people, rows)
+    names = np.array([f"홍길동{i}" for i in idx], dtype=object)
+    phones = np.array([f"010-{1000 + i % 9000:04d}-{i % 10000:04d}" for i in idx], dtype=object)
+    districts = _choice(rng, DISTRICTS, rows)
+    addresses = np.array([f"서울시 {d} 테스트로 {i % 997}번길 {i % 31}" for d, i in zip(districts, idx)], dtype=object)
+    return names, phones, addresses
+
+def make_market_frames(rows, seed=0):
+    """마켓별 주문 DataFrame {market_key: df}. 주문번호 하나에 평균 2개 상품"""
+    rng = np.random.default_rng(seed)
+    line = np.arange(rows)
+    frames = {}
+
+    names, phones, addresses = _people(rng, rows)
+    frames['naver'] = pd.DataFrame({
+        '상품주문번호': 2026021000000000 + line,
+        '주문번호': 2026021010000000 + line // 2,
+        '구매자명': names,
+        '수취인명': names,
+        '수취인연락처1': phones,
+        '통합배송지': addresses,
+        '배송메세지': _choice(rng, MESSAGES, rows),
+        '판매자 상품코드': _choice(rng, PRODUCT_CODES, rows),
+        '상품명': _choice(rng, PRODUCT_NAMES, rows),
+        '수량': rng.integers(1, 4, rows),
+        '결제일': '2026-02-10 09:00:00',
+    })
+
+    names, phones, addresses = _people(rng, rows)
+    frames['coupang'] = pd.DataFrame({
+        '번호': line + 1,
+        '묶음배송번호': 500000000 + line // 2,
+        '주문번호': 31000000000000 + line // 2,
+        '구매자': names,
+        '수취인이름': names,
+        '수취인전화번호': phones,
+        '수취인 주소': addresses,
+        '배송메세지': _choice(rng, MESSAGES, rows),
+        '업체상품코드': _choice(rng, PRODUCT_CODES, rows),
+        '등록상품명': _choice(rng, PRODUCT_NAMES, rows),
+        '구매수(수량)': rng.integers(1, 4, rows),
+        '운송장번호': '',
+    })
+
+    names, phones, addresses = _people(rng, rows)
+    frames['own'] = pd.DataFrame({
+        '주문번호': [f"OD{i:08d}" for i in line // 2],
+        '주문자': names,
+        '수령인': names,
+        '핸드폰': phones,
+        '주소': addresses,
+        '비고': _choice(rng, MESSAGES, rows),
+        '배송메세지': _choice(rng, MESSAGES, rows),
+        '주문상품명': _choice(rng, PRODUCT_NAMES, rows),
+        '수량': rng.integers(1, 4, rows),
+    })
+
+    # 옥션(2로 시작)/지마켓(4로 시작) 10자리 주문번호가 섞인 ESM 파일
+    names, phones, addresses = _people(rng, rows)
+    frames['esm'] = pd.DataFrame({
+        '주문번호': rng.choice([2, 4], rows) * 1_000_000_000 + line // 2,
+        '구매자명': names,
+        '수령인명': names,
+        '수령인 휴대폰': phones,
+        '주소': addresses,
+        '배송시 요구사항': _choice(rng, MESSAGES, rows),
+        '상품명': _choice(rng, PRODUCT_NAMES, rows),
+        '수량': rng.integers(1, 4, rows),
+    })
+
+    names, phones, addresses = _people(rng, rows)
+    frames['11st'] = pd.DataFrame({
+        '주문번호': 202602100000000 + line // 2,
+        '구매자': names,
+        '수취인': names,
+        '휴대폰번호': phones,
+        '주소': addresses,
+        '배송메시지': _choice(rng, MESSAGES, rows),
+        '상품명': _choice(rng, PRODUCT_NAMES, rows),
+        '수량': rng.integers(1, 4, rows),
+    })
+
+    names, phones, addresses = _people(rng, rows)
+    frames['wadiz'] = pd.DataFrame({
+        '주문 번호': 90000000 + line // 2,
+        '서포터 이름': names,
+        '주문 상품': _choice(rng, PRODUCT_NAMES, rows),
+        '주문 수량': rng.integers(1, 4, rows),
+        '받는 분': names,
+        '받는 분 연락처': phones,
+        '배송지 주소': addresses,
+        '배송 요청 사항': _choice(rng, MESSAGES, rows),
+        '주문 요청 사항': '',
+    })
+    return frames
+
+def make_cj_frame(frames, fraction=0.7, seed=0):
+    """마켓 주문번호 중 fraction 비율에 운송장번호를 붙인 CJ 배송 실적 DataFrame"""
+    rng = np.random.default_rng(seed + 1)
+    order_nos = pd.concat([
+        frames[market][col].drop_duplicates()
+        for market, col in (('naver', '주문번호'), ('coupang', '주문번호'), ('own', '주문번호'),
+                            ('esm', '주문번호'), ('11st', '주문번호'), ('wadiz', '주문 번호'))
+    ], ignore_index=True)
+    picked = order_nos[rng.random(len(order_nos)) < fraction].reset_index(drop=True)
+    return pd.DataFrame({
+        '접수일자': '2026-02-10',
+        '운송장번호': 680000000000 + picked.index,
+        '고객주문번호': picked.astype(str),
+        '받는분성명': '수령인',
+        '품목명': 'OH',
+    })
+
+def _write_xlsx(rows):
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    for row in rows:
+        ws.append(row)
+    output = io.BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+def _write_xls(rows):
+    import xlwt
+
+    wb = xlwt.Workbook(encoding='utf-8')
+    ws = wb.add_sheet('Sheet1')
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            if value is not None:
+                ws.write(r, c, value)
+    output = io.BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+def _write_csv(rows):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    for row in rows:
+        writer.writerow(['' if value is None else value for value in row])
+    return output.getvalue().encode('utf-8-sig')
+
+def write_frame(df, fmt, banner_rows=0):
+    """DataFrame → 파일 bytes (상단에 안내 행 banner_rows개 추가)"""
+    max_rows = FORMAT_MAX_ROWS[fmt]
+    if max_rows is not None and len(df) + banner_rows + 1 > max_rows:
+        raise ValueError(f"{fmt} 형식은 {max_rows}행까지만 저장할 수 있습니다 ({len(df)}행)")
+
+    columns = list(df.columns)
+    banner = [[f"※ 안내문구 {i + 1}"] + [None] * (len(columns) - 1) for i in range(banner_rows)]
+    # numpy 정수는 엑셀 라이브러리가 받지 않으므로 파이썬 값으로 변환
+    body = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+    rows = [*banner, columns, *([v.item() if isinstance(v, np.generic) else v for v in row] for row in body)]
+    return {'xlsx': _write_xlsx, 'xls': _write_xls, 'csv': _write_csv}[fmt](rows)
+
+def make_market_files(rows, fmt='xlsx', seed=0, markets=None):
+    """(파일명, 내용) 목록과 원본 DataFrame dict 반환"""
+    frames = make_market_frames(rows, seed)
+    files = [
+        (f"{MARKET_FILE_NAMES[market]}.{fmt}", write_frame(frames[market], fmt, BANNER_ROWS.get(market, 0)))
+        for market in (markets or MARKET_FILE_NAMES)
+    ]
+    return files, frames
+
+def make_cj_files(frames, fmt='xlsx', parts=2, seed=0):
+    """CJ 배송 실적 파일을 parts개로 나눠 생성"""
+    cj_df = make_cj_frame(frames, seed=seed)
+    bounds = np.linspace(0, len(cj_df), parts + 1).astype(int)
+    return [
+        (f"CJ대한통운_실적_{i + 1}.{fmt}", write_frame(cj_df.iloc[bounds[i]:bounds[i + 1]], fmt))
+        for i in range(parts)
+    ]
+
+def make_paste_text(rows, seed=0):
+    """품목별 판매 집계 입력 (헤더 + '상품명\\t수량' 행)"""
+    rng = np.random.default_rng(seed)
+    names = _choice(rng, PASTE_NAMES, rows)
+    quantities = rng.integers(1, 6, rows)
+    return "상품명\t수량\n" + "\n".join(f"{name}\t{qty}" for name, qty in zip(names, quantities))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="벤치마크용 마켓/CJ 파일 생성")
+    parser.add_argument('--rows', type=int, default=1000, help="마켓 파일별 주문 행 수")
+    parser.add_argument('--format', choices=FORMATS, default='xlsx')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default='benchmark_fixtures', help="저장 폴더")
+    args = parser.parse_args(argv)
+
+    output_dir = Path(args.output)
+    (output_dir / 'markets').mkdir(parents=True, exist_ok=True)
+    (output_dir / 'cj').mkdir(parents=True, exist_ok=True)
+
+    market_files, frames = make_market_files(args.rows, args.format, args.seed)
+    for name, content in market_files:
+        (output_dir / 'markets' / name).write_bytes(content)
+    for name, content in make_cj_files(frames, args.format, seed=args.seed):
+        (output_dir / 'cj' / name).write_bytes(content)
+    print(f"✅ {output_dir} 에 마켓 파일 {len(market_files)}개와 CJ 파일 생성 ({args.rows}행, {args.format})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,12 @@
+"""자동 발주 파일 생성기 핵심 로직 (Streamlit 의존성 없음)"""
+from .config import MARKET_CONFIG
+from .consolidate import consolidate_order_mgmt, consolidate_orders
+from .excel import add_invoice_to_coupang, apply_text_format_to_excel_bytes, sort_xlsx_preserving_format
+from .invoices import InvoiceStore
+from .jobs import JobRunner, job_runner
+from .markets import detect_market, extract_order_rows, process_data, read_order_table
+from .naver import build_naver_delivery_file, create_naver_delivery_file, find_naver_delivery_template
+from .order_store import OrderStore
+from .pipeline import build_invoice_map, build_order_file, build_order_management, build_order_table, output_filenames
+from .products import code_to_item, identify_product
+from .sales import PasteAggregator, parse_pasted_sales
@@ -0,0 +1,151 @@
+"""단계별 결과 캐시
+
+순수 단계(파일별 감지/파싱/매핑, 송장번호 추출, 통합 결과)의 결과를 입력 내용 해시 + 파이프라인
+버전으로 저장한다. 메모리 LRU(크기/만료 시간 제한)를 기본으로 쓰고, 디렉터리를 지정하면 디스크에도
+저장해 CLI를 다시 실행할 때도 재사용한다. Streamlit에서는 서버 프로세스 안의 모든 세션/재실행과
+작업 스레드가 공유하므로 메모리 LRU는 잠금 안에서만 바꾼다.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+from .config import RESULT_CACHE_DIR, RESULT_CACHE_SIZE, RESULT_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+# 단계 결과 형식이나 처리 규칙이 바뀌면 올려서 이전 캐시를 무효화
+PIPELINE_VERSION = '4'
+
+
+def cache_key(stage, *parts):
+    """단계 이름 + 파이프라인 버전 + 입력(bytes/문자열/DataFrame 등)의 sha256"""
+    digest = hashlib.sha256(f'{PIPELINE_VERSION}\0{stage}'.encode('utf-8'))
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            digest.update(repr(list(part.columns)).encode('utf-8'))
+            try:
+                part = pd.util.hash_pandas_object(part, index=False).values.tobytes()
+            except TypeError:
+                # 해시할 수 없는 값(리스트 등)이 섞인 경우
+                part = pickle.dumps(part, protocol=pickle.HIGHEST_PROTOCOL)
+        elif not isinstance(part, bytes):
+            part = repr(part).encode('utf-8')
+        digest.update(len(part).to_bytes(8, 'little'))
+        digest.update(part)
+    return digest.hexdigest()
+
+def _copy_result(value):
+    # 호출한 쪽에서 결과를 수정해도 캐시가 바뀌지 않도록 복사
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    if isinstance(value, list):
+        return [_copy_result(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_copy_result(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _copy_result(item) for key, item in value.items()}
+    return value
+
+def _mtime(path):
+    # 다른 스레드/프로세스가 먼저 지운 파일은 가장 오래된 것으로
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return 0
+
+
+class ResultCache:
+    """크기 제한 LRU + 만료 시간(TTL) 캐시. directory가 있으면 pickle 파일로도 저장"""
+
+    def __init__(self, max_entries=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL, directory=RESULT_CACHE_DIR):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.directory = Path(directory) if directory else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return self.directory / f'{key}.pkl'
+
+    def get(self, key):
+        """캐시된 결과의 복사본 (없거나 만료되면 None)"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] > self.ttl:
+                    del self._entries[key]
+                    entry = None
+                else:
+                    self._entries.move_to_end(key)
+        if entry is not None:
+            return _copy_result(entry[1])
+
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            stored_at = path.stat().st_mtime
+            if now - stored_at > self.ttl:
+                path.unlink(missing_ok=True)
+                return None
+            with path.open('rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"캐시 파일을 읽지 못했습니다 ({path.name}): {e}")
+            return None
+        self._remember(key, value, stored_at)
+        return _copy_result(value)
+
+    def put(self, key, value):
+        self._remember(key, _copy_result(value), time.time())
+        if self.directory is None:
+            return
+        try:
+            # 주문 데이터가 들어가므로 실행 사용자만 읽을 수 있게
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            tmp_path = self._path(key).with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            with tmp_path.open('wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+            self._prune_directory()
+        except Exception as e:
+            logger.warning(f"캐시 파일을 저장하지 못했습니다: {e}")
+
+    def _remember(self, key, value, stored_at):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (stored_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _prune_directory(self):
+        # 오래된 파일부터 지워 max_entries개만 유지
+        files = sorted(self.directory.glob('*.pkl'), key=_mtime)
+        for path in files[:max(0, len(files) - self.max_entries)]:
+            path.unlink(missing_ok=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.directory is not None and self.directory.exists():
+            for path in self.directory.glob('*.pkl'):
+                path.unlink(missing_ok=True)
+
+
+result_cache = ResultCache()
+
+
+def clear_result_cache():
+    result_cache.clear()
@@ -0,0 +1,188 @@
+"""배치 CLI: 마켓 주문 파일 폴더 + CJ택배 파일 → 발주/주문관리/발송 파일 일괄 생성
+
+    python -m delivery_helper 주문폴더/ --cj CJ_0210.xlsx -o 출력폴더/
+"""
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+from .cache import result_cache
+from .config import INVOICE_DB_PATH, ORDER_DB_PATH
+from .invoices import InvoiceStore
+from .order_store import OrderStore
+from .pipeline import build_order_file, build_order_management, now_kst, output_filenames
+from .timing import STAGE_LABELS, total_seconds
+
+SUPPORTED_EXTENSIONS = ('.xlsx', '.xls', '.csv')
+
+
+def _collect_files(paths):
+    files = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            candidates = sorted(p for p in path.iterdir() if p.suffix.lower() in SUPPORTED_EXTENSIONS)
+        else:
+            candidates = [path]
+        for candidate in candidates:
+            # 엑셀이 열려 있을 때 생기는 잠금 파일(~$...) 제외
+            if candidate.name.startswith('~$'):
+                continue
+            files.append((candidate.name, candidate.read_bytes()))
+    return files
+
+def _write(output_dir, file_name, data):
+    path = output_dir / file_name
+    path.write_bytes(data)
+    print(f"  ✅ {path}")
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='delivery_helper',
+        description='마켓 주문 파일을 CJ택배 발주 파일로 통합하고, CJ 송장번호로 주문관리/발송 파일을 생성합니다.'
+    )
+    parser.add_argument('market_paths', nargs='*', help='마켓 주문 파일 또는 파일이 있는 폴더')
+    parser.add_argument('--cj', nargs='+', default=[], metavar='PATH',
+                        help='CJ택배 배송 실적 파일 또는 폴더 (지정 시 주문관리시트/발송 파일 생성)')
+    parser.add_argument('-o', '--output-dir', default='.', help='출력 폴더 (기본: 현재 폴더)')
+    parser.add_argument('--invoice-db', default=INVOICE_DB_PATH, metavar='PATH',
+                        help=f'CJ 송장번호 인덱스(SQLite) 위치 (기본: {INVOICE_DB_PATH})')
+    parser.add_argument('--no-invoice-db', action='store_true',
+                        help='송장번호 인덱스를 쓰지 않고 이번에 지정한 CJ 파일만으로 매칭')
+    parser.add_argument('--order-db', default=ORDER_DB_PATH, metavar='PATH',
+                        help=f'발주 기록(SQLite) 위치. 이미 발주한 주문 라인은 발주 파일에서 제외 (기본: {ORDER_DB_PATH})')
+    parser.add_argument('--no-order-db', action='store_true',
+                        help='발주 기록을 쓰지 않고 이번에 지정한 주문 파일 전체로 발주 파일 생성')
+    parser.add_argument('--undo-batch', type=int, metavar='ID',
+                        help='발주 기록에서 배치 하나를 취소 (그 배치의 주문 라인은 다시 발주 대상이 됨)')
+    parser.add_argument('-j', '--workers', type=int, default=None, metavar='N',
+                        help='마켓 파일 병렬 파싱 프로세스 수 (기본: CPU 수, 1이면 순차 처리)')
+    parser.add_argument('--cache-dir', metavar='PATH',
+                        help='단계별 결과 캐시 폴더 (지정 시 재실행할 때 바뀐 파일만 다시 처리. 환경변수 DELIVERY_HELPER_CACHE_DIR)')
+    parser.add_argument('--timings', action='store_true', help='단계별 처리 시간 출력')
+    parser.add_argument('--timings-json', metavar='PATH', help='단계별 처리 시간 레코드를 JSON으로 저장')
+    parser.add_argument('--naver-template', metavar='PATH', help='네이버 엑셀발송 양식 (기본: sample_data 공식 샘플)')
+    return parser
+
+def _print_timings(title, records):
+    print(f"⏱️ {title} 처리 성능 (총 {total_seconds(records):.2f}초)")
+    for r in records:
+        label = STAGE_LABELS.get(r['stage'], r['stage']) + (' (캐시)' if r['cached'] else '')
+        rows = '' if r['rows_out'] is None else f" | {r['rows_out']}행"
+        print(f"  {label}: {r['seconds']:.3f}초{rows}")
+
+def _report_timings(args, timings):
+    if args.timings:
+        for title, key in (('발주 파일', 'order'), ('주문관리시트', 'order_mgmt')):
+            if timings.get(key):
+                _print_timings(title, timings[key])
+    if args.timings_json:
+        Path(args.timings_json).write_text(json.dumps(timings, ensure_ascii=False, indent=2), encoding='utf-8')
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(message)s')
+    if args.undo_batch is not None:
+        return _undo_batch(args)
+    if not args.market_paths:
+        parser.error('마켓 주문 파일 또는 폴더를 지정하세요')
+
+    # 단계별 처리 시간 레코드 {'order': [...], 'order_mgmt': [...]}
+    timings = {}
+    code = _run(args, timings)
+    _report_timings(args, timings)
+    return code
+
+def _undo_batch(args):
+    with OrderStore(args.order_db) as order_store:
+        removed = order_store.undo_batch(args.undo_batch)
+    print(f"↩️ 발주 기록 #{args.undo_batch} 취소: 주문 라인 {removed}건")
+    return 0
+
+def _run(args, timings):
+    if args.cache_dir:
+        result_cache.directory = Path(args.cache_dir)
+
+    market_files = _collect_files(args.market_paths)
+    if not market_files:
+        print("❌ 처리할 마켓 주문 파일이 없습니다.", file=sys.stderr)
+        return 1
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    names = output_filenames(now_kst())
+    on_error = lambda message: print(message, file=sys.stderr)
+
+    print(f"📂 마켓 파일 {len(market_files)}개 처리 중...")
+    if args.no_order_db:
+        order_result = build_order_file(market_files, on_error=on_error, workers=args.workers)
+    else:
+        with OrderStore(args.order_db) as order_store:
+            order_result = build_order_file(market_files, on_error=on_error, workers=args.workers,
+                                            order_store=order_store)
+    if order_result:
+        timings['order'] = order_result['timings']
+        if order_result['order_file']:
+            _write(output_dir, names['order'], order_result['order_file'])
+            if order_result['pending_batch']:
+                # 발주 파일을 저장한 뒤에 기록 (저장하지 못하면 다음 실행에서 다시 발주 대상)
+                with OrderStore(args.order_db) as order_store:
+                    batch_id = order_store.record(order_result['pending_batch'])
+                print(f"  발주 기록 #{batch_id} (취소: --undo-batch {batch_id})")
+        if order_result['coupang_sorted']:
+            _write(output_dir, names['coupang_sorted'], order_result['coupang_sorted'])
+        if order_result['skipped_count']:
+            print(f"  이미 발주한 주문 라인 {order_result['skipped_count']}건 제외")
+        changes = order_result['pending_batch']['quantity_changes'] if order_result['pending_batch'] else None
+        if changes is not None and not changes.empty:
+            print(f"  ⚠️ 이미 발주한 주문 라인 {len(changes)}건의 수량이 바뀜 (다시 발주하지 않음, 직접 처리 필요)")
+            for channel, order_no, product, option, old, new in changes.itertuples(index=False, name=None):
+                print(f"    {channel} {order_no} {product} {option}: {old} → {new}")
+        print(f"  총 주문 건수: {order_result['order_count']}건")
+    else:
+        print("❌ 처리할 수 있는 파일이 없습니다. 파일 형식을 확인해주세요.", file=sys.stderr)
+
+    if not args.cj:
+        return 0 if order_result else 1
+
+    cj_files = _collect_files(args.cj)
+    if not cj_files and args.no_invoice_db:
+        print("❌ CJ택배 파일이 없습니다.", file=sys.stderr)
+        return 1
+
+    naver_template = None
+    if args.naver_template:
+        template_path = Path(args.naver_template)
+        naver_template = (template_path.read_bytes(), template_path.name)
+
+    # 발주 파일을 만들 때 읽은 정규화 주문 테이블 재사용
+    order_table = order_result['order_table'] if order_result else None
+    print(f"🔗 CJ택배 파일 {len(cj_files)}개로 주문관리시트 생성 중...")
+    if args.no_invoice_db:
+        mgmt_result = build_order_management(
+            market_files, cj_files, naver_template=naver_template, on_error=on_error, workers=args.workers,
+            order_table=order_table
+        )
+    else:
+        with InvoiceStore(args.invoice_db) as invoice_store:
+            mgmt_result = build_order_management(
+                market_files, cj_files, naver_template=naver_template, on_error=on_error,
+                invoice_store=invoice_store, workers=args.workers, order_table=order_table
+            )
+            print(f"  송장번호 인덱스: CJ 파일 {len(invoice_store.files())}개, 송장 {len(invoice_store)}건")
+    if not mgmt_result:
+        print("❌ 처리할 수 있는 주문 데이터가 없습니다.", file=sys.stderr)
+        return 1
+    timings['order_mgmt'] = mgmt_result['timings']
+
+    _write(output_dir, names['order_mgmt'], mgmt_result['order_mgmt_file'])
+    if mgmt_result['coupang_delivery']:
+        _write(output_dir, names['coupang_delivery'], mgmt_result['coupang_delivery'])
+    naver_delivery = mgmt_result['naver_delivery']
+    if naver_delivery:
+        _write(output_dir, f"{names['naver_delivery']}.{naver_delivery['extension']}", naver_delivery['data'])
+    print(f"  총 {mgmt_result['count']}건 | 송장번호 매칭 {mgmt_result['matched']}건")
+    return 0
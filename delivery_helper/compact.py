@@ -0,0 +1,53 @@
+"""주문 DataFrame 메모리 압축 표현
+
+정규화 주문 테이블, 발주/주문관리 통합 전 데이터처럼 행이 많고 값이 반복되는 DataFrame을
+반복 값은 category, 나머지 텍스트는 Arrow 문자열, 정수는 작은 정수 dtype으로 바꾼다.
+값 자체는 그대로이므로 파이프라인 단계는 압축 여부와 관계없이 같은 결과를 낸다.
+"""
+import numpy as np
+import pandas as pd
+
+# 반복이 많은 컬럼 (채널/품목/날짜 등)
+CATEGORY_COLUMNS = ['채널', '품목', '상품명', '날짜']
+# 작은 정수 dtype으로 줄일 컬럼 (정수 값만 있을 때)
+SMALL_INT_COLUMNS = ['마켓순서', '수량']
+
+try:
+    import pyarrow  # noqa: F401
+
+    # pandas 3 기본 문자열과 같은 결측값(NaN) 의미의 Arrow 문자열 (pandas 2.3 이상)
+    TEXT_DTYPE = pd.StringDtype('pyarrow', na_value=np.nan)
+except (ImportError, TypeError):
+    TEXT_DTYPE = None
+
+
+def _is_text(values):
+    return pd.api.types.infer_dtype(values, skipna=True) in ('string', 'empty')
+
+def _downcast_int(values):
+    if pd.api.types.is_integer_dtype(values) or (
+        values.dtype == object and pd.api.types.infer_dtype(values, skipna=False) == 'integer'
+    ):
+        return pd.to_numeric(values, downcast='integer')
+    return values
+
+def compact_orders(df):
+    """주문 DataFrame을 압축 dtype으로 변환한 새 DataFrame (텍스트가 아닌 값이 섞인 컬럼은 그대로)"""
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            columns[col] = values
+        elif col in SMALL_INT_COLUMNS:
+            columns[col] = _downcast_int(values)
+        elif col in CATEGORY_COLUMNS and _is_text(values):
+            columns[col] = values.astype('category')
+        elif TEXT_DTYPE is not None and _is_text(values):
+            columns[col] = values.astype(TEXT_DTYPE)
+        else:
+            columns[col] = values
+    return pd.DataFrame(columns, index=df.index)
+
+def memory_usage(df):
+    """DataFrame 메모리 사용량 (bytes, 문자열 내용 포함)"""
+    return int(df.memory_usage(deep=True).sum())
@@ -0,0 +1,180 @@
+"""마켓/출력 파일 설정값"""
+import os
+from pathlib import Path
+
+MARKET_CONFIG = {
+    'naver': {'key': '스마트스토어', 'skip': 1, 'order': 1},
+    'coupang': {'key': 'DeliveryList', 'skip': 0, 'order': 2},
+    'own': {'key': 'orders', 'skip': 0, 'order': 3},
+    'esm': {'key': '신규주문', 'skip': 0, 'order': 4},
+    '11st': {'key': 'allList', 'skip': 2, 'order': 5},
+    '11st_manual': {'key': '11번가', 'skip': 0, 'order': 5},
+    'wadiz': {'key': '발송 처리용 주문', 'skip': 0, 'order': 6}
+}
+
+# 주문관리시트 채널명
+CHANNEL_NAMES = {
+    'naver': '네이버',
+    'coupang': '쿠팡',
+    'own': '자사몰',
+    'esm': '지마켓',
+    '11st': '11번가',
+    '11st_manual': '11번가',
+    'wadiz': '와디즈'
+}
+
+# 마켓별 원본 컬럼 (목록이면 처음 존재하는 컬럼 사용)
+# order_no 컬럼이 없으면 파일 처리 실패, 발주 파일은 REQUIRED_FIELDS 컬럼이 모두 필요
+# line_no는 주문 라인 고유번호 (네이버 상품주문번호). 없으면 발주 기록에서 상품(코드/상품명/옵션/수량)으로 라인을 구분
+# option은 선택 옵션 컬럼 (없으면 빈 값)
+MARKET_COLUMNS = {
+    'naver': {
+        'order_no': '주문번호', 'recipient': '수취인명', 'phone': '수취인연락처1', 'address': '통합배송지',
+        'quantity': '수량', 'sort_key': '상품명', 'product': '상품명', 'code': '판매자 상품코드',
+        'messages': ['배송메세지', '비고'], 'buyer': ['구매자명', '주문자명', '구매자', '주문자'],
+        'line_no': '상품주문번호', 'option': '옵션정보',
+    },
+    'coupang': {
+        'order_no': '주문번호', 'recipient': '수취인이름', 'phone': '수취인전화번호', 'address': '수취인 주소',
+        'quantity': '구매수(수량)', 'sort_key': '업체상품코드', 'product': '등록상품명', 'code': '업체상품코드',
+        'messages': ['배송메세지', '비고'], 'buyer': ['주문자명', '구매자', '주문자', '구매자명'],
+        'line_no': None, 'option': '등록옵션명',
+    },
+    'own': {
+        'order_no': '주문번호', 'recipient': '수령인', 'phone': '핸드폰', 'address': '주소',
+        'quantity': '수량', 'sort_key': '주문상품명', 'product': '주문상품명', 'code': None,
+        'messages': ['비고', '배송메세지'], 'buyer': ['주문자', '구매자', '주문자명', '구매자명'],
+        'line_no': None, 'option': ['옵션', '주문옵션', '옵션정보'],
+    },
+    'esm': {
+        'order_no': '주문번호', 'recipient': '수령인명', 'phone': '수령인 휴대폰', 'address': '주소',
+        'quantity': '수량', 'sort_key': '상품명', 'product': '상품명', 'code': None,
+        'messages': ['배송시 요구사항', '배송메세지', '비고'], 'buyer': ['주문자명', '구매자명', '주문자', '구매자'],
+        'line_no': None, 'option': ['옵션', '주문옵션', '옵션정보'],
+    },
+    '11st': {
+        'order_no': '주문번호', 'recipient': ['수취인', '받는분'], 'phone': ['휴대폰번호', '수취인연락처', '전화번호'],
+        'address': '주소', 'quantity': '수량', 'sort_key': '상품명', 'product': '상품명', 'code': None,
+        'messages': ['배송메시지', '배송메세지', '비고'], 'buyer': ['구매자', '주문자', '구매자명', '주문자명'],
+        'line_no': None, 'option': ['옵션', '옵션정보', '주문옵션'],
+    },
+    'wadiz': {
+        'order_no': '주문 번호', 'recipient': '받는 분', 'phone': '받는 분 연락처', 'address': '배송지 주소',
+        'quantity': '주문 수량', 'sort_key': '주문 상품', 'product': '주문 상품', 'code': None,
+        'messages': ['배송 요청 사항', '주문 요청 사항'],
+        'buyer': ['서포터 이름', '주문자', '구매자', '주문자명', '구매자명'], 'line_no': None,
+        'option': ['옵션', '주문 옵션', '리워드 옵션'],
+    },
+}
+MARKET_COLUMNS['11st_manual'] = MARKET_COLUMNS['11st']
+REQUIRED_FIELDS = ['order_no', 'recipient', 'phone', 'address', 'quantity', 'sort_key']
+
+# 헤더 시그니처(REQUIRED_FIELDS 컬럼)로 마켓을 감지할 때 확인 순서와 앞부분 행 수
+# 11번가는 파일명이 다른 주문시트도 헤더로 감지되므로 '11st_manual'로 분류
+HEADER_DETECT_MARKETS = ['wadiz', 'naver', 'coupang', 'own', 'esm', '11st_manual']
+HEADER_SCAN_ROWS = 20
+
+# 정규화 주문 테이블 컬럼 (주문 라인당 1행, 발주 파일/주문관리시트 공통 원본)
+ORDER_TABLE_COLUMNS = [
+    '채널', '마켓순서', '주문번호', '상품주문번호', '고객주문번호', '상품명_원문', '품목', '내부정렬키',
+    '수량', '주문인', '수취인', '전화번호', '주소', '배송메세지', '옵션'
+]
+
+# 주문관리시트 채널별 마켓 순서 (발주 파일과 동일)
+CHANNEL_ORDER = {
+    '네이버': 1,
+    '쿠팡': 2,
+    '자사몰': 3,
+    '옥션': 4,
+    '지마켓': 4,
+    '11번가': 5,
+    '와디즈': 6
+}
+
+# 품목명 정렬 순서 (IH_Re → OH → OH_Re → PH → PH_Re → SH → SH_Re → 기타)
+ITEM_SORT_ORDER = {'IH_RE': 0, 'OH': 1, 'OH_RE': 2, 'PH': 3, 'PH_RE': 4, 'SH': 5, 'SH_RE': 6}
+
+# 품목별 판매 집계 표시 순서
+PRODUCT_SUMMARY_ORDER = {
+    'IH_Re': 0,
+    'OH': 1,
+    'OH_Re': 2,
+    'PH': 3,
+    'PH_Re': 4,
+    'SH': 5,
+    'SH_Re': 6,
+    '케이블(일반)': 7,
+    '케이블s': 8,
+    '휴대폰거치대': 9,
+    '차량번호판': 10,
+    '차량용망치': 11,
+    '도막측정기': 12
+}
+
+# 쿠팡 발송 파일에 여러 DeliveryList를 합칠 때 같은 주문 라인으로 보는 컬럼 (있는 컬럼만 사용)
+COUPANG_LINE_KEY_COLUMNS = ['주문번호', '옵션ID', '노출상품ID', '업체상품코드', '등록상품명', '등록옵션명']
+
+# 텍스트 서식으로 저장할 컬럼 키워드
+PHONE_KEYWORDS = ['전화', '연락처', '휴대폰']
+
+ORDER_FILE_COLUMNS = ['고객주문번호', '받는분성명', '받는분전화번호', '받는분주소(전체, 분할)', '배송메세지1', '품목명', '기타1']
+
+NAVER_DELIVERY_TEMPLATE_NAME = "excelUploadSample.xls"
+NAVER_DELIVERY_COLUMNS = ['상품주문번호', '배송방법', '택배사', '송장번호']
+NAVER_DELIVERY_COLUMN_ALIASES = {
+    '상품주문번호': ['상품주문번호'],
+    '배송방법': ['배송방법', '배송 방법'],
+    '택배사': ['택배사', '택배사명'],
+    '송장번호': ['송장번호', '운송장번호']
+}
+NAVER_DELIVERY_METHOD = "택배,등기,소포"
+NAVER_DELIVERY_COMPANY = "CJ대한통운"
+NAVER_DELIVERY_XLS_MIME = "application/vnd.ms-excel"
+NAVER_DELIVERY_XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+XLSX_MIME = NAVER_DELIVERY_XLSX_MIME
+
+# CJ택배 송장번호 인덱스(SQLite) 위치. 환경변수 DELIVERY_HELPER_INVOICE_DB로 변경 가능
+INVOICE_DB_PATH = os.environ.get(
+    'DELIVERY_HELPER_INVOICE_DB',
+    str(Path.home() / '.delivery_helper' / 'invoices.sqlite3')
+)
+
+# 발주 기록(SQLite) 위치와 보관 일수. 보관 중인 주문 라인은 겹치는 주문 파일을 다시 올려도 발주 파일에 넣지 않음
+# 환경변수 DELIVERY_HELPER_ORDER_DB로 변경 가능
+ORDER_DB_PATH = os.environ.get(
+    'DELIVERY_HELPER_ORDER_DB',
+    str(Path.home() / '.delivery_helper' / 'orders.sqlite3')
+)
+ORDER_DB_KEEP_DAYS = 14
+
+# 마켓 파일 파싱 프로세스 수 (0이면 CPU 수만큼, 1이면 순차 처리). 환경변수 DELIVERY_HELPER_WORKERS로 변경 가능
+PARSE_WORKERS = int(os.environ.get('DELIVERY_HELPER_WORKERS', 0))
+# 자동 설정일 때 업로드 합계가 이보다 작으면 순차 처리. 프로세스 시작(약 0.05초)과 결과 전달(파싱 시간의
+# 약 10%), 부모 프로세스에서 네이버/쿠팡 파일을 다시 읽는 비용 때문에 코어 2~4개에서는 수 MB 이상부터 이득
+# (xlsx 약 1.7MB/초 기준)
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+
+# 엑셀(xlsx/xls) 읽기 엔진. 'auto'면 python-calamine이 설치돼 있을 때 사용하고 없으면 기본 엔진
+# (xlsx: openpyxl, xls: xlrd), 'calamine'/'default'로 고정 가능. 환경변수 DELIVERY_HELPER_READER_ENGINE로 변경 가능
+READER_ENGINE = os.environ.get('DELIVERY_HELPER_READER_ENGINE', 'auto')
+
+# 주문 통합(그룹핑/품목 문자열/정렬) 엔진. 'polars'면 polars가 설치되어 있을 때 Polars 지연 실행 사용
+# (결과는 'pandas'와 동일). 환경변수 DELIVERY_HELPER_ENGINE로 변경 가능
+PIPELINE_ENGINE = os.environ.get('DELIVERY_HELPER_ENGINE', 'pandas')
+
+# 단계별 결과 캐시 (입력 내용 해시 기준). 디렉터리를 지정하면 디스크에도 저장해 CLI 재실행 간에도 재사용
+RESULT_CACHE_SIZE = 128
+RESULT_CACHE_TTL = 6 * 60 * 60  # 초
+RESULT_CACHE_DIR = os.environ.get('DELIVERY_HELPER_CACHE_DIR')
+
+# 앱 백그라운드 작업. 끝난 작업 결과는 입력 해시 기준으로 보관해 다시 실행/재접속 시 재사용
+# 결과에는 고객 이름/연락처/주소가 들어 있으므로 기본은 메모리에만 보관하고, 환경변수
+# DELIVERY_HELPER_JOB_DIR로 디렉터리를 지정했을 때만 디스크에도 저장 (서버 재시작 후에도 재사용)
+# 작업 스레드 수는 서버의 모든 세션이 함께 쓰므로 한 사용자의 큰 작업이 다른 작업을 막지 않도록 여러 개
+# (환경변수 DELIVERY_HELPER_JOB_WORKERS)
+JOB_WORKERS = int(os.environ.get('DELIVERY_HELPER_JOB_WORKERS', 4))
+JOB_HISTORY_SIZE = 32  # 메모리에 남길 작업 수
+JOB_ARTIFACT_DIR = os.environ.get('DELIVERY_HELPER_JOB_DIR') or None
+JOB_ARTIFACT_SIZE = 32
+JOB_ARTIFACT_TTL = 24 * 60 * 60  # 초
+JOB_POLL_SECONDS = 1  # 진행 상황 표시 부분(fragment)만 다시 그리는 주기
@@ -0,0 +1,156 @@
+"""동일 배송지/주문번호 단위 주문 통합"""
+import numpy as np
+import pandas as pd
+
+from .config import CHANNEL_ORDER, ITEM_SORT_ORDER
+
+
+def consolidate(group):
+    prod_counts = group.groupby('품목')['수량'].sum().reset_index()
+    def sort_key(item):
+        return (ITEM_SORT_ORDER.get(str(item).upper(), 7), str(item))
+
+    formatted = [f"{row['품목']} {int(row['수량'])}개" if row['수량'] > 1 else str(row['품목'])
+                 for _, row in prod_counts.iterrows()]
+    formatted.sort(key=lambda x: sort_key(x.split(' ')[0]))
+
+    non_empty_msgs = group['배송메세지'][group['배송메세지'] != ""].unique()
+    final_msg = non_empty_msgs[0] if len(non_empty_msgs) > 0 else ""
+
+    return {
+        '고객주문번호': group.iloc[0]['고객주문번호'],
+        '받는분성명': group.iloc[0]['받는분성명'],
+        '받는분전화번호': group.iloc[0]['받는분전화번호'],
+        '받는분주소': group.iloc[0]['받는분주소'],
+        '배송메세지': final_msg,
+        '품목명': ", ".join(formatted),
+        '기타1': group['수량'].sum(),
+        '마켓순서': group.iloc[0]['마켓순서'],
+        '최종정렬키': group['내부정렬키'].min()
+    }
+
+RECIPIENT_KEYS = ['받는분성명', '받는분전화번호', '받는분주소']
+FIRST_ROW_COLUMNS = ['고객주문번호', '받는분성명', '받는분전화번호', '받는분주소', '마켓순서']
+
+
+def _format_item_counts(items, qty):
+    """(품목, 수량) → 'OH 2개' / 'PH' 형식 문자열"""
+    labels = items.astype(str)
+    multiple = qty > 1
+    labels = labels.where(~multiple, labels + " " + qty.where(multiple, 0).astype('int64').astype(str) + "개")
+    return labels.astype(object)
+
+def _join_sorted_groups(group_ids, labels):
+    """그룹 id 순으로 정렬된 라벨을 그룹마다 ', '로 연결"""
+    group_ids = np.asarray(group_ids)
+    labels = np.asarray(labels, dtype=object)
+    if len(group_ids) == 0:
+        return pd.Series(dtype=object)
+    starts = np.flatnonzero(np.r_[True, group_ids[1:] != group_ids[:-1]])
+    ends = np.r_[starts[1:], len(group_ids)]
+    return pd.Series([", ".join(labels[s:e]) for s, e in zip(starts, ends)], index=group_ids[starts], dtype=object)
+
+def _group_min(group_ids, values):
+    """문자열 컬럼의 그룹별 최솟값 (정렬된 코드로 계산해 파이썬 비교 루프를 피함)"""
+    codes, uniques = pd.factorize(values, sort=True)
+    codes = pd.Series(np.where(codes < 0, len(uniques), codes), index=values.index)
+    min_codes = codes.groupby(group_ids).min()
+    padded = np.append(np.asarray(uniques, dtype=object), np.nan)
+    return pd.Series(padded[min_codes.to_numpy()], index=min_codes.index, dtype=object)
+
+def consolidate_orders(full_df):
+    """받는분(성명, 전화번호, 주소)별로 통합한 CJ 발주 데이터 반환
+
+    consolidate()를 그룹마다 호출하는 것과 같은 결과를 그룹 연산 몇 번으로 계산한다.
+    """
+    group_ids = full_df.groupby(RECIPIENT_KEYS, sort=False).ngroup()
+    df = full_df[group_ids.notna()].assign(_group=group_ids.dropna().astype('int64'))
+    group_index = pd.RangeIndex(df['_group'].max() + 1 if len(df) else 0)
+
+    # 그룹 첫 행 값 (iloc[0]과 동일)
+    first_rows = df[~df['_group'].duplicated()].set_index('_group')[FIRST_ROW_COLUMNS]
+
+    # 품목별 수량 합계 (그룹 × 품목), 품목명 정렬 후 IH_Re → OH → … → SH_Re → 기타 순으로 안정 정렬
+    item_counts = (
+        df[df['품목'].notna()]
+        .groupby(['_group', '품목'], observed=True)['수량'].sum()
+        .reset_index()
+    )
+    item_counts['label'] = _format_item_counts(item_counts['품목'], item_counts['수량'])
+    # 정렬 기준은 'OH 2개'의 첫 단어 = 품목명의 첫 단어 (고유 품목마다 한 번만 계산)
+    item_codes, unique_items = pd.factorize(item_counts['품목'])
+    tokens = np.array([str(item).split(' ')[0] for item in unique_items], dtype=object)
+    ranks = np.array([ITEM_SORT_ORDER.get(token.upper(), 7) for token in tokens])
+    item_counts['token'] = tokens[item_codes]
+    item_counts['rank'] = ranks[item_codes]
+    item_counts = item_counts.sort_values(['_group', 'rank', 'token'], kind='stable')
+    item_names = _join_sorted_groups(item_counts['_group'], item_counts['label'])
+
+    # 비어 있지 않은 첫 배송메세지
+    messages = df.loc[df['배송메세지'] != "", ['_group', '배송메세지']].groupby('_group')['배송메세지'].first()
+
+    final_df = pd.DataFrame({
+        '고객주문번호': first_rows['고객주문번호'],
+        '받는분성명': first_rows['받는분성명'],
+        '받는분전화번호': first_rows['받는분전화번호'],
+        '받는분주소': first_rows['받는분주소'],
+        '배송메세지': messages.reindex(group_index, fill_value=""),
+        '품목명': item_names.reindex(group_index, fill_value=""),
+        '기타1': df.groupby('_group')['수량'].sum(),
+        '마켓순서': first_rows['마켓순서'],
+        '최종정렬키': _group_min(df['_group'], df['내부정렬키'])
+    }, index=group_index)
+    return final_df.sort_values(by=['마켓순서', '최종정렬키'])
+
+# IH_Re, OH, OH_Re, PH, PH_Re, SH, SH_Re 순서로 정렬
+def get_sort_priority(prod_name):
+    prod_upper = str(prod_name).strip().upper()
+    return (ITEM_SORT_ORDER.get(prod_upper, 7), prod_name)
+
+ORDER_KEYS = ['채널', '주문번호']
+
+
+def consolidate_order_mgmt(mgmt_df):
+    """(채널, 주문번호)별로 제품을 통합한 주문관리시트 데이터 반환
+
+    주문별 품목 문자열("OH 2개, PH"), 총 수량, 첫 행 값, 마켓순서/상품순서를 그룹 연산 몇 번으로 계산한다.
+    """
+    group_ids = mgmt_df.groupby(ORDER_KEYS, observed=True).ngroup()
+    df = mgmt_df.assign(_group=group_ids.to_numpy())
+    group_index = pd.RangeIndex(df['_group'].max() + 1 if len(df) else 0)
+    first_rows = df[~df['_group'].duplicated()].set_index('_group').reindex(group_index)
+
+    # 주문 × 제품별 수량 합계 (빈 수량이 섞이면 합계도 비어 있는 것으로 처리)
+    item_keys = [df['_group'], df['상품명']]
+    item_counts = df['수량'].groupby(item_keys, dropna=False, observed=True).sum().reset_index()
+    has_missing_qty = df['수량'].isna().groupby(item_keys, dropna=False, observed=True).any()
+    item_counts.loc[has_missing_qty.to_numpy(), '수량'] = np.nan
+    item_counts['label'] = _format_item_counts(item_counts['상품명'], item_counts['수량'])
+
+    # IH_Re → OH → … → SH_Re → 기타, 같은 순위는 제품명 순 (고유 제품마다 한 번만 계산)
+    item_codes, unique_items = pd.factorize(item_counts['상품명'], use_na_sentinel=False)
+    ranks = np.array([get_sort_priority(item)[0] for item in unique_items], dtype='int64')
+    item_counts['rank'] = ranks[item_codes]
+    item_counts = item_counts.sort_values(['_group', 'rank', '상품명'], kind='stable')
+
+    consolidated = pd.DataFrame({
+        '날짜': first_rows['날짜'],
+        '채널': first_rows['채널'],
+        '주문번호': first_rows['주문번호'],
+        '상품명': _join_sorted_groups(item_counts['_group'], item_counts['label']).reindex(group_index),
+        '수량': df.groupby('_group')['수량'].sum().astype('int64'),
+        '주문인': first_rows['주문인'],
+        '수취인': first_rows['수취인'],
+        '전화번호': first_rows['전화번호'],
+        '주소': first_rows['주소'],
+        '비고': first_rows['비고'],
+        '송장번호': first_rows['송장번호'],
+        '마켓순서': first_rows['채널'].astype(object).map(CHANNEL_ORDER).fillna(99).astype('int64'),
+        '상품순서': item_counts.groupby('_group')['rank'].first()
+    }, index=group_index)
+
+    # 발주파일과 같은 순서로 정렬: 마켓 → 상품
+    consolidated = consolidated.sort_values(by=['마켓순서', '상품순서'])
+    # 정렬용 컬럼 제거
+    consolidated = consolidated.drop(columns=['마켓순서', '상품순서'])
+    return consolidated
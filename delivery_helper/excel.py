@@ -0,0 +1,92 @@
+"""엑셀 출력 파일 생성 및 서식 처리"""
+import io
+import logging
+
+import numpy as np
+import pandas as pd
+from openpyxl.compat import safe_string
+from openpyxl.compat.numbers import NUMERIC_TYPES
+
+from .config import COUPANG_LINE_KEY_COLUMNS, PHONE_KEYWORDS
+from .xlsx_patch import _text_format_columns, patch_xlsx
+
+logger = logging.getLogger(__name__)
+
+
+def sort_xlsx_preserving_format(file_content, target_col_name, keyword_cols=None):
+    """원본 서식을 유지하며 업체상품코드 기준으로 정렬 (keyword_cols 컬럼은 텍스트 서식)"""
+    try:
+        return patch_xlsx(file_content, sort_by=target_col_name, keyword_cols=keyword_cols)
+    except Exception:
+        return None
+
+def apply_text_format_to_excel_bytes(file_bytes, target_cols=None, keyword_cols=None):
+    try:
+        return patch_xlsx(file_bytes, target_cols=target_cols, keyword_cols=keyword_cols)
+    except Exception:
+        return file_bytes
+
+def _to_text_cell_value(value):
+    # 저장 후 다시 읽어 str()한 값과 같도록 변환 (빈 값은 그대로)
+    if value is None or (not isinstance(value, str) and pd.isna(value)) or value == "":
+        return value
+    if isinstance(value, (bool, np.bool_)):
+        return str(bool(value))
+    if isinstance(value, NUMERIC_TYPES):
+        # openpyxl은 숫자를 '%.16g'로 저장하고 소수점/지수가 있으면 float로 읽는다
+        text = safe_string(value)
+        return str(float(text)) if any(ch in text for ch in '.eE') else text
+    return str(value)
+
+def dataframe_to_excel_bytes(df, columns=None, target_cols=None, keyword_cols=None):
+    """DataFrame을 xlsx로 저장하면서 전화/연락처 컬럼을 텍스트 서식으로 지정 (저장 후 다시 읽지 않음)"""
+    if columns is not None:
+        df = df[columns]
+
+    text_cols = _text_format_columns(list(df.columns), target_cols=target_cols, keyword_cols=keyword_cols)
+    if text_cols:
+        df = df.copy()
+        for col_idx in text_cols:
+            df.isetitem(col_idx - 1, df.iloc[:, col_idx - 1].map(_to_text_cell_value).astype(object))
+
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False)
+        ws = writer.sheets['Sheet1']
+        for col_idx in text_cols:
+            for row_idx in range(2, ws.max_row + 1):
+                ws.cell(row=row_idx, column=col_idx).number_format = '@'
+    return output.getvalue()
+
+def _find_header_row(ws, required_header):
+    for row_idx in range(1, min(ws.max_row, 20) + 1):
+        values = [cell.value for cell in ws[row_idx]]
+        if required_header in values:
+            return row_idx, values
+    return 1, [cell.value for cell in ws[1]]
+
+def _ensure_columns(ws, header_row_idx, header, columns):
+    header = list(header)
+    for col_name in columns:
+        if col_name not in header:
+            header.append(col_name)
+            ws.cell(row=header_row_idx, column=len(header), value=col_name)
+    return header
+
+def add_invoice_to_coupang(file_content, file_name, invoice_map, on_error=None, extra_files=()):
+    """쿠팡 파일에 운송장번호 추가 (서식 유지, 전화/연락처 컬럼은 텍스트 서식)
+
+    extra_files: 함께 합칠 다른 DeliveryList (파일명, 내용) 목록. 첫 파일 서식으로 행을 이어 붙이고
+    같은 주문 라인(COUPANG_LINE_KEY_COLUMNS)은 한 번만 남긴다.
+    """
+    try:
+        return patch_xlsx(
+            file_content, invoice_map=invoice_map, keyword_cols=PHONE_KEYWORDS,
+            append_contents=[content for _, content in extra_files], key_columns=COUPANG_LINE_KEY_COLUMNS
+        )
+    except Exception as e:
+        if on_error is not None:
+            on_error(f"쿠팡 정렬 중 오류: {e}")
+        else:
+            logger.warning(f"쿠팡 정렬 중 오류: {e}")
+        return None
@@ -0,0 +1,132 @@
+"""마켓 파일 병렬 파싱
+
+파일마다 마켓 감지 → 읽기 → 정규화 주문 테이블 생성이 독립적인 CPU 작업이므로 프로세스 풀에서 나눠 처리한다
+(메인 스레드에서 큰 입력을 처리할 때만, 앱 작업 스레드에서는 순차 처리).
+결과는 완료 순서와 관계없이 (마켓 순서, 업로드 순서)로 합친다.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from .cache import cache_key, result_cache
+from .config import CHANNEL_NAMES, PARALLEL_MIN_BYTES, PARSE_WORKERS
+from .markets import _report, read_order_table
+from .timing import SUB_STAGES
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_MARKET_ORDER = 99
+
+
+def _resolve_workers(workers, market_files):
+    # 프로세스 풀은 메인 스레드(CLI)에서만. 앱은 작업 스레드에서 실행되는데, 그때 fork하면 다른 스레드가
+    # 잡고 있던 잠금까지 복제되고 spawn은 워커마다 pandas 등을 다시 import해 순차 처리보다 훨씬 느리다
+    # (앱은 작업 스레드 여러 개로 세션끼리 이미 나눠 처리). 워커에서 읽은 파일은 부모의 읽기 캐시에
+    # 남지 않아 네이버/쿠팡 발송 파일을 만들 때 다시 읽으므로 이 비용도 감안한다.
+    if threading.current_thread() is not threading.main_thread():
+        return 1
+    workers = PARSE_WORKERS if workers is None else workers
+    if not workers:
+        if sum(len(content) for _, content in market_files) < PARALLEL_MIN_BYTES:
+            return 1
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, len(market_files)))
+
+def _parse_market_file(file_name, content):
+    """파일 하나 처리 (워커 프로세스에서 실행). (마켓 순서, 정규화 결과, 오류 메시지 목록) 반환"""
+    try:
+        parsed = read_order_table(file_name, content)
+    except Exception as e:
+        return UNKNOWN_MARKET_ORDER, None, [f"❌ {file_name} 처리 실패: {e}"]
+    if parsed is None:
+        return UNKNOWN_MARKET_ORDER, None, []
+    return parsed['order'], parsed, []
+
+def _report_file(progress, file_name, result, cached=False):
+    # 파일 하나의 처리 결과를 진행 상황으로 알림 (감지한 마켓, 읽은 행 수)
+    if progress is None:
+        return
+    _, parsed, errors = result
+    if parsed is not None:
+        progress(file_name, stage='완료 (캐시)' if cached else '완료',
+                 market=CHANNEL_NAMES.get(parsed['market'], parsed['market']), rows=len(parsed['table']))
+    else:
+        progress(file_name, stage='실패' if errors else '알 수 없는 파일')
+
+def parse_market_files(market_files, on_error=None, workers=None, timer=None, progress=None):
+    """마켓 파일들을 (가능하면 병렬로) 정규화 주문 테이블로 읽어 마켓 순서 → 업로드 순서로 반환
+
+    결과는 read_order_table의 dict 목록 (알 수 없는 마켓 파일은 제외).
+    발주 파일과 주문관리시트가 같은 결과를 쓰므로 같은 파일은 한 번만 파싱된다.
+    파일별 오류는 on_error로 알리고 나머지 파일은 계속 처리한다.
+    timer(StageTimer)를 주면 파싱 전체 시간과 새로 파싱한 파일의 감지/읽기/매핑 시간 합계를 기록한다.
+    progress(file_name, stage=…, market=…, rows=…)를 주면 파일마다 대기 → 파싱 중 → 완료/실패를 알린다.
+    """
+    start = time.perf_counter()
+    # 같은 내용(파일명 포함)의 파일은 캐시된 결과 사용, 나머지만 파싱
+    keys = [cache_key('order_table', file_name, content) for file_name, content in market_files]
+    results = [result_cache.get(key) for key in keys]
+    pending = [idx for idx, result in enumerate(results) if result is None]
+    for idx, (file_name, _) in enumerate(market_files):
+        if results[idx] is not None:
+            _report_file(progress, file_name, results[idx], cached=True)
+        elif progress is not None:
+            progress(file_name, stage='대기')
+    workers = _resolve_workers(workers, [market_files[idx] for idx in pending])
+
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(_parse_market_file, *market_files[idx]): idx
+                    for idx in pending
+                }
+                for idx in pending:
+                    if progress is not None:
+                        progress(market_files[idx][0], stage='파싱 중')
+                # 끝난 파일부터 진행 상황 알림
+                for future in as_completed(futures):
+                    idx = futures[future]
+                    try:
+                        results[idx] = future.result()
+                    except BrokenProcessPool:
+                        continue
+                    _report_file(progress, market_files[idx][0], results[idx])
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            logger.warning(f"병렬 처리를 사용할 수 없어 순차 처리합니다: {e}")
+
+    # 순차 처리 (워커 1개이거나 풀에서 처리하지 못한 파일)
+    for idx in pending:
+        if results[idx] is None:
+            if progress is not None:
+                progress(market_files[idx][0], stage='파싱 중')
+            results[idx] = _parse_market_file(*market_files[idx])
+            _report_file(progress, market_files[idx][0], results[idx])
+        result_cache.put(keys[idx], results[idx])
+
+    parsed = []
+    for idx in sorted(range(len(results)), key=lambda i: (results[i][0], i)):
+        _, result, errors = results[idx]
+        for message in errors:
+            _report(on_error, message)
+        if result is not None:
+            parsed.append(result)
+
+    if timer is not None:
+        _record_parse_timings(timer, market_files, results, pending, parsed, time.perf_counter() - start)
+    return parsed
+
+def _record_parse_timings(timer, market_files, results, pending, parsed, seconds):
+    rows = sum(len(p['table']) for p in parsed)
+    timer.add(
+        'parse', seconds, rows_out=rows, bytes_in=sum(len(content) for _, content in market_files),
+        cached=not pending
+    )
+    fresh = [results[idx][1] for idx in pending if results[idx][1] is not None]
+    if not fresh:
+        return
+    for stage in SUB_STAGES:
+        timer.add(stage, sum(p['timings'][stage] for p in fresh), rows_out=sum(len(p['table']) for p in fresh))
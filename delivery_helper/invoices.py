@@ -0,0 +1,121 @@
+"""CJ택배 송장번호 인덱스
+
+CJ 배송 실적 파일의 {고객주문번호: 운송장번호}를 로컬 SQLite에 누적 저장한다.
+이미 반영한 파일(내용 해시 기준)은 다시 읽지 않고, 송장번호 조회는 인덱스 쿼리로 처리한다.
+"""
+import hashlib
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from .config import INVOICE_DB_PATH
+from .reader import _read_tabular_file
+from .utils import normalize_excel_id
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cj_files (
+    file_hash TEXT PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    invoice_count INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS invoices (
+    order_no TEXT PRIMARY KEY,
+    invoice TEXT NOT NULL,
+    source_file TEXT NOT NULL,
+    file_hash TEXT NOT NULL
+);
+"""
+
+
+def read_invoice_pairs(file_content, file_name):
+    """CJ 파일 하나에서 (고객주문번호, 운송장번호) 목록 추출 (파일 내 행 순서 유지)"""
+    cj_df = _read_tabular_file(file_content, file_name)
+    cj_df.columns = cj_df.columns.astype(str).str.strip()
+    if '운송장번호' not in cj_df.columns or '고객주문번호' not in cj_df.columns:
+        return []
+
+    order_nos = cj_df['고객주문번호'].map(normalize_excel_id)
+    invoices = cj_df['운송장번호'].map(normalize_excel_id)
+    valid = (order_nos != '') & (invoices != '') & (invoices != 'nan')
+    return list(zip(order_nos[valid], invoices[valid]))
+
+
+class InvoiceStore:
+    """고객주문번호 → 운송장번호 인덱스 (dict처럼 get으로 조회)"""
+
+    def __init__(self, path=None):
+        self.path = str(path or INVOICE_DB_PATH)
+        if self.path != ':memory:':
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM invoices").fetchone()[0]
+
+    def __contains__(self, order_no):
+        return self.get(order_no) is not None
+
+    def get(self, order_no, default=None):
+        row = self._conn.execute(
+            "SELECT invoice FROM invoices WHERE order_no = ?", (str(order_no),)
+        ).fetchone()
+        return row[0] if row else default
+
+    def lookup(self, order_nos):
+        """여러 주문번호를 한 번에 조회해 {주문번호: 운송장번호} 반환 (없는 번호는 제외)"""
+        keys = list(dict.fromkeys(str(order_no) for order_no in order_nos))
+        found = {}
+        # SQLite 바인딩 변수 개수 제한 때문에 나눠서 조회
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            found.update(self._conn.execute(
+                f"SELECT order_no, invoice FROM invoices WHERE order_no IN ({placeholders})", chunk
+            ))
+        return found
+
+    def has_file(self, file_content):
+        file_hash = hashlib.sha256(file_content).hexdigest()
+        row = self._conn.execute("SELECT 1 FROM cj_files WHERE file_hash = ?", (file_hash,)).fetchone()
+        return row is not None
+
+    def files(self):
+        """반영된 CJ 파일 목록 [(파일명, 송장 수, 반영 시각)]"""
+        return self._conn.execute(
+            "SELECT file_name, invoice_count, ingested_at FROM cj_files ORDER BY ingested_at"
+        ).fetchall()
+
+    def ingest(self, cj_files):
+        """CJ 파일들을 인덱스에 반영하고 새로 반영한 파일 수 반환
+
+        같은 고객주문번호는 나중에 반영한 파일(목록 순서)의 운송장번호로 덮어쓴다.
+        """
+        added = 0
+        for file_name, content in cj_files:
+            file_hash = hashlib.sha256(content).hexdigest()
+            if self._conn.execute("SELECT 1 FROM cj_files WHERE file_hash = ?", (file_hash,)).fetchone():
+                continue
+
+            pairs = read_invoice_pairs(content, file_name)
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO invoices (order_no, invoice, source_file, file_hash) VALUES (?, ?, ?, ?)",
+                    [(order_no, invoice, file_name, file_hash) for order_no, invoice in pairs]
+                )
+                self._conn.execute(
+                    "INSERT INTO cj_files (file_hash, file_name, invoice_count, ingested_at) VALUES (?, ?, ?, ?)",
+                    (file_hash, file_name, len(pairs), datetime.now().isoformat(timespec='seconds'))
+                )
+            added += 1
+        return added
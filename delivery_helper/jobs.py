@@ -0,0 +1,172 @@
+"""백그라운드 작업 실행
+
+앱 버튼은 파이프라인을 스크립트 스레드에서 바로 돌리지 않고 작업(Job)으로 제출한다. 작업은 서버
+프로세스 안의 작업 스레드에서 실행되고, 화면은 세션별 작업 목록을 주기적으로 다시 그리며 진행 상황
+(파일별 감지 마켓, 읽은 행 수, 처리 단계)을 보여준다. 끝난 작업 결과는 입력 해시를 키로
+ResultCache에 보관해, 같은 입력으로 다시 실행하거나 재접속했을 때 다시 계산하지 않는다. 기본은 메모리에만
+보관하고 JOB_ARTIFACT_DIR을 지정했을 때만 디스크에도 저장한다.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from .cache import ResultCache
+from .config import JOB_ARTIFACT_DIR, JOB_ARTIFACT_SIZE, JOB_ARTIFACT_TTL, JOB_HISTORY_SIZE, JOB_WORKERS
+from .timing import STAGE_LABELS
+
+logger = logging.getLogger(__name__)
+
+FILE_TABLE_COLUMNS = ['파일', '마켓', '행 수', '상태']
+
+
+class Job:
+    """작업 하나의 상태 (작업 스레드가 갱신하고 화면 스레드가 읽음)
+
+    status: 'queued' → 'running' → 'done' / 'failed'. 작업 함수에는 이 객체가 넘어가며,
+    progress/set_stage/report를 파이프라인의 progress/on_stage/on_error 콜백으로 쓴다.
+    """
+
+    def __init__(self, key, label):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.label = label
+        self.status = 'queued'
+        self.stage = None
+        self.result = None
+        self.error = None
+        self.restored = False
+        self.created_at = time.time()
+        self.finished_at = None
+        self._files = OrderedDict()
+        self._messages = []
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed')
+
+    def progress(self, file_name, stage=None, market=None, rows=None):
+        """파일별 진행 상황 갱신 (parse_market_files의 progress 콜백)"""
+        with self._lock:
+            entry = self._files.setdefault(file_name, {'파일': file_name, '마켓': None, '행 수': None, '상태': None})
+            if stage is not None:
+                entry['상태'] = stage
+            if market is not None:
+                entry['마켓'] = market
+            if rows is not None:
+                entry['행 수'] = rows
+        if stage in ('대기', '파싱 중'):
+            # 파싱은 StageTimer 구간이 아니므로 파일 진행 상황으로 단계 표시
+            self.stage = 'parse'
+
+    def set_stage(self, stage):
+        """현재 처리 단계 (StageTimer의 on_stage 콜백)"""
+        self.stage = stage
+
+    def report(self, message):
+        """파이프라인 경고/오류 메시지 보관 (on_error 콜백)"""
+        with self._lock:
+            self._messages.append(message)
+
+    @property
+    def stage_label(self):
+        return STAGE_LABELS.get(self.stage, self.stage) if self.stage else '대기'
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.time()) - self.created_at
+
+    def messages(self):
+        with self._lock:
+            return list(self._messages)
+
+    def file_table(self):
+        """파일별 진행 상황 DataFrame (파일, 마켓, 행 수, 상태)"""
+        with self._lock:
+            rows = [dict(entry) for entry in self._files.values()]
+        return pd.DataFrame(rows, columns=FILE_TABLE_COLUMNS).astype({'행 수': 'Int64'})
+
+    def _artifact(self):
+        # 저장할 완료 결과 (작업 결과 + 진행 상황 + 메시지)
+        with self._lock:
+            return {'result': self.result, 'files': dict(self._files), 'messages': list(self._messages)}
+
+    def _restore(self, artifact):
+        self.result = artifact['result']
+        self._files = OrderedDict(artifact['files'])
+        self._messages = list(artifact['messages'])
+        self.status = 'done'
+        self.restored = True
+        self.finished_at = self.created_at
+
+
+class JobRunner:
+    """작업 스레드 풀 + 작업 목록 + 완료 결과 저장소
+
+    같은 키의 작업이 실행 중이면 새로 만들지 않고 그 작업을, 저장된 완료 결과가 있으면 바로 끝난
+    작업을 돌려준다. 메모리에는 최근 JOB_HISTORY_SIZE개 작업만 남긴다 (실행 중인 작업은 유지).
+    """
+
+    def __init__(self, workers=JOB_WORKERS, artifacts=None):
+        self.workers = workers
+        self.artifacts = artifacts if artifacts is not None else ResultCache(
+            max_entries=JOB_ARTIFACT_SIZE, ttl=JOB_ARTIFACT_TTL, directory=JOB_ARTIFACT_DIR
+        )
+        self._executor = None
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, key, func, label=''):
+        """func(job) → 결과를 작업 스레드에서 실행하고 Job 반환 (key: 입력 해시, cache.cache_key)"""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.key == key and not job.finished:
+                    return job
+            job = Job(key, label)
+            self._jobs[job.id] = job
+            self._prune()
+            artifact = self.artifacts.get(key)
+            if artifact is not None:
+                job._restore(artifact)
+                return job
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='delivery-job')
+        self._executor.submit(self._run, job, func)
+        return job
+
+    def get(self, job_id):
+        """작업 (없거나 목록에서 밀려났으면 None)"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, func):
+        job.status = 'running'
+        try:
+            job.result = func(job)
+        except Exception as e:
+            logger.exception("작업 실패: %s", job.label)
+            job.error = str(e)
+            job.status = 'failed'
+        else:
+            self.artifacts.put(job.key, job._artifact())
+            job.status = 'done'
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(self._jobs) - JOB_HISTORY_SIZE)]:
+            del self._jobs[job_id]
+
+    def clear(self):
+        with self._lock:
+            self._jobs = OrderedDict((job_id, job) for job_id, job in self._jobs.items() if not job.finished)
+        self.artifacts.clear()
+
+
+job_runner = JobRunner()
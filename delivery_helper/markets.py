@@ -0,0 +1,215 @@
+"""마켓 감지 및 마켓별 컬럼 매핑"""
+import logging
+import time
+
+import pandas as pd
+
+from .compact import compact_orders
+from .config import (
+    CHANNEL_NAMES,
+    HEADER_DETECT_MARKETS,
+    HEADER_SCAN_ROWS,
+    MARKET_COLUMNS,
+    MARKET_CONFIG,
+    ORDER_TABLE_COLUMNS,
+    REQUIRED_FIELDS,
+)
+from .products import classify_items
+from .reader import _read_tabular_file, read_upload_head
+from .utils import clean_phones, coalesce_messages, column_or_default, normalize_excel_id, pick_first_col
+
+logger = logging.getLogger(__name__)
+
+
+def _report(on_error, message):
+    if on_error is not None:
+        on_error(message)
+    else:
+        logger.error(message)
+
+def _header_signature(market_key):
+    # 발주 파일에 필요한 컬럼들 (후보 목록이면 그중 하나)
+    spec = MARKET_COLUMNS[market_key]
+    return [[spec[field]] if isinstance(spec[field], str) else spec[field] for field in REQUIRED_FIELDS]
+
+def _matches_signature(cols, market_key):
+    return all(any(col in cols for col in candidates) for candidates in _header_signature(market_key))
+
+def _header_cols(row):
+    return {str(value).strip() for value in row if not pd.isna(value)} - {''}
+
+def detect_market_by_columns(columns):
+    """헤더 컬럼이 어느 마켓 시그니처와 일치하는지 (없으면 None)"""
+    cols = _header_cols(columns)
+    for market_key in HEADER_DETECT_MARKETS:
+        if _matches_signature(cols, market_key):
+            return market_key
+    return None
+
+def find_header_row(rows, market_key=None):
+    """앞부분 행들에서 마켓 시그니처와 일치하는 헤더 행을 찾아 (market_key, 행 위치) 반환
+
+    market_key를 주면 그 마켓만 확인한다. 찾지 못하면 (None, None).
+    """
+    for offset, row in enumerate(rows):
+        cols = _header_cols(row)
+        if market_key is not None:
+            if _matches_signature(cols, market_key):
+                return market_key, offset
+        else:
+            detected = detect_market_by_columns(cols)
+            if detected:
+                return detected, offset
+    return None, None
+
+def detect_market(file_name, file_content):
+    """파일명 → 헤더 시그니처 순으로 마켓을 감지해 (market_key, config) 반환
+
+    파일 앞부분(HEADER_SCAN_ROWS행)만 읽어 헤더 행 위치를 찾고 config['skip']에 넣는다.
+    파일명으로 찾은 마켓의 헤더가 앞부분에 없으면 설정된 skip을 그대로 쓴다.
+    """
+    market_key, config = next(((k, v) for k, v in MARKET_CONFIG.items() if v['key'] in file_name), (None, None))
+
+    try:
+        head = read_upload_head(file_content, file_name, HEADER_SCAN_ROWS)
+    except Exception:
+        head = []
+
+    if market_key is None:
+        # 파일명으로 매칭되지 않는 경우 헤더 기반 탐지 (11번가 주문시트 등)
+        market_key, offset = find_header_row(head)
+        if market_key is None:
+            return 'unknown', {}
+        config = MARKET_CONFIG[market_key]
+    else:
+        _, offset = find_header_row(head, market_key)
+
+    if offset is not None and offset != config['skip']:
+        config = dict(config, skip=offset)
+    return market_key, config
+
+def read_market_frame(file_name, file_content, market_key, config, strip_columns=False):
+    """감지된 헤더 위치(config['skip'])에서 한 번만 읽어 DataFrame 반환"""
+    df = _read_tabular_file(file_content, file_name, skiprows=config.get('skip', 0))
+    if strip_columns:
+        df.columns = df.columns.astype(str).str.strip()
+    return df
+
+def _resolve_column(columns, candidates):
+    """후보 컬럼(문자열 또는 목록) 중 처음 존재하는 컬럼 (없으면 None)"""
+    if candidates is None:
+        return None
+    if isinstance(candidates, str):
+        candidates = [candidates]
+    return pick_first_col(columns, candidates)
+
+def _column_label(candidates):
+    # 컬럼이 없을 때 오류 메시지에 표시할 이름 (후보 목록이면 마지막 후보)
+    return candidates if isinstance(candidates, str) else candidates[-1]
+
+def read_order_table(file_name, content):
+    """마켓 주문 파일 → 정규화 주문 테이블 (주문 라인당 1행)
+
+    {'file_name', 'market', 'order', 'table', 'missing', 'timings'} 반환 (알 수 없는 마켓이면 None).
+    missing은 발주 파일에 필요한데 없는 원본 컬럼 목록이다 (주문관리시트는 빈 값으로 처리).
+    timings는 {'detect', 'read', 'map'} 단계별 처리 시간(초).
+    """
+    start = time.perf_counter()
+    market_key, config = detect_market(file_name, content)
+    detected = time.perf_counter()
+    if market_key == 'unknown':
+        return None
+
+    spec = MARKET_COLUMNS[market_key]
+    df = read_market_frame(file_name, content, market_key, config, strip_columns=True)
+    loaded = time.perf_counter()
+    cols = {field: _resolve_column(df.columns, candidates) for field, candidates in spec.items()}
+    if cols['order_no'] is None:
+        raise KeyError(_column_label(spec['order_no']))
+    missing = [_column_label(spec[field]) for field in REQUIRED_FIELDS if cols[field] is None]
+
+    order_nos = df[cols['order_no']].map(normalize_excel_id).astype(object)
+    channels = pd.Series(CHANNEL_NAMES.get(market_key, '기타'), index=df.index, dtype=object)
+    if market_key == 'esm':
+        # 주문번호 패턴으로 옥션/지마켓 구분
+        ten_digits = order_nos.str.len() == 10
+        channels[ten_digits & order_nos.str.startswith('2')] = '옥션'
+        channels[ten_digits & order_nos.str.startswith('4')] = '지마켓'
+
+    names = column_or_default(df, cols['product'], '')
+    codes = column_or_default(df, cols['code']) if spec['code'] else None
+    sort_keys = df[cols['sort_key']].astype(str) if cols['sort_key'] else ''
+
+    table = compact_orders(pd.DataFrame({
+        '채널': channels,
+        '마켓순서': config['order'],
+        '주문번호': order_nos,
+        '상품주문번호': df[cols['line_no']].map(normalize_excel_id).astype(object) if cols['line_no'] else '',
+        '고객주문번호': df[cols['order_no']].astype(str),
+        '상품명_원문': names.map(lambda name: str(name).strip()).astype(object),
+        '품목': classify_items(names, codes=codes),
+        '내부정렬키': sort_keys,
+        '수량': column_or_default(df, cols['quantity'], ''),
+        '주문인': column_or_default(df, cols['buyer'], ''),
+        '수취인': column_or_default(df, cols['recipient'], ''),
+        '전화번호': clean_phones(column_or_default(df, cols['phone'], '')),
+        '주소': column_or_default(df, cols['address'], ''),
+        '배송메세지': coalesce_messages(df, spec['messages']),
+        '옵션': column_or_default(df, cols['option'], ''),
+    }, columns=ORDER_TABLE_COLUMNS))
+    timings = {'detect': detected - start, 'read': loaded - detected, 'map': time.perf_counter() - loaded}
+    return {
+        'file_name': file_name, 'market': market_key, 'order': config['order'],
+        'table': table, 'missing': missing, 'timings': timings,
+    }
+
+def to_order_file_frame(table):
+    """정규화 주문 테이블 → 발주 파일 통합 전 컬럼"""
+    return pd.DataFrame({
+        '고객주문번호': table['고객주문번호'],
+        '받는분성명': table['수취인'],
+        '받는분전화번호': table['전화번호'],
+        '받는분주소': table['주소'],
+        '배송메세지': table['배송메세지'],
+        '품목': table['품목'],
+        '수량': table['수량'],
+        '내부정렬키': table['내부정렬키'],
+        '마켓순서': table['마켓순서'],
+    })
+
+def to_order_mgmt_frame(table, today_str, invoice_map):
+    """정규화 주문 테이블 → 주문관리시트 통합 전 컬럼 (invoice_map: {주문번호: 운송장번호})"""
+    return pd.DataFrame({
+        '날짜': today_str,
+        '채널': table['채널'],
+        '주문번호': table['주문번호'],
+        '상품명': table['품목'],
+        '상품명_원문': table['상품명_원문'],
+        '수량': table['수량'],
+        '주문인': table['주문인'],
+        '수취인': table['수취인'],
+        '전화번호': table['전화번호'],
+        '주소': table['주소'],
+        '비고': table['배송메세지'],
+        '송장번호': table['주문번호'].map(lambda order_no: invoice_map.get(order_no, '')).astype(object),
+    }, index=table.index)
+
+def process_data(file_name, content, on_error=None):
+    """마켓 주문 파일 하나 → 발주 파일 통합 전 DataFrame (실패하면 빈 DataFrame)"""
+    try:
+        parsed = read_order_table(file_name, content)
+        if parsed is None:
+            return pd.DataFrame()
+        if parsed['missing']:
+            raise KeyError(parsed['missing'][0])
+        return to_order_file_frame(parsed['table'])
+    except Exception as e:
+        _report(on_error, f"❌ {file_name} 처리 실패: {e}")
+        return pd.DataFrame()
+
+def extract_order_rows(file_name, content, invoice_map, today_str):
+    """마켓 주문시트에서 주문관리시트용 주문 행(dict) 목록 추출"""
+    parsed = read_order_table(file_name, content)
+    if parsed is None:
+        return []
+    return to_order_mgmt_frame(parsed['table'], today_str, invoice_map).to_dict('records')
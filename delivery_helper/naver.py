@@ -0,0 +1,320 @@
+"""네이버 엑셀발송 파일 생성
+
+양식(기본 sample_data 양식 또는 업로드 양식)의 헤더/컬럼별 서식은 양식 해시 기준으로 한 번만
+파싱해 캐시하고, 발송 파일을 만들 때는 캐시한 정보만 사용한다.
+"""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from copy import copy
+from functools import lru_cache
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+
+from .config import (
+    HEADER_SCAN_ROWS,
+    NAVER_DELIVERY_COLUMN_ALIASES,
+    NAVER_DELIVERY_COLUMNS,
+    NAVER_DELIVERY_COMPANY,
+    NAVER_DELIVERY_METHOD,
+    NAVER_DELIVERY_TEMPLATE_NAME,
+    NAVER_DELIVERY_XLS_MIME,
+    NAVER_DELIVERY_XLSX_MIME,
+)
+from .excel import _find_header_row
+from .invoices import InvoiceStore
+from .reader import _read_tabular_file, read_upload_head
+from .utils import normalize_excel_id, pick_first_col
+
+try:
+    import xlwt
+except ImportError:
+    xlwt = None
+
+PACKAGE_ROOT = Path(__file__).resolve().parent
+
+TEMPLATE_CACHE_SIZE = 4
+_template_cache = OrderedDict()
+_template_cache_lock = threading.Lock()
+_XLS_TEXT_STYLE = xlwt.easyxf(num_format_str='@') if xlwt else None
+
+
+def find_naver_delivery_template():
+    for path in (
+        Path("sample_data") / NAVER_DELIVERY_TEMPLATE_NAME,
+        Path(NAVER_DELIVERY_TEMPLATE_NAME),
+        PACKAGE_ROOT.parent / "sample_data" / NAVER_DELIVERY_TEMPLATE_NAME,
+    ):
+        if path.exists():
+            return path
+    return None
+
+@lru_cache(maxsize=None)
+def load_naver_delivery_template():
+    """기본 네이버 엑셀발송 양식을 (내용, 파일명)으로 반환 (없으면 (None, None), 프로세스당 한 번만 읽음)"""
+    local_template = find_naver_delivery_template()
+    if local_template:
+        return local_template.read_bytes(), local_template.name
+    return None, None
+
+def _find_naver_header_offset(file_content, file_name):
+    # 앞부분 행에서 '상품주문번호' 헤더 위치 (네이버 주문 파일이 아니면 None)
+    for offset, row in enumerate(read_upload_head(file_content, file_name, HEADER_SCAN_ROWS)):
+        if '상품주문번호' in (str(value).strip() for value in row):
+            return offset
+    return None
+
+def _read_naver_order_df(file_content, file_name):
+    """네이버 주문 파일 → DataFrame (헤더 위치를 앞부분에서 찾아 한 번만 파싱, 네이버 파일이 아니면 None)"""
+    try:
+        offset = _find_naver_header_offset(file_content, file_name)
+        if offset is None:
+            return None
+        df = _read_tabular_file(file_content, file_name, skiprows=offset)
+    except Exception:
+        return None
+    df.columns = df.columns.astype(str).str.strip()
+    return df
+
+def _find_naver_delivery_header(header, canonical_name):
+    for alias in NAVER_DELIVERY_COLUMN_ALIASES[canonical_name]:
+        if alias in header:
+            return alias
+    return None
+
+def _ensure_naver_delivery_columns(ws, header_row_idx, header):
+    header = list(header)
+    for col_name in NAVER_DELIVERY_COLUMNS:
+        if _find_naver_delivery_header(header, col_name) is None:
+            header.append(col_name)
+            if ws is not None:
+                ws.cell(row=header_row_idx, column=len(header), value=col_name)
+    return header
+
+def _read_template_header(template_content, template_name):
+    if not template_content or not template_name:
+        return None
+    try:
+        for row in read_upload_head(template_content, template_name, 20):
+            values = [str(value).strip() if pd.notna(value) and value != "" else None for value in row]
+            if '상품주문번호' in values:
+                while values and values[-1] is None:
+                    values.pop()
+                return values
+    except Exception:
+        return None
+    return None
+
+def _cell_style(cell):
+    # 통합 문서와 무관한 셀 서식 사본 (다른 Workbook 셀에 그대로 지정 가능)
+    return {
+        'font': copy(cell.font),
+        'fill': copy(cell.fill),
+        'border': copy(cell.border),
+        'alignment': copy(cell.alignment),
+        'protection': copy(cell.protection),
+        'number_format': cell.number_format,
+    }
+
+def _parse_xlsx_template(template_content):
+    """xlsx 양식 → (헤더 행 번호, 헤더, 컬럼별 서식, 데이터 행을 지우고 발송 컬럼을 추가한 빈 양식)"""
+    wb = openpyxl.load_workbook(io.BytesIO(template_content))
+    ws = wb.active
+    header_row_idx, header = _find_header_row(ws, '상품주문번호')
+    header = _ensure_naver_delivery_columns(ws, header_row_idx, header)
+
+    styles = {}
+    if ws.max_row > header_row_idx:
+        for col_idx in range(1, len(header) + 1):
+            styles[col_idx] = _cell_style(ws.cell(row=header_row_idx + 1, column=col_idx))
+        ws.delete_rows(header_row_idx + 1, ws.max_row - header_row_idx)
+
+    output = io.BytesIO()
+    wb.save(output)
+    return header_row_idx, header, styles, output.getvalue()
+
+def _parse_template(template_content, template_name):
+    """양식 → 발송 파일 작성에 필요한 정보 (dict)
+
+    header: 양식 헤더 (없는 발송 컬럼은 끝에 추가), column_indexes: 발송 컬럼별 열 번호 (1부터),
+    styles: 열 번호별 데이터 셀 서식, blank: xlsx 양식의 빈 사본 (xlsx 양식이 아니면 None).
+    """
+    template_is_xlsx = template_content and template_name and template_name.lower().endswith('.xlsx')
+    if template_is_xlsx:
+        header_row_idx, header, styles, blank = _parse_xlsx_template(template_content)
+    else:
+        header_row_idx, styles, blank = 1, {}, None
+        header = _read_template_header(template_content, template_name) or list(NAVER_DELIVERY_COLUMNS)
+        header = _ensure_naver_delivery_columns(None, header_row_idx, header)
+    return {
+        'header_row_idx': header_row_idx,
+        'header': header,
+        'column_indexes': {
+            col_name: header.index(_find_naver_delivery_header(header, col_name)) + 1
+            for col_name in NAVER_DELIVERY_COLUMNS
+        },
+        'styles': styles,
+        'blank': blank,
+    }
+
+def _template_key(template_content, template_name):
+    return hashlib.sha256(template_content).hexdigest(), Path(template_name).suffix.lower()
+
+@lru_cache(maxsize=None)
+def _default_template_key():
+    default_content, default_name = load_naver_delivery_template()
+    return _template_key(default_content, default_name) if default_content else None
+
+def naver_template_info(template_content=None, template_name=None):
+    """양식 정보 (_parse_template 결과)를 양식 해시 기준으로 캐시해서 반환
+
+    기본 양식은 프로세스 동안 유지하고, 업로드한 양식은 최근 TEMPLATE_CACHE_SIZE개만 남긴다.
+    """
+    if not template_content or not template_name:
+        return _parse_template(None, None)
+    key = _template_key(template_content, template_name)
+    with _template_cache_lock:
+        info = _template_cache.get(key)
+    if info is None:
+        info = _parse_template(template_content, template_name)
+    default_key = _default_template_key()
+    with _template_cache_lock:
+        info = _template_cache.setdefault(key, info)
+        _template_cache.move_to_end(key)
+        custom_keys = [cached_key for cached_key in _template_cache if cached_key != default_key]
+        for cached_key in custom_keys[:max(len(custom_keys) - TEMPLATE_CACHE_SIZE, 0)]:
+            del _template_cache[cached_key]
+    return info
+
+def clear_template_cache():
+    with _template_cache_lock:
+        _template_cache.clear()
+
+def _write_naver_delivery_xlsx(rows, template_info):
+    if template_info['blank'] is not None:
+        wb = openpyxl.load_workbook(io.BytesIO(template_info['blank']))
+        ws = wb.active
+    else:
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        for col_idx, col_name in enumerate(template_info['header'], start=1):
+            ws.cell(row=template_info['header_row_idx'], column=col_idx, value=col_name)
+
+    header_row_idx = template_info['header_row_idx']
+    column_indexes = template_info['column_indexes']
+    # 열마다 첫 셀에 서식을 지정하고, 나머지 셀은 그 셀의 서식 인덱스를 복사
+    style_arrays = {}
+    for row_offset, row_data in enumerate(rows, start=1):
+        row_idx = header_row_idx + row_offset
+        for col_name in NAVER_DELIVERY_COLUMNS:
+            col_idx = column_indexes[col_name]
+            cell = ws.cell(row=row_idx, column=col_idx, value=row_data[col_name])
+            if col_idx in style_arrays:
+                cell._style = copy(style_arrays[col_idx])
+                continue
+            for attr, value in template_info['styles'].get(col_idx, {}).items():
+                setattr(cell, attr, copy(value))
+            if col_name in ('상품주문번호', '송장번호'):
+                cell.number_format = '@'
+            style_arrays[col_idx] = copy(cell._style)
+
+    output = io.BytesIO()
+    wb.save(output)
+    output.seek(0)
+    return output.getvalue()
+
+def _write_naver_delivery_xls(rows):
+    # xls 발송 파일은 양식과 무관하게 고정 컬럼 (양식을 파싱하지 않음)
+    if xlwt is None:
+        return None
+
+    wb = xlwt.Workbook(encoding='utf-8')
+    ws = wb.add_sheet('발송처리')
+
+    for col_idx, col_name in enumerate(NAVER_DELIVERY_COLUMNS):
+        ws.write(0, col_idx, col_name)
+
+    for row_idx, row_data in enumerate(rows, start=1):
+        for col_idx, col_name in enumerate(NAVER_DELIVERY_COLUMNS):
+            value = row_data.get(col_name, "")
+            ws.write(row_idx, col_idx, str(value), _XLS_TEXT_STYLE)
+
+    output = io.BytesIO()
+    wb.save(output)
+    output.seek(0)
+    return output.getvalue()
+
+def _naver_delivery_rows(df):
+    """네이버 주문 DataFrame → 발송 행 DataFrame (상품주문번호, 주문번호), 상품주문번호가 없는 행 제외"""
+    order_col = pick_first_col(df.columns, ['주문번호', '고객주문번호'])
+    product_order_nos = df['상품주문번호'].map(normalize_excel_id).astype(object)
+    order_nos = df[order_col].map(normalize_excel_id).astype(object) if order_col else ''
+    rows = pd.DataFrame({'상품주문번호': product_order_nos, '주문번호': order_nos}, index=df.index)
+    return rows[(product_order_nos != '') & (product_order_nos.str.lower() != 'nan')]
+
+def _lookup_invoices(invoice_map, keys):
+    # 인덱스는 한 번에 조회 (행마다 쿼리하지 않도록)
+    if isinstance(invoice_map, InvoiceStore):
+        return invoice_map.lookup(keys)
+    return invoice_map
+
+def _write_naver_delivery(rows, template_content=None, template_name=None):
+    xls_output = _write_naver_delivery_xls(rows)
+    if xls_output:
+        return {
+            'data': xls_output,
+            'extension': 'xls',
+            'mime': NAVER_DELIVERY_XLS_MIME
+        }
+
+    xlsx_output = _write_naver_delivery_xlsx(rows, naver_template_info(template_content, template_name))
+    return {
+        'data': xlsx_output,
+        'extension': 'xlsx',
+        'mime': NAVER_DELIVERY_XLSX_MIME
+    }
+
+def build_naver_delivery_file(market_files, invoice_map, template_content=None, template_name=None):
+    """업로드 파일 중 네이버 주문 파일 전체 → 네이버 엑셀발송 파일 하나 (네이버 주문이 없으면 None)
+
+    파일마다 한 번만 파싱하고, 여러 파일(스토어 계정/시간대별)의 행을 합쳐 상품주문번호 기준으로
+    중복을 제거한다 (먼저 올린 파일의 행 유지). 결과 dict의 count는 발송 행 수, files는 사용한 파일명.
+    """
+    frames, file_names = [], []
+    for file_name, content in market_files:
+        df = _read_naver_order_df(content, file_name)
+        if df is not None and not df.empty:
+            frames.append(_naver_delivery_rows(df))
+            file_names.append(file_name)
+    if not frames:
+        return None
+
+    merged = pd.concat(frames, ignore_index=True).drop_duplicates('상품주문번호')
+    if merged.empty:
+        return None
+
+    # 상품주문번호 송장번호 → 없으면 주문번호 송장번호
+    found = _lookup_invoices(invoice_map, list(merged['상품주문번호']) + list(merged['주문번호']))
+    invoices = merged['상품주문번호'].map(found).fillna(merged['주문번호'].map(found)).fillna('')
+    rows = [
+        {
+            '상품주문번호': product_order_no,
+            '배송방법': NAVER_DELIVERY_METHOD,
+            '택배사': NAVER_DELIVERY_COMPANY,
+            '송장번호': invoice
+        }
+        for product_order_no, invoice in zip(merged['상품주문번호'], invoices)
+    ]
+
+    result = _write_naver_delivery(rows, template_content=template_content, template_name=template_name)
+    result.update(count=len(rows), files=file_names)
+    return result
+
+def create_naver_delivery_file(file_content, file_name, invoice_map, template_content=None, template_name=None):
+    """네이버 주문 파일 하나 → 네이버 엑셀발송 파일 (build_naver_delivery_file 참고)"""
+    return build_naver_delivery_file(
+        [(file_name, file_content)], invoice_map, template_content=template_content, template_name=template_name
+    )
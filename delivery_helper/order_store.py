@@ -0,0 +1,225 @@
+"""발주 기록 (하루 여러 번 발주할 때 중복 제외)
+
+발주 파일에 넣은 주문 라인을 (채널, 주문번호, 상품주문번호 또는 상품 내용) 키로 로컬 SQLite에 누적 저장한다.
+오전/오후에 받은 주문 파일이 겹쳐도 아직 발주하지 않은 라인만 새 발주 파일에 넣고,
+그날 발주한 전체 라인은 주문관리시트용 정규화 주문 테이블로 다시 꺼낼 수 있다.
+발주 파일을 만들 때는 새 라인을 계산만 하고(pending_batch), 발주를 확정했을 때 기록한다(record).
+이미 발주한 라인의 수량이 바뀌었으면 다시 발주하지 않고 quantity_changes로 알린다.
+잘못 확정한 배치는 undo_batch로 되돌린다.
+"""
+import json
+import sqlite3
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .compact import compact_orders
+from .config import ORDER_DB_KEEP_DAYS, ORDER_DB_PATH, ORDER_TABLE_COLUMNS
+from .utils import normalize_excel_id
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    batch_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    day TEXT NOT NULL,
+    file_names TEXT NOT NULL,
+    line_count INTEGER NOT NULL,
+    skipped_count INTEGER NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS order_lines (
+    line_key TEXT PRIMARY KEY,
+    day TEXT NOT NULL,
+    batch_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS order_lines_day ON order_lines (day, batch_id, seq);
+"""
+
+
+# pending_batch의 수량 변경 목록 컬럼
+QUANTITY_CHANGE_COLUMNS = ['채널', '주문번호', '상품명', '옵션', '발주 수량', '현재 수량']
+
+
+def _text(values):
+    # 키 비교용 문자열 (결측값은 빈 문자열, 2.0 → '2', 앞뒤 공백 제거)
+    return values.astype(object).map(normalize_excel_id).astype(object)
+
+def order_line_keys(table):
+    """파일 하나의 정규화 주문 테이블 → 라인 키 Series ('채널\t주문번호\t라인')
+
+    라인은 상품주문번호이고, 상품주문번호가 없는 마켓은 상품(코드/상품명/옵션) 내용으로 정한다.
+    그래서 오후 파일에서 주문에 라인이 추가되거나 라인 순서가 바뀌어도 같은 라인은 같은 키가 된다.
+    수량은 키에 넣지 않는다 (수량만 바뀐 라인은 다시 발주하지 않고 pending_batch가 알린다).
+    한 주문 안에 내용까지 같은 라인이 여러 개면 수량 순으로 순번(#0, #1, …)을 붙여 구분한다.
+    """
+    channels = _text(table['채널'])
+    order_nos = _text(table['주문번호'])
+    line_nos = _text(table['상품주문번호'])
+    products = '~' + (
+        _text(table['내부정렬키']) + '\x1f' + _text(table['상품명_원문']) + '\x1f' + _text(table['옵션'])
+    )
+    # 같은 내용 라인의 순번은 파일 안 순서가 아니라 수량 순 (순서가 바뀌어도 같은 라인이 같은 순번)
+    by_quantity = np.argsort(pd.to_numeric(table['수량'], errors='coerce').to_numpy(), kind='stable')
+    occurrence = np.empty(len(table), dtype=np.int64)
+    occurrence[by_quantity] = pd.DataFrame({
+        'channel': channels.to_numpy()[by_quantity], 'order': order_nos.to_numpy()[by_quantity],
+        'products': products.to_numpy()[by_quantity],
+    }).groupby(['channel', 'order', 'products'], sort=False).cumcount().to_numpy()
+    occurrence = pd.Series(occurrence, index=table.index).astype(str)
+    line_nos = line_nos.where(line_nos != '', products + '#' + occurrence)
+    return (channels + '\t' + order_nos + '\t' + line_nos).astype(object)
+
+def _row_json(values):
+    # 결측값은 null로 저장 (다시 읽으면 NaN)
+    return json.dumps([None if pd.isna(value) else value for value in values], ensure_ascii=False)
+
+
+class OrderStore:
+    """발주한 주문 라인 기록 (날짜별 배치)"""
+
+    def __init__(self, path=None):
+        self.path = str(path or ORDER_DB_PATH)
+        if self.path != ':memory:':
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM order_lines").fetchone()[0]
+
+    def _existing_keys(self, keys):
+        found = set()
+        # SQLite 바인딩 변수 개수 제한 때문에 나눠서 조회
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            found.update(key for key, in self._conn.execute(
+                f"SELECT line_key FROM order_lines WHERE line_key IN ({placeholders})", chunk
+            ))
+        return found
+
+    def _recorded_quantities(self, keys):
+        # 기록된 라인 키 → 발주한 수량
+        quantity_index = ORDER_TABLE_COLUMNS.index('수량')
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for key, data in self._conn.execute(
+                f"SELECT line_key, data FROM order_lines WHERE line_key IN ({placeholders})", chunk
+            ):
+                found[key] = json.loads(data)[quantity_index]
+        return found
+
+    def pending_batch(self, tables, day, file_names=()):
+        """파일별 정규화 주문 테이블 중 아직 기록되지 않은 라인 (기록하지 않음)
+
+        tables는 파일별 테이블 목록 (같은 라인의 순번을 파일마다 세기 위해 합치지 않고 받는다).
+        이번에 올린 파일끼리 겹치는 라인도 처음 한 번만 남긴다. 비용은 이번 입력 행 수에 비례한다.
+        이미 발주한 라인의 수량이 달라졌으면 다시 발주하지 않고 quantity_changes에 담는다 (마켓에서 수량을
+        고친 주문은 차이만큼 직접 처리).
+        {'day', 'file_names', 'table', 'keys', 'skipped', 'quantity_changes'} 반환.
+        발주 파일을 받은 뒤 record()로 기록한다.
+        """
+        batch = {'day': day, 'file_names': list(file_names), 'table': pd.DataFrame(columns=ORDER_TABLE_COLUMNS),
+                 'keys': [], 'skipped': 0, 'quantity_changes': pd.DataFrame(columns=QUANTITY_CHANGE_COLUMNS)}
+        tables = [table for table in tables if not table.empty]
+        if not tables:
+            return batch
+        table = pd.concat(tables, ignore_index=True)
+        keys = pd.concat([order_line_keys(t) for t in tables], ignore_index=True)
+
+        recorded = self._recorded_quantities(list(dict.fromkeys(keys)))
+        first = ~keys.duplicated()
+        is_new = ~keys.isin(recorded.keys()) & first
+        new_table = table[is_new.to_numpy()].reset_index(drop=True)
+        batch.update(table=compact_orders(new_table), keys=keys[is_new].tolist(), skipped=len(table) - len(new_table))
+
+        seen = (keys.isin(recorded.keys()) & first).to_numpy()
+        if seen.any():
+            old_quantities = _text(keys[seen].map(recorded))
+            new_quantities = _text(table.loc[seen, '수량']).reset_index(drop=True)
+            changed = (old_quantities.reset_index(drop=True) != new_quantities).to_numpy()
+            changes = table.loc[seen, ['채널', '주문번호', '상품명_원문', '옵션']].reset_index(drop=True)[changed]
+            changes.columns = QUANTITY_CHANGE_COLUMNS[:4]
+            changes['옵션'] = changes['옵션'].astype(object).fillna('')
+            changes['발주 수량'] = old_quantities.reset_index(drop=True)[changed].to_numpy()
+            changes['현재 수량'] = new_quantities[changed].to_numpy()
+            batch['quantity_changes'] = changes.reset_index(drop=True)
+        return batch
+
+    def record(self, batch):
+        """pending_batch() 결과를 발주 배치로 기록하고 batch_id 반환
+
+        그 사이 다른 배치로 기록된 라인은 건너뛴다 (같은 파일을 두 번 확정해도 한 번만 기록).
+        """
+        seen = self._existing_keys(batch['keys'])
+        rows = batch['table'][ORDER_TABLE_COLUMNS].astype(object).itertuples(index=False, name=None)
+        lines = [(key, values) for key, values in zip(batch['keys'], rows) if key not in seen]
+        now = datetime.now().isoformat(timespec='seconds')
+        with self._conn:
+            batch_id = self._conn.execute(
+                "INSERT INTO batches (day, file_names, line_count, skipped_count, created_at) VALUES (?, ?, ?, ?, ?)",
+                (batch['day'], json.dumps(batch['file_names'], ensure_ascii=False), len(lines),
+                 batch['skipped'] + len(seen), now)
+            ).lastrowid
+            self._conn.executemany(
+                "INSERT INTO order_lines (line_key, day, batch_id, seq, data) VALUES (?, ?, ?, ?, ?)",
+                [(key, batch['day'], batch_id, seq, _row_json(values)) for seq, (key, values) in enumerate(lines)]
+            )
+        self.prune(batch['day'])
+        return batch_id
+
+    def ingest(self, tables, day, file_names=()):
+        """아직 기록되지 않은 라인만 바로 기록하고 (그 라인들의 테이블, 제외한 라인 수) 반환"""
+        batch = self.pending_batch(tables, day, file_names)
+        self.record(batch)
+        return batch['table'], batch['skipped']
+
+    def undo_batch(self, batch_id):
+        """발주 배치 취소 (그 배치의 라인은 다시 발주 대상이 됨). 지운 라인 수 반환"""
+        with self._conn:
+            removed = self._conn.execute("DELETE FROM order_lines WHERE batch_id = ?", (batch_id,)).rowcount
+            self._conn.execute("DELETE FROM batches WHERE batch_id = ?", (batch_id,))
+        return removed
+
+    def day_table(self, day):
+        """그날 기록된 전체 라인의 정규화 주문 테이블 (기록 순서)"""
+        rows = [json.loads(data) for data, in self._conn.execute(
+            "SELECT data FROM order_lines WHERE day = ? ORDER BY batch_id, seq", (day,)
+        )]
+        if not rows:
+            return pd.DataFrame(columns=ORDER_TABLE_COLUMNS)
+        # 컬럼이 추가되기 전에 기록한 라인은 뒤쪽 컬럼을 결측값으로 채움
+        width = len(ORDER_TABLE_COLUMNS)
+        rows = [row + [None] * (width - len(row)) for row in rows]
+        return compact_orders(pd.DataFrame(rows, columns=ORDER_TABLE_COLUMNS))
+
+    def batches(self, day):
+        """그날 발주 배치 목록 [(batch_id, 시각, 새 라인 수, 제외한 라인 수, 파일명 목록)]"""
+        return [
+            (batch_id, created_at, line_count, skipped_count, json.loads(file_names))
+            for batch_id, created_at, line_count, skipped_count, file_names in self._conn.execute(
+                "SELECT batch_id, created_at, line_count, skipped_count, file_names FROM batches"
+                " WHERE day = ? ORDER BY batch_id", (day,)
+            )
+        ]
+
+    def prune(self, day, keep_days=ORDER_DB_KEEP_DAYS):
+        """day 기준 keep_days일보다 오래된 기록 삭제"""
+        cutoff = (date.fromisoformat(day) - timedelta(days=keep_days)).isoformat()
+        with self._conn:
+            self._conn.execute("DELETE FROM order_lines WHERE day < ?", (cutoff,))
+            self._conn.execute("DELETE FROM batches WHERE day < ?", (cutoff,))
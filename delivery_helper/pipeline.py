@@ -0,0 +1,277 @@
+"""발주 파일 / 주문관리시트 생성 파이프라인
+
+Streamlit UI와 CLI가 같은 함수를 사용한다. 입력 파일은 (파일명, 내용 bytes) 튜플 목록.
+"""
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from . import polars_engine
+from .cache import cache_key, result_cache
+from .compact import compact_orders
+from .config import ORDER_FILE_COLUMNS, ORDER_TABLE_COLUMNS, PHONE_KEYWORDS, PIPELINE_ENGINE
+from .consolidate import consolidate_order_mgmt, consolidate_orders
+from .excel import add_invoice_to_coupang, dataframe_to_excel_bytes, sort_xlsx_preserving_format
+from .ingest import parse_market_files
+from .invoices import InvoiceStore, read_invoice_pairs
+from .markets import _report, to_order_file_frame, to_order_mgmt_frame
+from .naver import build_naver_delivery_file, load_naver_delivery_template
+from .reader import _is_xlsx_content
+from .timing import StageTimer
+
+TIMEZONE = ZoneInfo("Asia/Seoul")
+
+
+def now_kst():
+    return datetime.now(TIMEZONE)
+
+def output_filenames(now=None):
+    """생성 파일명 (MMDD_HH 형식)"""
+    now = now or now_kst()
+    stamp = now.strftime('%m%d_%H')
+    return {
+        'order': f"{stamp}.xlsx",
+        'coupang_sorted': f"{stamp}_쿠팡_원본정렬.xlsx",
+        'order_mgmt': f"주문관리_{stamp}.xlsx",
+        'coupang_delivery': f"쿠팡발송_{stamp}.xlsx",
+        'naver_delivery': f"네이버발송_{stamp}",
+    }
+
+def consolidation_engine():
+    """주문 통합 엔진 ('polars'는 설정되어 있고 polars가 설치되어 있을 때만)"""
+    if PIPELINE_ENGINE == 'polars' and polars_engine.is_available():
+        return 'polars'
+    return 'pandas'
+
+def _consolidators():
+    # (발주 통합, 주문관리 통합) 함수. 두 엔진은 같은 결과를 낸다
+    if consolidation_engine() == 'polars':
+        return polars_engine.consolidate_orders, polars_engine.consolidate_order_mgmt
+    return consolidate_orders, consolidate_order_mgmt
+
+def build_order_table(market_files, on_error=None, workers=None, timer=None, progress=None):
+    """마켓 주문 파일들 → 정규화 주문 테이블 하나 (마켓 순서 → 업로드 순서)"""
+    return _combine_order_tables(parse_market_files(
+        market_files, on_error=on_error, workers=workers, timer=timer, progress=progress
+    ))
+
+def _combine_order_tables(parsed_files):
+    tables = [parsed['table'] for parsed in parsed_files if not parsed['table'].empty]
+    if not tables:
+        return pd.DataFrame(columns=ORDER_TABLE_COLUMNS)
+    # 파일마다 범주가 달라 object로 풀린 category 컬럼을 다시 압축
+    return compact_orders(pd.concat(tables, ignore_index=True))
+
+def build_order_file(market_files, on_error=None, workers=None, timer=None, order_store=None, day=None,
+                     progress=None):
+    """마켓 주문 파일들을 CJ택배 발주 파일로 통합 (처리할 데이터가 없으면 None)
+
+    결과의 order_table(정규화 주문 테이블)을 build_order_management에 넘기면 다시 파싱하지 않는다.
+    order_store: OrderStore. 지정하면 이미 발주한 주문 라인을 빼고 새 라인만 발주 파일로 만들고
+    (새 라인이 없으면 order_file이 None), order_table은 그날(day, 기본 오늘) 발주한 전체 라인 + 새 라인이 된다.
+    발주 기록은 하지 않는다. 발주 파일을 받은 뒤 결과의 pending_batch를 order_store.record()로 기록한다.
+    결과의 timings는 단계별 처리 시간 레코드 목록 (timer를 주면 그 StageTimer에 기록).
+    progress: 파일별 진행 상황 콜백 (ingest.parse_market_files 참고).
+    """
+    timer = timer or StageTimer()
+    coupang_sorted = None
+    for file_name, content in market_files:
+        # 쿠팡 파일인 경우 정렬된 버전 생성
+        if 'DeliveryList' in file_name:
+            with timer.stage('coupang_sort', bytes_in=len(content)) as record:
+                coupang_sorted = sort_xlsx_preserving_format(content, '업체상품코드', keyword_cols=PHONE_KEYWORDS)
+                record['bytes_out'] = len(coupang_sorted or b'')
+
+    # 데이터 처리 (파일별 병렬, 마켓 순서로 병합)
+    parsed_files = parse_market_files(market_files, on_error=on_error, workers=workers, timer=timer, progress=progress)
+    valid_files = []
+    for parsed in parsed_files:
+        if parsed['missing']:
+            _report(on_error, f"❌ {parsed['file_name']} 처리 실패: '{parsed['missing'][0]}'")
+        elif not parsed['table'].empty:
+            valid_files.append(parsed)
+
+    if not valid_files:
+        return None
+
+    order_table = _combine_order_tables(parsed_files)
+    skipped = 0
+    pending_batch = None
+    if order_store is not None:
+        # 이미 발주한 라인 제외 (새 라인만 발주 파일로, 기록은 발주 확정 때)
+        day = day or now_kst().strftime('%Y-%m-%d')
+        with timer.stage('order_store', rows_in=sum(len(parsed['table']) for parsed in valid_files)) as record:
+            pending_batch = order_store.pending_batch(
+                [parsed['table'] for parsed in valid_files], day,
+                file_names=[parsed['file_name'] for parsed in valid_files]
+            )
+            new_table, skipped = pending_batch['table'], pending_batch['skipped']
+            record['rows_out'] = len(new_table)
+        # 주문관리시트용: 그날 발주한 전체 라인 + 이번 새 라인 + 필수 컬럼이 없어 발주하지 못한 파일의 라인
+        order_table = _combine_order_tables(
+            [{'table': order_store.day_table(day)}, {'table': new_table}]
+            + [parsed for parsed in parsed_files if parsed['missing']]
+        )
+        combined_list = [to_order_file_frame(new_table)] if not new_table.empty else []
+    else:
+        combined_list = [to_order_file_frame(parsed['table']) for parsed in valid_files]
+
+    result = {
+        'order_df': None,
+        'order_file': None,
+        'coupang_sorted': coupang_sorted,
+        'order_count': 0,
+        'skipped_count': skipped,
+        'pending_batch': pending_batch,
+        'order_table': order_table,
+        'timings': timer.records
+    }
+    if not combined_list:
+        return result
+
+    # 데이터 병합 및 처리
+    full_df = compact_orders(pd.concat(combined_list, ignore_index=True))
+    key = cache_key('order_file', full_df)
+    cached = result_cache.get(key)
+    if cached is not None:
+        final_df, order_file = cached
+        timer.add('consolidate', 0.0, rows_in=len(full_df), rows_out=len(final_df), cached=True)
+    else:
+        with timer.stage('consolidate', rows_in=len(full_df)) as record:
+            final_df = _consolidators()[0](full_df)
+            record['rows_out'] = len(final_df)
+        with timer.stage('write_order', rows_in=len(final_df)) as record:
+            order_file = dataframe_to_excel_bytes(
+                final_df.rename(columns={
+                    '받는분주소': '받는분주소(전체, 분할)',
+                    '배송메세지': '배송메세지1'
+                }),
+                columns=ORDER_FILE_COLUMNS,
+                target_cols=['받는분전화번호'],
+                keyword_cols=PHONE_KEYWORDS
+            )
+            record['bytes_out'] = len(order_file)
+        result_cache.put(key, (final_df, order_file))
+
+    result.update(order_df=final_df, order_file=order_file, order_count=len(final_df))
+    return result
+
+def build_invoice_map(cj_files):
+    """CJ택배 배송 실적 파일들에서 {고객주문번호: 운송장번호} 매핑 생성 (인덱스 없이 메모리에서)"""
+    invoice_map = {}
+    for file_name, content in cj_files:
+        key = cache_key('invoice_pairs', file_name, content)
+        pairs = result_cache.get(key)
+        if pairs is None:
+            pairs = read_invoice_pairs(content, file_name)
+            result_cache.put(key, pairs)
+        invoice_map.update(pairs)
+    return invoice_map
+
+def _lookup_invoices(invoice_map, order_nos):
+    # 인덱스는 주문번호를 한 번에 조회 (행마다 쿼리하지 않도록)
+    if isinstance(invoice_map, InvoiceStore):
+        return invoice_map.lookup(order_nos)
+    return invoice_map
+
+def build_order_management(market_files, cj_files, naver_template=None, today_str=None, on_error=None,
+                           invoice_store=None, workers=None, order_table=None, timer=None, progress=None):
+    """CJ 송장번호를 매칭한 주문관리시트와 쿠팡/네이버 발송 파일 생성 (주문 데이터가 없으면 None)
+
+    naver_template: (내용, 파일명) 튜플. 없으면 기본 양식(sample_data)을 사용한다.
+    invoice_store: InvoiceStore. 지정하면 cj_files를 인덱스에 반영한 뒤 누적된 인덱스에서
+    송장번호를 조회하고, 없으면 cj_files만으로 매핑을 만든다.
+    order_table: build_order_file 결과의 정규화 주문 테이블. 지정하면 market_files를 다시 파싱하지 않는다.
+    결과의 timings는 단계별 처리 시간 레코드 목록 (timer를 주면 그 StageTimer에 기록).
+    progress: 파일별 진행 상황 콜백 (ingest.parse_market_files 참고).
+    """
+    timer = timer or StageTimer()
+    with timer.stage('invoice_load', bytes_in=sum(len(content) for _, content in cj_files)) as record:
+        if invoice_store is not None:
+            invoice_store.ingest(cj_files)
+            invoice_map = invoice_store
+        else:
+            invoice_map = build_invoice_map(cj_files)
+        record['rows_out'] = len(invoice_map)
+    today_str = today_str or now_kst().strftime('%Y.%m.%d')
+
+    # 마켓 주문시트 처리 (정규화 주문 테이블이 없으면 파일별 병렬 파싱)
+    if order_table is None:
+        order_table = build_order_table(market_files, on_error=on_error, workers=workers, timer=timer,
+                                        progress=progress)
+    if order_table.empty:
+        return None
+
+    with timer.stage('invoice_match', rows_in=len(order_table)) as record:
+        mgmt_df = compact_orders(
+            to_order_mgmt_frame(order_table, today_str, _lookup_invoices(invoice_map, order_table['주문번호']))
+        )
+        record['rows_out'] = int((mgmt_df['송장번호'] != '').sum())
+
+    # 같은 주문번호로 제품 통합
+    key = cache_key('order_mgmt', mgmt_df)
+    cached = result_cache.get(key)
+    if cached is not None:
+        consolidated, order_mgmt_file = cached
+        timer.add('consolidate', 0.0, rows_in=len(mgmt_df), rows_out=len(consolidated), cached=True)
+    else:
+        with timer.stage('consolidate', rows_in=len(mgmt_df)) as record:
+            consolidated = _consolidators()[1](mgmt_df)
+            record['rows_out'] = len(consolidated)
+        with timer.stage('write_order_mgmt', rows_in=len(consolidated)) as record:
+            order_mgmt_file = dataframe_to_excel_bytes(
+                consolidated,
+                target_cols=['전화번호'],
+                keyword_cols=PHONE_KEYWORDS
+            )
+            record['bytes_out'] = len(order_mgmt_file)
+        result_cache.put(key, (consolidated, order_mgmt_file))
+
+    # 쿠팡 발송 파일 생성 (DeliveryList 여러 개는 첫 파일 서식으로 합침)
+    coupang_delivery = None
+    coupang_files = [(file_name, content) for file_name, content in market_files if 'DeliveryList' in file_name]
+    if coupang_files:
+        (file_name, content), extra_files = coupang_files[0], []
+        for extra_name, extra_content in coupang_files[1:]:
+            if _is_xlsx_content(extra_content):
+                extra_files.append((extra_name, extra_content))
+            else:
+                _report(on_error, f"⚠️ {extra_name}: 쿠팡 발송 파일에는 xlsx 파일만 합칠 수 있습니다")
+        bytes_in = len(content) + sum(len(extra_content) for _, extra_content in extra_files)
+        with timer.stage('coupang_delivery', bytes_in=bytes_in) as record:
+            coupang_delivery = add_invoice_to_coupang(
+                content, file_name, invoice_map, on_error=on_error, extra_files=extra_files
+            )
+            record['bytes_out'] = len(coupang_delivery or b'')
+
+    # 네이버 엑셀발송 파일 생성
+    if naver_template:
+        naver_template_content, naver_template_name = naver_template
+    else:
+        naver_template_content, naver_template_name = load_naver_delivery_template()
+
+    # 업로드한 네이버 주문 파일 전체를 합쳐 발송 파일 하나로
+    with timer.stage('naver_delivery') as record:
+        naver_delivery = build_naver_delivery_file(
+            market_files,
+            invoice_map,
+            template_content=naver_template_content,
+            template_name=naver_template_name
+        )
+        if naver_delivery:
+            record['bytes_in'] = sum(len(content) for name, content in market_files if name in naver_delivery['files'])
+            record['rows_out'] = naver_delivery['count']
+            record['bytes_out'] = len(naver_delivery['data'])
+
+    return {
+        'consolidated': consolidated,
+        'raw_orders': mgmt_df,
+        'invoice_map': invoice_map,
+        'order_mgmt_file': order_mgmt_file,
+        'coupang_delivery': coupang_delivery,
+        'naver_delivery': naver_delivery,
+        'count': len(consolidated),
+        'matched': len(consolidated[consolidated['송장번호'] != '']),
+        'timings': timer.records
+    }
@@ -0,0 +1,126 @@
+"""Polars 통합 엔진 (선택)
+
+consolidate.py의 consolidate_orders / consolidate_order_mgmt와 같은 결과를 Polars 지연(lazy) 실행으로
+계산한다. 받는분/주문 그룹핑, 품목 문자열 집계, 정렬이 한 실행 계획으로 묶여 멀티스레드로 처리된다.
+config.PIPELINE_ENGINE = 'polars'이고 polars가 설치되어 있을 때 파이프라인이 사용한다.
+수량이 정수가 아닌 데이터(빈 값 등)는 pandas 경로로 처리한다.
+"""
+import pandas as pd
+
+from .config import CHANNEL_ORDER, ITEM_SORT_ORDER
+from .consolidate import FIRST_ROW_COLUMNS, ORDER_KEYS, RECIPIENT_KEYS
+from .consolidate import consolidate_order_mgmt as pandas_consolidate_order_mgmt
+from .consolidate import consolidate_orders as pandas_consolidate_orders
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+
+def is_available():
+    return pl is not None
+
+def _to_lazy(df):
+    # category/Arrow 문자열은 문자열로, 수량은 Int64로 맞춰 지연 프레임 생성
+    lf = pl.from_pandas(df.reset_index(drop=True)).lazy()
+    casts = [pl.col(col).cast(pl.String) for col, dtype in df.dtypes.items() if not pd.api.types.is_numeric_dtype(dtype)]
+    return lf.with_columns(*casts, pl.col('수량').cast(pl.Int64)).with_row_index('_row')
+
+def _is_supported(df):
+    return pd.api.types.is_integer_dtype(df['수량'])
+
+def _item_label(item, qty):
+    # 'OH 2개' / 'PH' (consolidate._format_item_counts와 같음)
+    return pl.when(qty > 1).then(pl.concat_str([item, pl.lit(' '), qty.cast(pl.String), pl.lit('개')])).otherwise(item)
+
+def _to_pandas(lf, columns):
+    df = lf.collect().to_pandas()
+    return df.set_index('_group')[columns].rename_axis(None)
+
+def consolidate_orders(full_df):
+    """consolidate.consolidate_orders와 같은 결과 (받는분별 통합 CJ 발주 데이터)"""
+    if not _is_supported(full_df):
+        return pandas_consolidate_orders(full_df)
+
+    # 받는분 키가 비어 있는 행은 제외, 그룹 번호는 처음 나온 순서
+    lf = _to_lazy(full_df).drop_nulls(RECIPIENT_KEYS)
+    lf = lf.with_columns(pl.col('_row').min().over(RECIPIENT_KEYS).rank('dense').cast(pl.Int64).sub(1).alias('_group'))
+
+    first_rows = lf.filter(pl.col('_row') == pl.col('_row').min().over('_group')).select('_group', *FIRST_ROW_COLUMNS)
+
+    # 품목별 수량 합계 → IH_Re → OH → … → SH_Re → 기타, 같은 순위는 첫 단어/품목명 순
+    token = pl.col('품목').str.split(' ').list.first()
+    item_names = (
+        lf.filter(pl.col('품목').is_not_null())
+        .group_by('_group', '품목').agg(pl.col('수량').sum())
+        .with_columns(
+            _item_label(pl.col('품목'), pl.col('수량')).alias('label'),
+            token.alias('token'),
+            token.str.to_uppercase().replace_strict(ITEM_SORT_ORDER, default=7, return_dtype=pl.Int64).alias('rank'),
+        )
+        .sort('_group', 'rank', 'token', '품목')
+        .group_by('_group', maintain_order=True).agg(pl.col('label').str.join(', ').alias('품목명'))
+    )
+    messages = (
+        lf.filter(pl.col('배송메세지').is_not_null() & (pl.col('배송메세지') != ''))
+        .group_by('_group').agg(pl.col('배송메세지').sort_by('_row').first())
+    )
+    totals = lf.group_by('_group').agg(
+        pl.col('수량').sum().alias('기타1'),
+        pl.col('내부정렬키').min().alias('최종정렬키'),
+    )
+
+    result = (
+        first_rows
+        .join(messages, on='_group', how='left')
+        .join(item_names, on='_group', how='left')
+        .join(totals, on='_group', how='left')
+        .with_columns(pl.col('배송메세지').fill_null(''), pl.col('품목명').fill_null(''))
+        .sort('마켓순서', '최종정렬키', '_group', nulls_last=True)
+    )
+    return _to_pandas(result, [
+        '고객주문번호', '받는분성명', '받는분전화번호', '받는분주소', '배송메세지', '품목명', '기타1', '마켓순서', '최종정렬키'
+    ])
+
+def consolidate_order_mgmt(mgmt_df):
+    """consolidate.consolidate_order_mgmt와 같은 결과 ((채널, 주문번호)별 통합 주문관리시트 데이터)"""
+    if not _is_supported(mgmt_df):
+        return pandas_consolidate_order_mgmt(mgmt_df)
+
+    # 그룹 번호는 (채널, 주문번호) 정렬 순서
+    lf = _to_lazy(mgmt_df)
+    group_keys = (
+        lf.select(ORDER_KEYS).unique().sort(ORDER_KEYS)
+        .with_row_index('_group').with_columns(pl.col('_group').cast(pl.Int64))
+    )
+    lf = lf.join(group_keys, on=ORDER_KEYS, how='left')
+
+    first_rows = lf.filter(pl.col('_row') == pl.col('_row').min().over('_group')).drop('상품명', '수량')
+
+    # 주문 × 제품별 수량 합계 (빈 제품명은 'nan'), IH_Re → OH → … → SH_Re → 기타, 같은 순위는 제품명 순
+    item_counts = (
+        lf.group_by('_group', '상품명').agg(pl.col('수량').sum())
+        .with_columns(
+            _item_label(pl.col('상품명').fill_null('nan'), pl.col('수량')).alias('label'),
+            pl.col('상품명').str.strip_chars().str.to_uppercase()
+            .replace_strict(ITEM_SORT_ORDER, default=7, return_dtype=pl.Int64).fill_null(7).alias('rank'),
+        )
+        .sort('_group', 'rank', '상품명', nulls_last=True)
+        .group_by('_group', maintain_order=True).agg(
+            pl.col('label').str.join(', ').alias('상품명'),
+            pl.col('rank').first().alias('상품순서'),
+        )
+    )
+    totals = lf.group_by('_group').agg(pl.col('수량').sum())
+
+    result = (
+        first_rows
+        .join(item_counts, on='_group', how='left')
+        .join(totals, on='_group', how='left')
+        .with_columns(
+            pl.col('채널').replace_strict(CHANNEL_ORDER, default=99, return_dtype=pl.Int64).alias('마켓순서')
+        )
+        .sort('마켓순서', '상품순서', '_group')
+    )
+    return _to_pandas(result, ['날짜', '채널', '주문번호', '상품명', '수량', '주문인', '수취인', '전화번호', '주소', '비고', '송장번호'])
@@ -0,0 +1,94 @@
+"""상품명 → 표준 품목명 분류"""
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+# 분류 키워드를 하나의 정규식으로 컴파일 (대문자 변환한 상품명에 적용)
+# 전방탐색으로 모든 위치의 키워드를 찾으므로 '케이블SH'처럼 겹치는 키워드도 놓치지 않는다.
+_PRODUCT_TOKEN_RE = re.compile(
+    r'(?=(IH|OH|PH|SH|_RE|리퍼|케이블S|케이블|스위치|거치대|휴대폰|번호판|차량번호|망치|도막|측정기))'
+)
+PRODUCT_CACHE_SIZE = 4096
+
+
+def _classify_product(name):
+    hits = set(_PRODUCT_TOKEN_RE.findall(str(name).upper()))
+    if not hits:
+        return name
+
+    # 리퍼 제품 여부 확인 (_Re 표기 또는 한글 '리퍼'/'리퍼제품')
+    is_refurb = '_RE' in hits or '리퍼' in hits
+
+    # IH, OH, PH, SH 코드 우선 확인 (리퍼면 _Re 접미사 부착)
+    for code in ('IH', 'OH', 'PH', 'SH'):
+        if code in hits:
+            return f"{code}_Re" if is_refurb else code
+
+    # 기타 제품 매핑
+    if '케이블S' in hits:
+        return '케이블s'
+    if '케이블' in hits:
+        if '스위치' in hits:
+            return '케이블s'
+        else:
+            return '케이블(일반)'
+    if '거치대' in hits or '휴대폰' in hits:
+        return '휴대폰거치대'
+    if '번호판' in hits or '차량번호' in hits:
+        return '차량번호판'
+    if '망치' in hits:
+        return '차량용망치'
+    if '도막' in hits or '측정기' in hits:
+        return '도막측정기'
+
+    return name
+
+_classify_product_cached = lru_cache(maxsize=PRODUCT_CACHE_SIZE, typed=True)(_classify_product)
+
+def identify_product(name):
+    """상품명을 표준 품목명(OH, PH_Re, 케이블s 등)으로 분류 (최근 상품명은 캐시)"""
+    try:
+        return _classify_product_cached(name)
+    except TypeError:
+        return _classify_product(name)
+
+# 판매자/업체 상품코드(예: 'PH', 'SH_Re')를 표준 품목명으로 정규화
+# 네이버 '판매자 상품코드', 쿠팡 '업체상품코드'처럼 코드가 명시된 컬럼을 우선 신뢰한다.
+_CODE_RE = re.compile(r'^(IH|OH|PH|SH)(?:[ _\-]?(RE))?$')
+def code_to_item(raw):
+    if raw is None or (isinstance(raw, float) and pd.isna(raw)):
+        return None
+    s = str(raw).strip()
+    if not s:
+        return None
+    m = _CODE_RE.match(s.upper())
+    if not m:
+        return None
+    return f"{m.group(1)}_Re" if m.group(2) else m.group(1)
+
+def identify_products(names):
+    """상품명 일괄 분류: 고유 상품명마다 한 번만 분류 (Series면 Series, 아니면 ndarray 반환)"""
+    codes, uniques = pd.factorize(names, use_na_sentinel=False)
+    classified = np.empty(len(uniques), dtype=object)
+    classified[:] = [identify_product(name) for name in uniques]
+    if isinstance(names, pd.Series):
+        return pd.Series(classified[codes], index=names.index, dtype=object)
+    return classified[codes]
+
+def codes_to_items(codes):
+    """code_to_item의 컬럼 단위 버전 (코드가 아니면 None)"""
+    text = codes.astype(object).astype(str).str.strip().str.upper()
+    matched = text.str.extract(_CODE_RE)
+    items = matched[0].where(matched[1].isna(), matched[0] + '_Re')
+    return items.astype(object).where(matched[0].notna(), None)
+
+def classify_items(names, codes=None):
+    """상품코드가 표준 코드면 우선 사용하고, 아니면 상품명으로 분류"""
+    items = identify_products(names)
+    if codes is None:
+        return items
+    code_items = codes_to_items(codes)
+    return code_items.where(code_items.notna(), items)
@@ -0,0 +1,327 @@
+"""업로드 파일 읽기
+
+같은 내용(해시)의 파일은 헤더 위치별 DataFrame으로 캐시한다. 전체 그리드를 만들지 않고 헤더 행부터
+컬럼별로 모아 변환한다. 엑셀은 python-calamine이 설치돼 있으면 calamine으로, 아니면 xlsx는 openpyxl
+read_only 모드 스트리밍, xls는 xlrd로 읽는다 (config.READER_ENGINE). 어느 엔진이든 같은 값이 된다
+(xlsx에 xml:space 없이 저장된 공백뿐인 문자열만 calamine에서 빈 값).
+"""
+import csv
+import datetime
+import hashlib
+import io
+import logging
+import threading
+from collections import OrderedDict
+from itertools import islice
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+from openpyxl.utils import column_index_from_string
+from pandas.io.parsers import TextParser
+
+from .config import HEADER_SCAN_ROWS, READER_ENGINE
+from .xlsx_patch import _CELL_REF_RE, _XlsxPackage, _cast_number
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CACHE_SIZE = 16
+_upload_cache = OrderedDict()
+# 앱 작업 스레드 여러 개가 함께 쓰므로 캐시 조회/갱신은 잠금 안에서 (파일 읽기는 잠금 밖에서)
+_upload_cache_lock = threading.Lock()
+
+
+def _is_csv(file_name):
+    return file_name.lower().endswith('.csv')
+
+def _is_xlsx_content(file_content):
+    # xlsx는 zip 컨테이너 (확장자가 .xls여도 내용 기준으로 판단)
+    return file_content[:4] == b'PK\x03\x04'
+
+def _convert_xlsx_value(value):
+    # pd.read_excel(openpyxl)과 같은 셀 값 변환
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, str) and value in ERROR_CODES:
+        return np.nan
+    return value
+
+def _xlsx_value_rows(file_content, max_rows=None):
+    """첫 번째 시트를 read_only 스트리밍으로 한 행씩 읽음 (pd.read_excel과 같은 셀 값)
+
+    max_rows를 주면 그 행까지만 읽고 멈춘다.
+    """
+    workbook = load_workbook(io.BytesIO(file_content), read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook.worksheets[0]
+        # 잘못 기록된 시트 크기(dimension) 무시
+        sheet.reset_dimensions()
+        yield from sheet.iter_rows(max_row=max_rows, values_only=True)
+    finally:
+        workbook.close()
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def _element_text(element):
+    # 공유/인라인 문자열 요소(si, is)의 텍스트 (run은 이어 붙이고, 윗주는 제외)
+    parts = []
+    for child in element:
+        name = _local_name(child.tag)
+        if name == 't':
+            parts.append(child.text or '')
+        elif name == 'r':
+            parts.extend(t.text or '' for t in child if _local_name(t.tag) == 't')
+    return ''.join(parts)
+
+def _head_cell_value(cell):
+    cell_type = cell.get('t')
+    value = None
+    for child in cell:
+        name = _local_name(child.tag)
+        if name == 'v':
+            value = child.text
+        elif name == 'is':
+            return _element_text(child)
+    if cell_type == 's':
+        return _SharedString(int(value))
+    if value is None:
+        return None
+    if cell_type in ('str', 'd'):
+        return value
+    if cell_type == 'b':
+        return bool(int(value))
+    if cell_type == 'e':
+        return value
+    return _cast_number(value)
+
+
+class _SharedString(int):
+    """아직 읽지 않은 공유 문자열 번호"""
+
+
+def read_xlsx_head(file_content, max_rows):
+    """첫 번째 시트의 앞부분 max_rows행 셀 값 목록 (빈 셀은 None)
+
+    시트 XML과 공유 문자열 XML을 필요한 위치까지만 스트리밍하므로 파일 크기와 관계없이 비용이 일정하다.
+    """
+    package = _XlsxPackage(file_content)
+    rows = {}
+    with package.zip.open(package.first_sheet_path) as sheet_xml:
+        row_num = 0
+        for _, element in ElementTree.iterparse(sheet_xml):
+            if _local_name(element.tag) != 'row':
+                continue
+            row_num = int(element.get('r') or row_num + 1)
+            if row_num > max_rows:
+                break
+            cells = {}
+            col = 0
+            for cell in element:
+                if _local_name(cell.tag) != 'c':
+                    continue
+                ref = cell.get('r')
+                col = column_index_from_string(_CELL_REF_RE.match(ref).group(1)) if ref else col + 1
+                cells[col] = _head_cell_value(cell)
+            rows[row_num] = cells
+            element.clear()
+
+    needed = {value for cells in rows.values() for value in cells.values() if isinstance(value, _SharedString)}
+    strings = {}
+    if needed and package.shared_strings_path:
+        last = max(needed)
+        with package.zip.open(package.shared_strings_path) as sst_xml:
+            index = 0
+            for _, element in ElementTree.iterparse(sst_xml):
+                if _local_name(element.tag) != 'si':
+                    continue
+                if index in needed:
+                    strings[index] = _element_text(element)
+                element.clear()
+                index += 1
+                if index > last:
+                    break
+
+    result = []
+    for num in range(1, max(rows, default=0) + 1):
+        cells = rows.get(num, {})
+        width = max(cells, default=0)
+        result.append([
+            strings.get(value, '') if isinstance(value, _SharedString) else value
+            for value in (cells.get(col) for col in range(1, width + 1))
+        ])
+    return result
+
+def _calamine_value_rows(file_content, max_rows=None):
+    """첫 번째 시트를 calamine으로 읽어 행 목록 반환 (xlsx/xls 공통)"""
+    workbook = CalamineWorkbook.from_filelike(io.BytesIO(file_content))
+    rows = workbook.get_sheet_by_index(0).to_python(skip_empty_area=False, nrows=max_rows)
+    # 날짜만 있는 셀은 openpyxl/xlrd처럼 datetime으로
+    return (
+        [datetime.datetime.combine(value, datetime.time()) if type(value) is datetime.date else value
+         for value in row]
+        for row in rows
+    )
+
+def excel_engine():
+    """엑셀 읽기에 사용할 엔진 ('calamine' 또는 'default')"""
+    if READER_ENGINE in ('auto', 'calamine') and CalamineWorkbook is not None:
+        return 'calamine'
+    if READER_ENGINE == 'calamine':
+        logger.warning("python-calamine이 설치되어 있지 않아 기본 엑셀 엔진을 사용합니다")
+    return 'default'
+
+def _excel_value_rows(file_content, max_rows=None):
+    if excel_engine() == 'calamine':
+        try:
+            return _calamine_value_rows(file_content, max_rows)
+        except Exception as e:
+            # calamine이 읽지 못하는 파일은 기본 엔진으로 다시 읽음
+            logger.warning("calamine 읽기 실패, 기본 엔진 사용: %s", e)
+    if _is_xlsx_content(file_content):
+        return _xlsx_value_rows(file_content, max_rows)
+    raw = pd.read_excel(io.BytesIO(file_content), header=None, dtype=object, na_filter=False, nrows=max_rows)
+    return raw.values.tolist()
+
+def _read_excel_rows(file_content, max_rows=None):
+    return _to_grid(_excel_value_rows(file_content, max_rows))
+
+def _clean_rows(value_rows):
+    # 셀 값 변환 후 행 끝 빈 셀 제거
+    for values in value_rows:
+        row = [_convert_xlsx_value(value) for value in values]
+        while row and row[-1] == "":
+            row.pop()
+        yield row
+
+def _to_grid(value_rows):
+    # 셀 값 변환, 행 끝 빈 셀/파일 끝 빈 행 제거 후 가장 긴 행에 맞춰 채움
+    rows = list(_clean_rows(value_rows))
+    while rows and not rows[-1]:
+        rows.pop()
+    width = max((len(row) for row in rows), default=0)
+    for row in rows:
+        if len(row) < width:
+            row.extend([""] * (width - len(row)))
+    return rows
+
+def _read_upload_rows(file_content, file_name, max_rows=None):
+    if _is_csv(file_name):
+        return list(islice(_csv_rows(file_content), max_rows))
+    return _read_excel_rows(file_content, max_rows)
+
+def _csv_rows(file_content):
+    text = io.TextIOWrapper(io.BytesIO(file_content), encoding='utf-8-sig', newline='')
+    return csv.reader(text)
+
+def _is_blank_line(row):
+    # TextParser(skip_blank_lines)가 건너뛰는 행
+    return not row or (len(row) == 1 and isinstance(row[0], str) and not row[0].strip())
+
+def _rows_to_frame(rows, skiprows, is_csv):
+    """행 iterator → DataFrame (그리드와 TextParser(header=0, skiprows)로 읽은 것과 같은 결과)
+
+    skiprows 다음 행을 헤더로, 이후 행은 컬럼별 리스트에 바로 모은다. 헤더보다 긴 행이 있으면
+    이름 없는 컬럼을 늘리고, 엑셀은 파일 끝 빈 행을 뺀다.
+    """
+    rows = islice(rows, skiprows, None)
+    header = list(next(rows, []))
+    while header and header[-1] == "":
+        header.pop()
+    columns = [[] for _ in header]
+    length = 0
+    last_with_data = 0
+    for row in rows:
+        # csv는 빈 줄을 건너뜀 (엑셀 행은 그리드에서 채워진 뒤 보던 것처럼 컬럼이 하나일 때만, 아래에서)
+        if is_csv and _is_blank_line(row):
+            continue
+        width = len(row)
+        while width > len(columns) and row[width - 1] == "":
+            width -= 1
+        if width > len(columns):
+            columns.extend([""] * length for _ in range(width - len(columns)))
+        for column, value in zip(columns, row):
+            column.append(value)
+        for column in columns[len(row):]:
+            column.append("")
+        length += 1
+        if row:
+            last_with_data = length
+    if not is_csv:
+        for column in columns:
+            del column[last_with_data:]
+        if len(columns) == 1:
+            columns[0] = [value for value in columns[0] if not _is_blank_line([value])]
+    header.extend([""] * (len(columns) - len(header)))
+
+    # 헤더 이름(중복/빈 이름 처리)과 컬럼별 타입 추론은 pd.read_excel/read_csv와 같도록 TextParser 사용
+    names = TextParser([header], header=0, skip_blank_lines=False).read().columns
+    frame = pd.DataFrame({
+        position: TextParser(list(zip(values)), header=None, names=[0], skip_blank_lines=False).read()[0]
+        for position, values in enumerate(columns)
+    })
+    frame.columns = names
+    return frame
+
+def _get_upload_entry(file_content, file_name):
+    key = (hashlib.sha256(file_content).hexdigest(), _is_csv(file_name))
+    with _upload_cache_lock:
+        entry = _upload_cache.get(key)
+        if entry is None:
+            # head: 앞부분을 따로 읽을 수 없는 형식의 감지용 행, rows: 프레임을 만들기 전까지만 두는 전체 행
+            entry = _upload_cache[key] = {'head': None, 'rows': None, 'frames': {}}
+        _upload_cache.move_to_end(key)
+        while len(_upload_cache) > UPLOAD_CACHE_SIZE:
+            _upload_cache.popitem(last=False)
+    return entry
+
+def read_upload_head(file_content, file_name, max_rows):
+    """파일 앞부분 max_rows행 그리드 (마켓/헤더 위치 감지용)
+
+    csv와 xlsx는 앞부분만 읽으므로 파일 크기와 관계없이 비용이 일정하다. 앞부분만 읽을 수 없는
+    형식(xls 등)은 전체를 한 번 읽어 이어지는 DataFrame 읽기에 넘기고, 앞부분 행만 남겨 둔다.
+    """
+    if _is_csv(file_name):
+        return _read_upload_rows(file_content, file_name, max_rows)
+    if _is_xlsx_content(file_content):
+        try:
+            return _to_grid(read_xlsx_head(file_content, max_rows))
+        except Exception as e:
+            logger.warning("xlsx 앞부분 읽기 실패, 전체 읽기 사용: %s", e)
+    entry = _get_upload_entry(file_content, file_name)
+    head = entry['head']
+    if head is None or (max_rows > len(head) and len(head) == HEADER_SCAN_ROWS):
+        rows = _read_excel_rows(file_content)
+        head = entry['head'] = rows[:HEADER_SCAN_ROWS]
+        entry['rows'] = rows
+        return rows[:max_rows]
+    return head[:max_rows]
+
+def _read_tabular_file(file_content, file_name, skiprows=0):
+    entry = _get_upload_entry(file_content, file_name)
+    df = entry['frames'].get(skiprows)
+    if df is None:
+        rows = entry['rows']
+        if rows is not None:
+            # 감지할 때 읽은 전체 행은 프레임을 만든 뒤 버림
+            entry['rows'] = None
+        elif _is_csv(file_name):
+            rows = _csv_rows(file_content)
+        else:
+            rows = _clean_rows(_excel_value_rows(file_content))
+        df = entry['frames'][skiprows] = _rows_to_frame(rows, skiprows, _is_csv(file_name))
+    # 호출하는 쪽은 컬럼 이름만 바꾸고 값은 고치지 않으므로 데이터는 캐시와 공유
+    return df.copy(deep=False)
+
+def clear_upload_cache():
+    with _upload_cache_lock:
+        _upload_cache.clear()
@@ -0,0 +1,206 @@
+"""복붙 입력 품목별 판매 집계
+
+줄마다 구분자(탭 > 쉼표 > 없음)가 같은 줄끼리 묶어 컬럼을 한 번에 나누고, 상품명 분류는 고유
+상품명마다 한 번만 한다. PasteAggregator는 직전 입력과 달라진 줄만 다시 파싱해 집계를 갱신한다.
+"""
+import csv
+import io
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from .products import identify_products
+
+_NON_DIGIT_RE = re.compile(r'[^0-9]')
+_TRAILING_QTY_RE = r'^(.*?)(\d+)$'
+
+
+def _split_paste_line(line):
+    if '\t' in line:
+        return [c.strip() for c in line.split('\t')]
+    if ',' in line:
+        return [c.strip() for c in line.split(',')]
+    return [line.strip()]
+
+def _paste_lines(text):
+    return [l.strip() for l in text.splitlines() if l.strip()]
+
+def _detect_header(first_line):
+    """첫 줄이 헤더면 (상품명 컬럼, 수량 컬럼) 위치, 아니면 (None, None)"""
+    name_idx = None
+    qty_idx = None
+    for idx, col in enumerate(_split_paste_line(first_line)):
+        col_str = str(col)
+        if any(k in col_str for k in ['상품', '품목']):
+            name_idx = idx
+        if '수량' in col_str:
+            qty_idx = idx
+    if name_idx is None or qty_idx is None:
+        return None, None
+    return name_idx, qty_idx
+
+def _split_delimited(lines, delimiter, name_idx, qty_idx):
+    """구분자가 있는 줄 → (상품명, 수량 문자열) 배열
+
+    헤더 컬럼이 있는 줄은 그 위치, 아니면 첫 컬럼과 숫자가 있는 첫 컬럼. 줄 묶음을 C 파서로 한 번에
+    분할한다 (따옴표 처리 없이 str.split과 같은 결과).
+    """
+    col_count = (lines.str.len() - lines.str.replace(delimiter, '', regex=False).str.len()).to_numpy() + 1
+    by_header = np.zeros(len(lines), dtype=bool)
+    if name_idx is not None:
+        by_header = col_count > max(name_idx, qty_idx)
+    cols = pd.read_csv(
+        io.StringIO('\n'.join(lines.to_numpy(dtype=object))), sep=delimiter, header=None,
+        names=range(col_count.max()), usecols=[name_idx, qty_idx] if by_header.all() else None,
+        dtype=object, na_filter=False, quoting=csv.QUOTE_NONE, engine='c'
+    )
+    name = np.full(len(lines), '', dtype=object)
+    qty = np.full(len(lines), '', dtype=object)
+    if by_header.any():
+        name[by_header] = cols[name_idx].str.strip().to_numpy()[by_header]
+        qty[by_header] = cols[qty_idx].str.strip().to_numpy()[by_header]
+
+    rest = ~by_header
+    if rest.any():
+        values = cols[rest].apply(lambda col: col.str.strip())
+        has_digit = values.iloc[:, 1:].apply(lambda col: col.str.contains(r'\d')).to_numpy(dtype=bool)
+        found = values.iloc[:, 1:].to_numpy(dtype=object)[np.arange(len(values)), has_digit.argmax(axis=1)]
+        name[rest] = values[0].to_numpy(dtype=object)
+        qty[rest] = np.where(has_digit.any(axis=1), found, '')
+    return name, qty
+
+def _split_plain(lines, name_idx, qty_idx):
+    # 구분자가 없는 줄 → 끝의 숫자가 수량, 그 앞이 상품명 (숫자로 끝나지 않으면 상품명 없음)
+    values = lines.to_numpy(dtype=object)
+    if name_idx == 0 and qty_idx == 0:
+        # 헤더 한 컬럼에 상품/수량이 함께 있으면 줄 전체가 상품명이자 수량
+        return values, values
+    matched = lines.str.extract(_TRAILING_QTY_RE)
+    name = matched[0].str.strip().fillna('').to_numpy(dtype=object)
+    return name, matched[1].fillna('').to_numpy(dtype=object)
+
+def _to_quantity(qty_str):
+    return int(_NON_DIGIT_RE.sub('', str(qty_str)) or 0)
+
+def _split_products(name, qty):
+    # 'OH, PH' 수량 3 → [('OH', 2), ('PH', 1)] (수량을 상품 수로 나누고 나머지는 앞 상품부터)
+    name_parts = [n.strip() for n in name.split(',') if n.strip()]
+    if not name_parts:
+        return []
+    base_qty, remainder = divmod(qty, len(name_parts))
+    split = [(part, base_qty + (1 if idx < remainder else 0)) for idx, part in enumerate(name_parts)]
+    return [(part, part_qty) for part, part_qty in split if part_qty > 0]
+
+def _parse_lines(lines, name_idx=None, qty_idx=None, normalize=True):
+    """줄 목록 → 줄별 (줄 번호, 상품명, 수량) DataFrame
+
+    줄마다 구분자(탭 > 쉼표 > 없음)를 한 번 판별해 같은 구분자 줄끼리 한 번에 분할한다.
+    쉼표로 여러 상품을 적은 줄은 수량을 상품 수로 나눈다. 수량 변환, 여러 상품 분할, 상품명 분류는
+    고유값마다 한 번만 한다.
+    """
+    lines = pd.Series(lines, dtype=str)
+    names = np.full(len(lines), '', dtype=object)
+    qty_strs = np.full(len(lines), '', dtype=object)
+    has_tab = lines.str.contains('\t', regex=False).to_numpy(dtype=bool)
+    has_comma = ~has_tab & lines.str.contains(',', regex=False).to_numpy(dtype=bool)
+    plain = ~has_tab & ~has_comma
+    for mask, delimiter in ((has_tab, '\t'), (has_comma, ',')):
+        if mask.any():
+            names[mask], qty_strs[mask] = _split_delimited(lines[mask], delimiter, name_idx, qty_idx)
+    if plain.any():
+        names[plain], qty_strs[plain] = _split_plain(lines[plain], name_idx, qty_idx)
+
+    codes, uniques = pd.factorize(qty_strs)
+    quantities = np.array([_to_quantity(value) for value in uniques] or [0])[codes]
+    if quantities.dtype != object and quantities.max(initial=0) > 2 ** 31:
+        # 곱셈/합계가 넘치지 않도록 큰 수량은 파이썬 정수로
+        quantities = quantities.astype(object)
+    valid = (names != '') & (quantities > 0)
+    line_nos = np.flatnonzero(valid)
+    names, quantities = names[valid], quantities[valid]
+
+    multi = np.fromiter((',' in name for name in names), dtype=bool, count=len(names))
+    if multi.any():
+        split_cache = {}
+        split_rows = []
+        for line_no, name, qty in zip(line_nos[multi], names[multi], quantities[multi]):
+            key = (name, qty)
+            if key not in split_cache:
+                split_cache[key] = _split_products(name, qty)
+            split_rows.extend((line_no, part, part_qty) for part, part_qty in split_cache[key])
+        split = np.array(split_rows, dtype=object).reshape(-1, 3)
+        line_nos = np.concatenate([line_nos[~multi], split[:, 0].astype(np.int64)])
+        names = np.concatenate([names[~multi], split[:, 1]])
+        quantities = np.concatenate([quantities[~multi], split[:, 2].astype(quantities.dtype)])
+
+    if normalize and len(names):
+        names = identify_products(names)
+    return pd.DataFrame({'줄': line_nos, '상품명': names, '수량': quantities})
+
+def _summarize(totals):
+    # {상품명: 수량} → (상품명 순 집계 DataFrame, 총 수량), 수량이 0인 상품 제외
+    items = sorted((name, qty) for name, qty in totals.items() if qty > 0)
+    if not items:
+        return pd.DataFrame(columns=['상품명', '수량']), 0
+    summary = pd.DataFrame(items, columns=['상품명', '수량'])
+    return summary, int(summary['수량'].sum())
+
+def _line_totals(lines, counts, name_idx, qty_idx, normalize):
+    # 줄별 등장 횟수(counts)를 곱한 상품명별 수량 합계
+    parsed = _parse_lines(lines, name_idx, qty_idx, normalize)
+    if parsed.empty:
+        return {}
+    weights = np.asarray(counts, dtype=np.int64)[parsed['줄'].to_numpy()]
+    qty = pd.Series(parsed['수량'].to_numpy() * weights)
+    return {name: int(total) for name, total in qty.groupby(parsed['상품명'].to_numpy()).sum().items()}
+
+class PasteAggregator:
+    """붙여넣기 집계 (증분)
+
+    직전 입력의 줄별 등장 횟수와 상품명별 합계를 들고 있다가, 새 입력에서 등장 횟수가 바뀐 줄만
+    파싱해 합계에 더하고 뺀다. 헤더 줄이나 분류 옵션이 바뀌면 처음부터 다시 집계한다.
+    """
+
+    def __init__(self):
+        self._key = None
+        self._input = None
+        self._result = None
+        self._line_counts = Counter()
+        self._totals = Counter()
+        self.changed_lines = 0
+
+    def update(self, text, normalize=True):
+        """새 입력 전체 → (상품명별 집계 DataFrame, 총 수량) (parse_pasted_sales와 같은 결과)"""
+        if (text, normalize) == self._input:
+            # 입력이 그대로면 (다른 위젯 조작으로 다시 실행된 경우) 직전 결과
+            self.changed_lines = 0
+            summary, total_qty = self._result
+            return summary.copy(), total_qty
+        lines = _paste_lines(text)
+        name_idx, qty_idx = _detect_header(lines[0]) if lines else (None, None)
+        start_idx = 1 if name_idx is not None else 0
+        key = (lines[0] if start_idx else None, normalize)
+        if key != self._key:
+            self._key = key
+            self._line_counts = Counter()
+            self._totals = Counter()
+
+        line_counts = Counter(lines[start_idx:])
+        # 등장 횟수가 달라진 줄만 (새 횟수 - 이전 횟수)
+        changed = Counter(dict(line_counts.items() - self._line_counts.items()))
+        changed.subtract(dict(self._line_counts.items() - line_counts.items()))
+        self._line_counts = line_counts
+        self.changed_lines = len(changed)
+        if changed:
+            delta = _line_totals(list(changed), list(changed.values()), name_idx, qty_idx, normalize)
+            self._totals.update(delta)
+        self._input = (text, normalize)
+        self._result = _summarize(self._totals)
+        summary, total_qty = self._result
+        return summary.copy(), total_qty
+
+def parse_pasted_sales(text, normalize=True):
+    """붙여넣은 텍스트 → (상품명별 판매 수량 DataFrame, 총 수량) (같은 줄은 한 번만 파싱)"""
+    return PasteAggregator().update(text, normalize=normalize)
@@ -0,0 +1,94 @@
+"""파이프라인 단계별 처리 시간 기록
+
+단계마다 실행 시간, 입력/출력 행 수, 입력/출력 bytes를 dict 레코드로 남긴다.
+UI는 stage_summary로 표를 만들고, CLI는 레코드를 그대로 JSON으로 저장한다.
+"""
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+# 단계 표시 이름
+STAGE_LABELS = {
+    'coupang_sort': '쿠팡 원본 정렬',
+    'parse': '마켓 파일 파싱',
+    'detect': '└ 마켓 감지',
+    'read': '└ 파일 읽기',
+    'map': '└ 컬럼 매핑',
+    'order_store': '발주 기록 대조',
+    'consolidate': '주문 통합',
+    'write_order': '발주 파일 저장',
+    'invoice_load': '송장번호 불러오기',
+    'invoice_match': '송장번호 매칭',
+    'write_order_mgmt': '주문관리시트 저장',
+    'coupang_delivery': '쿠팡 발송 파일',
+    'naver_delivery': '네이버 발송 파일',
+}
+
+SUB_STAGES = ('detect', 'read', 'map')
+
+
+def _new_record(stage, counts):
+    record = {
+        'stage': stage,
+        'seconds': 0.0,
+        'rows_in': None,
+        'rows_out': None,
+        'bytes_in': None,
+        'bytes_out': None,
+        'cached': False,
+    }
+    record.update(counts)
+    return record
+
+
+class StageTimer:
+    """단계별 레코드 목록. stage()로 감싼 구간의 시간을 잰다
+
+    on_stage(stage)를 주면 단계가 시작될 때마다 호출한다 (백그라운드 작업 진행 상황 표시용).
+    """
+
+    def __init__(self, on_stage=None):
+        self.records = []
+        self.on_stage = on_stage
+
+    @contextmanager
+    def stage(self, name, **counts):
+        """with timer.stage('consolidate', rows_in=n) as record: ... record['rows_out'] = m"""
+        record = _new_record(name, counts)
+        if self.on_stage is not None:
+            self.on_stage(name)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            self.records.append(record)
+
+    def add(self, name, seconds, **counts):
+        """다른 곳(워커 프로세스 등)에서 잰 시간을 레코드로 추가"""
+        record = _new_record(name, counts)
+        record['seconds'] = seconds
+        self.records.append(record)
+        return record
+
+
+def total_seconds(records):
+    # 하위 단계(파싱 안의 감지/읽기/매핑)는 파싱 시간에 포함되므로 제외
+    return sum(r['seconds'] for r in records if r['stage'] not in SUB_STAGES)
+
+
+def stage_summary(records):
+    """레코드 목록 → 표시용 DataFrame (단계, 시간(초), 입력/출력 행, 입력/출력 KB)"""
+    rows = []
+    for r in records:
+        rows.append({
+            '단계': STAGE_LABELS.get(r['stage'], r['stage']) + (' (캐시)' if r['cached'] else ''),
+            '시간(초)': round(r['seconds'], 3),
+            '입력 행': r['rows_in'],
+            '출력 행': r['rows_out'],
+            '입력 KB': None if r['bytes_in'] is None else round(r['bytes_in'] / 1024, 1),
+            '출력 KB': None if r['bytes_out'] is None else round(r['bytes_out'] / 1024, 1),
+        })
+    summary = pd.DataFrame(rows, columns=['단계', '시간(초)', '입력 행', '출력 행', '입력 KB', '출력 KB'])
+    return summary.astype({'입력 행': 'Int64', '출력 행': 'Int64'})
@@ -0,0 +1,63 @@
+"""셀 값 정규화 헬퍼"""
+import re
+
+import pandas as pd
+
+
+def clean_phone(phone):
+    if pd.isna(phone): return ""
+    return re.sub(r'[^0-9]', '', str(phone))
+
+def clean_phones(values):
+    """clean_phone의 컬럼 단위 버전"""
+    digits = values.astype(object).astype(str).str.replace(r'[^0-9]', '', regex=True)
+    return digits.where(values.notna(), "").astype(object)
+
+def normalize_excel_id(value):
+    if pd.isna(value):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    text = str(value).strip()
+    if re.fullmatch(r'\d+\.0', text):
+        return text[:-2]
+    return text
+
+def get_message(row, cols):
+    for col in cols:
+        if col in row and pd.notna(row[col]) and str(row[col]).strip() != "":
+            return str(row[col]).strip()
+    return ""
+
+def coalesce_messages(df, cols):
+    """get_message의 컬럼 단위 버전: 행마다 cols 중 처음으로 비어 있지 않은 값"""
+    result = pd.Series("", index=df.index, dtype=object)
+    filled = pd.Series(False, index=df.index)
+    for col in cols:
+        if col not in df.columns:
+            continue
+        values = df[col]
+        text = values.astype(object).astype(str).str.strip()
+        valid = values.notna() & (text != "") & ~filled
+        result[valid] = text[valid]
+        filled |= valid
+    return result
+
+def column_or_default(df, col, default=None):
+    if col in df.columns:
+        return df[col]
+    return pd.Series(default, index=df.index, dtype=object)
+
+def pick_first_col(columns, candidates):
+    for col in candidates:
+        if col in columns:
+            return col
+    return None
+
+def format_date(value):
+    if pd.isna(value):
+        return ""
+    try:
+        return pd.to_datetime(value).strftime('%Y.%m.%d')
+    except Exception:
+        return str(value)
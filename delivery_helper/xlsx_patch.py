@@ -0,0 +1,621 @@
+"""xlsx 파일을 XML 수준에서 수정
+
+openpyxl로 통째로 읽고 다시 저장하면 서식 일부(그림, 조건부 서식 확장 등)가 사라지고 느리다.
+여기서는 활성 시트 XML의 행/셀만 고치고(정렬, 운송장번호 채우기, 텍스트 서식),
+styles.xml은 필요한 셀 서식(xf)만 뒤에 추가한다. 나머지 파트는 그대로 복사한다.
+시트 행/셀은 모두 객체로 올려 고치므로 메모리는 openpyxl 전체 로드처럼 행 수에 비례한다 (객체가 가벼울 뿐).
+"""
+import io
+import posixpath
+import re
+import zipfile
+from xml.sax.saxutils import escape, unescape
+
+from openpyxl.formula.translate import Translator
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+from .utils import normalize_excel_id
+
+TEXT_NUMBER_FORMAT_ID = '49'  # 기본 제공 '@' 서식
+
+# 태그의 속성 부분 (따옴표 안의 '>'와 '/'는 속성 값으로 취급)
+_ATTRS = r'((?:[^>"\'/]+|/(?!>)|"[^"]*"|\'[^\']*\')*)'
+_REL_TYPE_BASE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+_ATTR_RE_CACHE = {}
+_CELL_REF_RE = re.compile(r'([A-Za-z]+)(\d+)')
+_RANGE_REF_RE = re.compile(r'([A-Za-z]+)(\d+)(?::([A-Za-z]+)(\d+))?$')
+_TEXT_RE = re.compile(r'<(?:\w+:)?t(?:\s[^>]*)?>(.*?)</(?:\w+:)?t>|<(?:\w+:)?t(?:\s[^>]*)?/>', re.S)
+_PHONETIC_RE = re.compile(r'<(?:\w+:)?rPh\b.*?</(?:\w+:)?rPh>', re.S)
+
+
+def _text_format_columns(header, target_cols=None, keyword_cols=None):
+    """텍스트 서식을 적용할 컬럼 번호(1부터 시작) 집합"""
+    target_cols = target_cols or []
+    keyword_cols = keyword_cols or []
+    col_indexes = set()
+
+    for col_name in target_cols:
+        if col_name in header:
+            col_indexes.add(header.index(col_name) + 1)
+
+    for idx, name in enumerate(header, start=1):
+        name_str = str(name) if name is not None else ""
+        if any(keyword in name_str for keyword in keyword_cols):
+            col_indexes.add(idx)
+
+    return col_indexes
+
+def _attr_re(name):
+    pattern = _ATTR_RE_CACHE.get(name)
+    if pattern is None:
+        pattern = re.compile(r'(\s)' + re.escape(name) + r'=(["\'])(.*?)\2', re.S)
+        _ATTR_RE_CACHE[name] = pattern
+    return pattern
+
+def _get_attr(attrs, name):
+    match = _attr_re(name).search(attrs)
+    if match is None:
+        return None
+    value = match.group(3)
+    return unescape(value, {'&quot;': '"'}) if '&' in value else value
+
+def _set_attr(attrs, name, value):
+    """속성 문자열에서 name 값을 바꾸거나 추가 (value가 None이면 삭제)"""
+    pattern = _attr_re(name)
+    if value is None:
+        return pattern.sub('', attrs, count=1)
+    if pattern.search(attrs):
+        return pattern.sub(lambda m: f'{m.group(1)}{name}="{value}"', attrs, count=1)
+    return f'{attrs} {name}="{value}"'
+
+def _text_content(xml):
+    # 공유 문자열/인라인 문자열의 텍스트 (서식 있는 텍스트는 run을 이어 붙이고, 윗주는 제외)
+    xml = _PHONETIC_RE.sub('', xml)
+    return unescape(''.join(match.group(1) or '' for match in _TEXT_RE.finditer(xml)))
+
+def _cast_number(text):
+    # openpyxl과 같은 숫자 해석
+    if '.' in text or 'E' in text or 'e' in text:
+        return float(text)
+    return int(text)
+
+
+def _numbered_keys(keys):
+    # 같은 키가 여러 번 나오면 (키, 0), (키, 1), … 로 구분
+    counts = {}
+    numbered = []
+    for key in keys:
+        counts[key] = counts.get(key, -1) + 1
+        numbered.append((key, counts[key]))
+    return numbered
+
+
+class _Cell:
+    __slots__ = ('col', 'attrs', 'inner')
+
+    def __init__(self, col, attrs, inner):
+        self.col = col
+        self.attrs = attrs
+        self.inner = inner
+
+
+class _Row:
+    __slots__ = ('num', 'attrs', 'cells')
+
+    def __init__(self, num, attrs, cells):
+        self.num = num
+        self.attrs = attrs
+        self.cells = cells
+
+    def cell(self, col):
+        for cell in self.cells:
+            if cell.col == col:
+                return cell
+        return None
+
+    def add_cell(self, cell):
+        self.cells.append(cell)
+        self.cells.sort(key=lambda c: c.col)
+        return cell
+
+
+class _XlsxPackage:
+    """xlsx zip 파트와 활성 시트/공유 문자열/셀 서식 목록"""
+
+    def __init__(self, file_content):
+        self.zip = zipfile.ZipFile(io.BytesIO(file_content))
+        self.parts = {}
+        self.removed = set()
+
+        workbook_path = self._main_workbook_path()
+        workbook_xml = self.read_text(workbook_path)
+        rels_path = posixpath.join(posixpath.dirname(workbook_path), '_rels',
+                                   posixpath.basename(workbook_path) + '.rels')
+        self.workbook_rels_path = rels_path
+        rels = self._relationships(rels_path, posixpath.dirname(workbook_path))
+
+        # openpyxl의 wb.active와 같은 시트 (workbookView activeTab, 기본 0)
+        sheet_ids = [_get_attr(attrs, 'r:id') or re.search(r'\s\w+:id=["\'](.*?)["\']', attrs).group(1)
+                     for attrs in re.findall(rf'<(?:\w+:)?sheet\b{_ATTRS}/?>', workbook_xml)]
+        view = re.search(rf'<(?:\w+:)?workbookView\b{_ATTRS}/?>', workbook_xml)
+        active = int(_get_attr(view.group(1), 'activeTab') or 0) if view else 0
+        if not sheet_ids:
+            raise ValueError("시트가 없는 통합 문서입니다")
+        sheet_id = sheet_ids[active] if active < len(sheet_ids) else sheet_ids[0]
+        self.sheet_path = rels[sheet_id][0]
+        self.first_sheet_path = rels[sheet_ids[0]][0]
+
+        self.shared_strings_path = self._rel_target(rels, 'sharedStrings')
+        self.styles_path = self._rel_target(rels, 'styles')
+        self.calc_chain_path = self._rel_target(rels, 'calcChain')
+        self._shared_strings = None
+        self._styles_xml = None
+        self._xfs = None
+        self._text_xf_cache = {}
+
+    def _main_workbook_path(self):
+        rels = self._relationships('_rels/.rels', '')
+        for target, rel_type in rels.values():
+            if rel_type.endswith('/officeDocument'):
+                return target
+        return 'xl/workbook.xml'
+
+    def _relationships(self, rels_path, base_dir):
+        rels = {}
+        if rels_path not in self.zip.namelist():
+            return rels
+        for attrs in re.findall(rf'<(?:\w+:)?Relationship\b{_ATTRS}/?>', self.read_text(rels_path)):
+            target = _get_attr(attrs, 'Target') or ''
+            if target.startswith('/'):
+                target = target[1:]
+            else:
+                target = posixpath.normpath(posixpath.join(base_dir, target))
+            rels[_get_attr(attrs, 'Id')] = (target, _get_attr(attrs, 'Type') or '')
+        return rels
+
+    @staticmethod
+    def _rel_target(rels, kind):
+        for target, rel_type in rels.values():
+            if rel_type == _REL_TYPE_BASE + kind:
+                return target
+        return None
+
+    def read_text(self, path):
+        if path in self.parts:
+            return self.parts[path]
+        return self.zip.read(path).decode('utf-8')
+
+    @property
+    def shared_strings(self):
+        if self._shared_strings is None:
+            self._shared_strings = []
+            if self.shared_strings_path and self.shared_strings_path in self.zip.namelist():
+                xml = self.read_text(self.shared_strings_path)
+                self._shared_strings = [
+                    _text_content(item)
+                    for item in re.findall(r'<(?:\w+:)?si\b[^>]*?(?:/>|>(.*?)</(?:\w+:)?si>)', xml, re.S)
+                ]
+        return self._shared_strings
+
+    def _load_xfs(self):
+        if self._xfs is not None:
+            return
+        if not self.styles_path:
+            raise ValueError("styles.xml이 없는 통합 문서입니다")
+        self._styles_xml = self.read_text(self.styles_path)
+        section = re.search(rf'<(\w+:)?cellXfs\b{_ATTRS}>(.*?)</(?:\w+:)?cellXfs>', self._styles_xml, re.S)
+        if section is None:
+            raise ValueError("셀 서식(cellXfs)이 없는 통합 문서입니다")
+        self._xf_prefix = section.group(1) or ''
+        self._xfs = [match.group(0) for match in re.finditer(
+            rf'<(?:\w+:)?xf\b{_ATTRS}(?:/>|>.*?</(?:\w+:)?xf>)', section.group(3), re.S
+        )]
+        self._xf_count = len(self._xfs)
+
+    def text_style(self, style_id):
+        """셀 서식 style_id에 텍스트(@) 표시 형식만 바꾼 서식 번호"""
+        style_id = int(style_id or 0)
+        cached = self._text_xf_cache.get(style_id)
+        if cached is not None:
+            return cached
+
+        self._load_xfs()
+        xf = self._xfs[style_id] if style_id < len(self._xfs) else self._xfs[0]
+        open_tag = re.match(rf'<(?:\w+:)?xf\b{_ATTRS}(/?>)', xf)
+        attrs = open_tag.group(1)
+        if _get_attr(attrs, 'numFmtId') == TEXT_NUMBER_FORMAT_ID:
+            result = style_id
+        else:
+            new_attrs = _set_attr(attrs, 'numFmtId', TEXT_NUMBER_FORMAT_ID)
+            new_attrs = _set_attr(new_attrs, 'applyNumberFormat', '1')
+            new_xf = f'<{self._xf_prefix}xf{new_attrs}{open_tag.group(2)}' + xf[open_tag.end():]
+            if new_xf in self._xfs:
+                result = self._xfs.index(new_xf)
+            else:
+                self._xfs.append(new_xf)
+                result = len(self._xfs) - 1
+        self._text_xf_cache[style_id] = result
+        return result
+
+    def _write_styles(self):
+        if self._xfs is None or len(self._xfs) == self._xf_count:
+            return
+        added = ''.join(self._xfs[self._xf_count:])
+        prefix = self._xf_prefix
+
+        def replace(match):
+            attrs = _set_attr(match.group(1), 'count', str(len(self._xfs)))
+            return f'<{prefix}cellXfs{attrs}>{match.group(2)}{added}</{prefix}cellXfs>'
+
+        self.parts[self.styles_path] = re.sub(
+            rf'<(?:\w+:)?cellXfs\b{_ATTRS}>(.*?)</(?:\w+:)?cellXfs>', replace, self._styles_xml, count=1, flags=re.S
+        )
+
+    def drop_calc_chain(self):
+        """행 순서를 바꾸면 계산 체인이 맞지 않으므로 삭제 (엑셀이 다시 만든다)"""
+        if not self.calc_chain_path or self.calc_chain_path not in self.zip.namelist():
+            return
+        name = posixpath.basename(self.calc_chain_path)
+        self.removed.add(self.calc_chain_path)
+        self.parts[self.workbook_rels_path] = re.sub(
+            r'<(?:\w+:)?Relationship\b[^>]*?Target=["\'][^"\']*' + re.escape(name) + r'["\'][^>]*?/>', '',
+            self.read_text(self.workbook_rels_path)
+        )
+        self.parts['[Content_Types].xml'] = re.sub(
+            r'<(?:\w+:)?Override\b[^>]*?PartName=["\']/' + re.escape(self.calc_chain_path) + r'["\'][^>]*?/>', '',
+            self.read_text('[Content_Types].xml')
+        )
+
+    def save(self):
+        self._write_styles()
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, 'w') as out:
+            for info in self.zip.infolist():
+                if info.filename in self.removed:
+                    continue
+                if info.filename in self.parts:
+                    out.writestr(info, self.parts[info.filename].encode('utf-8'))
+                else:
+                    out.writestr(info, self.zip.read(info))
+        return output.getvalue()
+
+
+class _Sheet:
+    """활성 시트 XML: sheetData의 행/셀만 분해하고 나머지는 원문 유지"""
+
+    def __init__(self, package):
+        self.package = package
+        xml = package.read_text(package.sheet_path)
+        start = re.search(rf'<(\w+:)?sheetData\b{_ATTRS}(/?)>', xml)
+        if start is None:
+            raise ValueError("시트 데이터가 없습니다")
+        self.prefix = start.group(1) or ''
+        p = re.escape(self.prefix)
+
+        if start.group(3):
+            self.head, body, self.tail = xml[:start.start()] + f'<{self.prefix}sheetData>', '', \
+                f'</{self.prefix}sheetData>' + xml[start.end():]
+        else:
+            end = xml.index(f'</{self.prefix}sheetData>', start.end())
+            self.head, body, self.tail = xml[:start.end()], xml[start.end():end], xml[end:]
+
+        self._cell_re = re.compile(rf'<{p}c\b{_ATTRS}(?:/>|>(.*?)</{p}c>)', re.S)
+        self._value_re = re.compile(rf'<{p}v(?:\s{_ATTRS})?>(.*?)</{p}v>', re.S)
+        self._formula_re = re.compile(rf'<{p}f\b{_ATTRS}(?:/>|>(.*?)</{p}f>)', re.S)
+
+        self.rows = []
+        self.max_col = 0
+        row_num = 0
+        for match in re.finditer(rf'<{p}row\b{_ATTRS}(?:/>|>(.*?)</{p}row>)', body, re.S):
+            attrs = match.group(1)
+            row_num = int(_get_attr(attrs, 'r') or row_num + 1)
+            cells = []
+            col = 0
+            for cell_match in self._cell_re.finditer(match.group(2) or ''):
+                cell_attrs = cell_match.group(1)
+                ref = _get_attr(cell_attrs, 'r')
+                col = column_index_from_string(_CELL_REF_RE.match(ref).group(1)) if ref else col + 1
+                cells.append(_Cell(col, cell_attrs, cell_match.group(2)))
+            if cells:
+                self.max_col = max(self.max_col, max(cell.col for cell in cells))
+            self.rows.append(_Row(row_num, attrs, cells))
+        # openpyxl의 max_row처럼 셀이 있는 행까지 (끝의 빈 <row/>는 정렬/추가 범위에서 제외)
+        self.max_row = max((row.num for row in self.rows if row.cells), default=0)
+        self._rows_by_num = {row.num: row for row in self.rows}
+        self._row_keys = None
+        if 'shared' in body:
+            self._unshare_formulas()
+
+    def _unshare_formulas(self):
+        """공유 수식을 셀마다 풀어 쓴 수식으로 (openpyxl이 읽을 때와 같은 수식)
+
+        공유 수식은 기준 셀의 수식을 상대 위치로 옮겨 쓰는 방식이라, 행을 정렬하거나 옮기면 기준 셀과
+        어긋난다. 먼저 각 셀의 수식으로 바꿔 두면 행을 옮겨도 셀마다 원래 수식을 유지한다.
+        """
+        masters = {}
+        shared = []
+        for row in self.rows:
+            for cell in row.cells:
+                formula = cell.inner and self._formula_re.search(cell.inner)
+                if not formula or _get_attr(formula.group(1), 't') != 'shared':
+                    continue
+                shared.append((row.num, cell, formula))
+                if formula.group(2):
+                    masters[_get_attr(formula.group(1), 'si')] = (
+                        f'{get_column_letter(cell.col)}{row.num}', '=' + unescape(formula.group(2))
+                    )
+        p = self.prefix
+        for row_num, cell, formula in shared:
+            master = masters.get(_get_attr(formula.group(1), 'si'))
+            if master is None:
+                continue
+            origin, text = master
+            text = Translator(text, origin=origin).translate_formula(f'{get_column_letter(cell.col)}{row_num}')
+            cell.inner = cell.inner[:formula.start()] + f'<{p}f>{escape(text[1:])}</{p}f>' + cell.inner[formula.end():]
+
+    def row(self, num, create=False):
+        row = self._rows_by_num.get(num)
+        if row is None and create:
+            row = _Row(num, '', [])
+            self.rows.append(row)
+            self._rows_by_num[num] = row
+        return row
+
+    def value(self, cell, formula=True):
+        """openpyxl(data_only=False)이 읽는 것과 같은 셀 값 (formula=False면 수식 셀은 저장된 계산 값)"""
+        if cell is None or not cell.inner:
+            return None
+        data_type = _get_attr(cell.attrs, 't') or 'n'
+        if formula:
+            found = self._formula_re.search(cell.inner)
+            if found is not None and found.group(2):
+                return '=' + unescape(found.group(2))
+        if data_type == 'inlineStr':
+            return _text_content(cell.inner)
+        value = self._value_re.search(cell.inner)
+        if value is None or value.group(2) == '':
+            return None
+        value = value.group(2)
+        if data_type == 's':
+            return self.package.shared_strings[int(value)]
+        if data_type == 'n':
+            return _cast_number(value)
+        if data_type == 'b':
+            return bool(int(value))
+        return unescape(value)
+
+    def header(self):
+        row = self.row(1)
+        header = [None] * self.max_col
+        if row is not None:
+            for cell in row.cells:
+                header[cell.col - 1] = self.value(cell)
+        return header
+
+    def set_string(self, row_num, col, text, text_format=False):
+        row = self.row(row_num, create=True)
+        cell = row.cell(col) or row.add_cell(_Cell(col, f' r="{get_column_letter(col)}{row_num}"', None))
+        style = _get_attr(cell.attrs, 's')
+        if text_format:
+            style = str(self.package.text_style(style))
+        attrs = _set_attr(cell.attrs, 's', style)
+        if text == '':
+            cell.attrs, cell.inner = _set_attr(attrs, 't', None), None
+            return
+        space = ' xml:space="preserve"' if text != text.strip() else ''
+        p = self.prefix
+        cell.attrs = _set_attr(attrs, 't', 'inlineStr')
+        cell.inner = f'<{p}is><{p}t{space}>{escape(text)}</{p}t></{p}is>'
+
+    def _new_cell(self, row_num, col, value, style=None):
+        """새 행에 넣을 셀 (문자열은 인라인 문자열, 숫자/논리값은 그대로, 빈 값이면 None)"""
+        if value is None or value == '':
+            return None
+        p = self.prefix
+        attrs = f' r="{get_column_letter(col)}{row_num}"' + (f' s="{style}"' if style is not None else '')
+        if isinstance(value, str):
+            space = ' xml:space="preserve"' if value != value.strip() else ''
+            return _Cell(col, attrs + ' t="inlineStr"', f'<{p}is><{p}t{space}>{escape(value)}</{p}t></{p}is>')
+        if isinstance(value, bool):
+            return _Cell(col, attrs + ' t="b"', f'<{p}v>{int(value)}</{p}v>')
+        return _Cell(col, attrs, f'<{p}v>{value!r}</{p}v>')
+
+    def append_rows(self, source, key_columns=()):
+        """다른 통합 문서 시트(source)의 2행부터를 헤더 이름 기준으로 맞춰 끝에 추가하고 추가한 행 수 반환
+
+        이 시트에 없는 컬럼은 헤더 끝에 추가한다. 추가 행의 셀 서식은 이 시트 2행에서 헤더 이름이 같은
+        컬럼의 서식. 수식 셀은 옮기면 참조가 어긋나므로 파일에 저장된 계산 값을 넣는다.
+        key_columns 값이 앞서 합친 파일(기존 행 포함)에 있던 행은 추가하지 않는다. 한 파일 안에서
+        키가 같은 행은 서로 다른 주문 라인으로 보고 (키, 파일 내 순번)으로 비교한다.
+        """
+        header = self.header()
+        template = self.row(2)
+        styles = {cell.col: _get_attr(cell.attrs, 's') for cell in template.cells} if template else {}
+        col_map = {}
+        for col, name in enumerate(source.header(), start=1):
+            if name is None:
+                continue
+            if name not in header:
+                header.append(name)
+                self.set_string(1, len(header), str(name))
+                self.max_col = len(header)
+            col_map[col] = header.index(name) + 1
+
+        key_cols = [header.index(name) + 1 for name in key_columns if name in header]
+        if self._row_keys is None:
+            # 기존 행 키 (여러 파일을 추가할 때 한 번만 계산)
+            self._row_keys = set(_numbered_keys(
+                tuple(normalize_excel_id(self.value(row.cell(col))) for col in key_cols)
+                for row in self.rows if row.num >= 2 and row.cells
+            ))
+
+        added = 0
+        source_rows = []
+        for row in source.rows:
+            if row.num < 2:
+                continue
+            values = {
+                col_map[cell.col]: source.value(cell, formula=False) for cell in row.cells if cell.col in col_map
+            }
+            if any(value is not None for value in values.values()):
+                source_rows.append(values)
+        keys = _numbered_keys(tuple(normalize_excel_id(values.get(col)) for col in key_cols) for values in source_rows)
+        for values, key in zip(source_rows, keys):
+            if key_cols:
+                if key in self._row_keys:
+                    continue
+                self._row_keys.add(key)
+            self.max_row += 1
+            cells = [self._new_cell(self.max_row, col, values[col], styles.get(col)) for col in sorted(values)]
+            # 끝에 빈 <row/>가 있던 번호면 그 행을 채운다
+            self.row(self.max_row, create=True).cells = [cell for cell in cells if cell is not None]
+            added += 1
+        return added
+
+    def set_text_format(self, row_num, col):
+        """셀을 텍스트(@) 서식으로 바꾸고 숫자/논리값은 문자열로 변환"""
+        row = self.row(row_num, create=True)
+        cell = row.cell(col)
+        if cell is None:
+            cell = row.add_cell(_Cell(col, f' r="{get_column_letter(col)}{row_num}"', None))
+        data_type = _get_attr(cell.attrs, 't') or 'n'
+        formula = cell.inner and self._formula_re.search(cell.inner)
+        if data_type in ('n', 'b') and not formula:
+            value = self.value(cell)
+            if value is not None:
+                self.set_string(row_num, col, str(value), text_format=True)
+                return
+        cell.attrs = _set_attr(cell.attrs, 's', str(self.package.text_style(_get_attr(cell.attrs, 's'))))
+
+    def sort_rows(self, col):
+        """2행부터 col 값의 문자열 기준으로 안정 정렬 (빈 행은 빈 문자열로 취급)
+
+        한 행 안의 병합 범위와 하이퍼링크는 행과 함께 옮긴다. 여러 행에 걸친 병합 범위는 그대로 둔다.
+        """
+        def sort_key(num):
+            value = self.value(self.row(num).cell(col)) if self.row(num) else None
+            return str(value) if value is not None else ""
+
+        order = sorted(range(2, self.max_row + 1), key=sort_key)
+        fixed = [row for row in self.rows if not 2 <= row.num <= self.max_row]
+        moved = {}
+        for new_num, old_num in enumerate(order, start=2):
+            row = self._rows_by_num.get(old_num)
+            if row is not None:
+                row.num = new_num
+                moved[new_num] = row
+        self.rows = fixed + [moved[num] for num in sorted(moved)]
+        self._rows_by_num = {row.num: row for row in self.rows}
+        self._move_row_refs({old_num: new_num for new_num, old_num in enumerate(order, start=2)})
+
+    def _move_row_refs(self, new_rows):
+        # 시트 뒷부분(sheetData 이후)의 병합 범위/하이퍼링크 위치를 옮긴 행 번호로
+        def replace(match):
+            ref = _get_attr(match.group(2), 'ref')
+            found = _RANGE_REF_RE.match(ref or '')
+            if found is None:
+                return match.group(0)
+            first_col, first_row, last_col, last_row = found.groups()
+            if last_row is not None and last_row != first_row:
+                return match.group(0)
+            new_num = new_rows.get(int(first_row))
+            if new_num is None:
+                return match.group(0)
+            new_ref = f'{first_col}{new_num}' + (f':{last_col}{new_num}' if last_col else '')
+            return f'<{match.group(1)}{_set_attr(match.group(2), "ref", new_ref)}{match.group(3)}'
+
+        self.tail = re.sub(rf'<((?:\w+:)?(?:mergeCell|hyperlink)\b){_ATTRS}(/?>)', replace, self.tail)
+
+    def update_dimension(self):
+        """dimension 범위를 셀이 있는 행/열 범위로 (openpyxl의 calculate_dimension과 같은 범위)"""
+        rows = [row for row in self.rows if row.cells]
+        if rows:
+            first = f'{get_column_letter(min(row.cells[0].col for row in rows))}{min(row.num for row in rows)}'
+            last = f'{get_column_letter(max(row.cells[-1].col for row in rows))}{max(row.num for row in rows)}'
+            ref = first if first == last else f'{first}:{last}'
+        else:
+            ref = 'A1'
+        self.head = re.sub(
+            rf'<((?:\w+:)?dimension\b){_ATTRS}(/?>)',
+            lambda m: f'<{m.group(1)}{_set_attr(m.group(2), "ref", ref)}{m.group(3)}', self.head, count=1
+        )
+
+    def to_xml(self, drop_spans=False):
+        p = self.prefix
+        parts = [self.head]
+        for row in sorted(self.rows, key=lambda r: r.num):
+            row_attrs = _set_attr(row.attrs, 'r', str(row.num))
+            if drop_spans:
+                row_attrs = _set_attr(row_attrs, 'spans', None)
+            if not row.cells:
+                parts.append(f'<{p}row{row_attrs}/>')
+                continue
+            parts.append(f'<{p}row{row_attrs}>')
+            for cell in row.cells:
+                attrs = _set_attr(cell.attrs, 'r', f'{get_column_letter(cell.col)}{row.num}')
+                if cell.inner is None:
+                    parts.append(f'<{p}c{attrs}/>')
+                else:
+                    parts.append(f'<{p}c{attrs}>{cell.inner}</{p}c>')
+            parts.append(f'</{p}row>')
+        parts.append(self.tail)
+        return ''.join(parts)
+
+
+def patch_xlsx(file_content, sort_by=None, invoice_map=None, target_cols=None, keyword_cols=None,
+               append_contents=(), key_columns=()):
+    """활성 시트를 XML 수준에서 수정한 xlsx bytes 반환
+
+    append_contents: 같은 양식 xlsx들. 활성 시트 행을 헤더 이름 기준으로 끝에 추가
+    key_columns: append_contents 행 중 이 컬럼 값이 이미 있는 행은 추가하지 않음
+    sort_by: 이 헤더 컬럼 값 기준으로 2행부터 정렬
+    invoice_map: {주문번호: 운송장번호} 또는 InvoiceStore. 지정하면 운송장번호 컬럼을 채우거나 맨 끝에 추가
+    target_cols/keyword_cols: 텍스트(@) 서식을 적용할 컬럼 (이름 일치 / 키워드 포함)
+    sort_by 또는 주문번호 컬럼이 없으면 None.
+    """
+    package = _XlsxPackage(file_content)
+    sheet = _Sheet(package)
+    for content in append_contents:
+        sheet.append_rows(_Sheet(_XlsxPackage(content)), key_columns)
+    header = sheet.header()
+    # 텍스트 서식 컬럼은 운송장번호 컬럼을 추가하기 전 헤더 기준
+    text_cols = _text_format_columns(header, target_cols=target_cols, keyword_cols=keyword_cols)
+    appended_column = False
+
+    if sort_by is not None:
+        if sort_by not in header:
+            return None
+        sheet.sort_rows(header.index(sort_by) + 1)
+        package.drop_calc_chain()
+
+    if invoice_map is not None:
+        if '주문번호' not in header:
+            return None
+        order_col = header.index('주문번호') + 1
+        if '운송장번호' in header:
+            invoice_col = header.index('운송장번호') + 1
+        else:
+            # 없으면 맨 끝에 추가
+            invoice_col = sheet.max_col + 1
+            sheet.set_string(1, invoice_col, '운송장번호')
+            sheet.max_col = invoice_col
+            appended_column = True
+
+        rows = [(row_num, sheet.row(row_num)) for row_num in range(2, sheet.max_row + 1)]
+        order_nos = [normalize_excel_id(sheet.value(row.cell(order_col)) if row else None) for _, row in rows]
+        # InvoiceStore면 주문번호를 모아 한 번에 조회 (행마다 쿼리하지 않도록)
+        found = invoice_map.lookup(order_nos) if hasattr(invoice_map, 'lookup') else invoice_map
+        for (row_num, row), order_no in zip(rows, order_nos):
+            invoice = found.get(order_no, '')
+            if invoice or (row is not None and row.cell(invoice_col) is not None):
+                # 숫자를 텍스트로 저장하여 E 표기 방지
+                sheet.set_string(row_num, invoice_col, invoice, text_format=bool(invoice))
+
+    for col in sorted(text_cols):
+        for row_num in range(2, sheet.max_row + 1):
+            sheet.set_text_format(row_num, col)
+
+    resized = appended_column or bool(append_contents)
+    sheet.update_dimension()
+    package.parts[package.sheet_path] = sheet.to_xml(drop_spans=resized)
+    return package.save()
@@ -0,0 +1,69 @@
+"""단계별 결과 캐시 테스트"""
+import pandas as pd
+
+from benchmarks.fixtures import make_market_files
+from delivery_helper import cache, ingest
+from delivery_helper.cache import ResultCache, cache_key, clear_result_cache
+from delivery_helper.pipeline import build_order_file
+
+
+def test_cache_key_depends_on_stage_and_content():
+    df = pd.DataFrame({'주문번호': ['1', '2'], '수량': [1, 2]})
+    assert cache_key('order_file', df) == cache_key('order_file', df.copy())
+    assert cache_key('order_file', df) != cache_key('order_mgmt', df)
+    assert cache_key('order_file', df) != cache_key('order_file', df.assign(수량=[1, 3]))
+    assert cache_key('order_file', df) != cache_key('order_file', df.rename(columns={'수량': '개수'}))
+    # 나누는 위치가 달라도 같은 바이트가 되지 않도록 길이도 해시
+    assert cache_key('s', b'ab', b'c') != cache_key('s', b'a', b'bc')
+
+def test_get_returns_copy():
+    store = ResultCache(max_entries=4, ttl=60, directory=None)
+    store.put('k', (pd.DataFrame({'a': [1]}), 'file'))
+    first, _ = store.get('k')
+    first.loc[0, 'a'] = 99
+    assert store.get('k')[0].loc[0, 'a'] == 1
+
+def test_lru_size_and_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'time', lambda: now[0])
+    store = ResultCache(max_entries=2, ttl=60, directory=None)
+    store.put('a', 1)
+    store.put('b', 2)
+    assert store.get('a') == 1
+    store.put('c', 3)
+    # 가장 오래 쓰지 않은 b가 밀려남
+    assert (store.get('a'), store.get('b'), store.get('c')) == (1, None, 3)
+    now[0] += 61
+    assert store.get('a') is None
+
+def test_directory_cache_survives_new_instance(tmp_path):
+    store = ResultCache(max_entries=2, ttl=60, directory=tmp_path / 'cache')
+    for key in ('a', 'b', 'c'):
+        store.put(key, {'value': key})
+    assert len(list((tmp_path / 'cache').glob('*.pkl'))) == 2
+    reopened = ResultCache(max_entries=2, ttl=60, directory=tmp_path / 'cache')
+    assert reopened.get('c') == {'value': 'c'}
+    assert reopened.get('a') is None
+    reopened.clear()
+    assert list((tmp_path / 'cache').glob('*.pkl')) == []
+
+def test_unchanged_files_are_not_parsed_again(monkeypatch):
+    clear_result_cache()
+    files, _ = make_market_files(20, 'csv', seed=4)
+    calls = []
+    read_order_table = ingest.read_order_table
+    monkeypatch.setattr(ingest, 'read_order_table', lambda *args: calls.append(args[0]) or read_order_table(*args))
+    first = build_order_file(files, workers=1)
+    assert len(calls) == len(files)
+
+    # 파일 하나만 바뀌면 그 파일만 다시 파싱하고 결과는 처음부터 만든 것과 같음
+    changed = files[:-1] + [(files[-1][0], files[-1][1].replace(b'010-', b'011-'))]
+    assert changed[-1][1] != files[-1][1]
+    calls.clear()
+    second = build_order_file(changed, workers=1)
+    assert calls == [files[-1][0]]
+    clear_result_cache()
+    fresh = build_order_file(changed, workers=1)
+    pd.testing.assert_frame_equal(second['order_df'], fresh['order_df'])
+    assert not second['order_df'].equals(first['order_df'])
+    clear_result_cache()
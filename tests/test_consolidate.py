@@ -0,0 +1,151 @@
+"""그룹 연산으로 바꾼 주문 통합을 이전 그룹별 반복 방식과 비교하는 테스트"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.fixtures import make_cj_files, make_market_files
+from delivery_helper import polars_engine
+from delivery_helper.config import CHANNEL_ORDER
+from delivery_helper.consolidate import consolidate, consolidate_order_mgmt, consolidate_orders, get_sort_priority
+from delivery_helper.markets import process_data, read_order_table, to_order_mgmt_frame
+from delivery_helper.pipeline import build_invoice_map
+
+ORDER_ROWS = [
+    # 고객주문번호, 받는분성명, 받는분전화번호, 받는분주소, 배송메세지, 품목, 수량, 내부정렬키, 마켓순서
+    ('1001', '김철수', '010-1111-2222', '서울시 강남구', '', 'PH', 1, 'PH', 2),
+    ('1002', '김철수', '010-1111-2222', '서울시 강남구', '문 앞', 'OH', 2, 'OH', 2),
+    ('1003', '김철수', '010-1111-2222', '서울시 강남구', '경비실', 'PH', 2, 'PH', 1),
+    ('2001', '이영희', '010-3333-4444', '부산시 해운대구', '', 'SH_Re', 1, 'SH_Re', 1),
+    ('2002', '이영희', '010-3333-4444', '부산시 해운대구', '', 'IH_Re', 3, 'IH_Re', 1),
+    ('2003', '이영희', '010-3333-4444', '부산시 해운대구', '', '기타 상품 A', 1, '기타', 1),
+    ('3001', np.nan, '010-5555-6666', '대구시 중구', '', 'OH', 1, 'OH', 3),
+    ('4001', '박민수', '010-7777-8888', '인천시 남동구', '', np.nan, 1, 'b', 3),
+    ('4002', '박민수', '010-7777-8888', '인천시 남동구', '부재 시 연락', 'oh', 0, 'a', 3),
+    ('5001', '최지우', '010-9999-0000', '광주시 북구', '', 'OH_Re', 1, 'OH_Re', 1),
+]
+ORDER_COLUMNS = ['고객주문번호', '받는분성명', '받는분전화번호', '받는분주소', '배송메세지', '품목', '수량',
+                 '내부정렬키', '마켓순서']
+MGMT_ROWS = [
+    # 채널, 주문번호, 상품명, 수량
+    ('쿠팡', '1001', 'PH', 1),
+    ('쿠팡', '1001', 'OH', 2),
+    ('쿠팡', '1001', 'PH', 2),
+    ('스마트스토어', '1001', 'SH_Re', 1),
+    ('스마트스토어', '2001', '기타 상품', 1),
+    ('스마트스토어', '2001', 'IH_Re', 3),
+    ('자사몰', '3001', 'OH', 1),
+    ('자사몰', '3001', 'OH', np.nan),
+    ('자사몰', '3002', 'PH_Re', 1),
+]
+TODAY = '2026.02.10'
+
+
+def _old_consolidate_orders(full_df):
+    # 받는분 그룹마다 consolidate()를 호출하던 이전 방식
+    final_data = [
+        consolidate(group)
+        for _, group in full_df.groupby(['받는분성명', '받는분전화번호', '받는분주소'], sort=False)
+    ]
+    return pd.DataFrame(final_data).sort_values(by=['마켓순서', '최종정렬키'])
+
+def _old_consolidate_order_mgmt(mgmt_df):
+    # (채널, 주문번호) 그룹마다 행을 돌며 제품별 수량을 모으던 이전 방식
+    consolidated_list = []
+    for (channel, order_no), group in mgmt_df.groupby(['채널', '주문번호']):
+        prod_counts = {}
+        for _, row in group.iterrows():
+            prod_counts[row['상품명']] = prod_counts.get(row['상품명'], 0) + row['수량']
+        sorted_prods = sorted(prod_counts.items(), key=lambda x: get_sort_priority(x[0]))
+        formatted = [f"{prod} {int(qty)}개" if qty > 1 else str(prod) for prod, qty in sorted_prods]
+        first_prod = sorted_prods[0][0] if sorted_prods else ''
+        first = group.iloc[0]
+        consolidated_list.append({
+            '날짜': first['날짜'],
+            '채널': channel,
+            '주문번호': order_no,
+            '상품명': ", ".join(formatted),
+            '수량': int(group['수량'].sum()),
+            '주문인': first['주문인'],
+            '수취인': first['수취인'],
+            '전화번호': first['전화번호'],
+            '주소': first['주소'],
+            '비고': first['비고'],
+            '송장번호': first['송장번호'],
+            '마켓순서': CHANNEL_ORDER.get(channel, 99),
+            '상품순서': get_sort_priority(first_prod)[0]
+        })
+    consolidated = pd.DataFrame(consolidated_list).sort_values(by=['마켓순서', '상품순서'])
+    return consolidated.drop(columns=['마켓순서', '상품순서'])
+
+def _market_order_df(fmt):
+    files, _ = make_market_files(60, fmt, seed=3)
+    return pd.concat([process_data(name, content) for name, content in files], ignore_index=True)
+
+def _market_mgmt_df(fmt):
+    files, frames = make_market_files(60, fmt, seed=3)
+    table = pd.concat([read_order_table(name, content)['table'] for name, content in files], ignore_index=True)
+    return to_order_mgmt_frame(table, TODAY, build_invoice_map(make_cj_files(frames, fmt, seed=3)))
+
+
+@pytest.mark.parametrize('fmt', ['xlsx', 'csv'])
+def test_consolidate_orders_matches_group_loop_on_market_files(fmt):
+    order_df = _market_order_df(fmt)
+    expected = _old_consolidate_orders(order_df)
+    pd.testing.assert_frame_equal(
+        consolidate_orders(order_df), expected, check_dtype=False, check_index_type=False
+    )
+
+def test_consolidate_orders_matches_group_loop_on_edge_rows():
+    # 받는분 이름이 빈 행은 제외, 품목이 빈 행은 수량만 합산, 비어 있지 않은 첫 배송메세지 사용
+    order_df = pd.DataFrame(ORDER_ROWS, columns=ORDER_COLUMNS)
+    result = consolidate_orders(order_df)
+    pd.testing.assert_frame_equal(
+        result, _old_consolidate_orders(order_df), check_dtype=False, check_index_type=False
+    )
+    first = result[result['받는분성명'] == '김철수'].iloc[0]
+    assert first['품목명'] == 'OH 2개, PH 3개'
+    assert first['배송메세지'] == '문 앞'
+    assert first['기타1'] == 5
+
+@pytest.mark.parametrize('fmt', ['xlsx', 'csv'])
+def test_consolidate_order_mgmt_matches_group_loop_on_market_files(fmt):
+    mgmt_df = _market_mgmt_df(fmt)
+    pd.testing.assert_frame_equal(
+        consolidate_order_mgmt(mgmt_df).astype(object), _old_consolidate_order_mgmt(mgmt_df).astype(object),
+        check_index_type=False
+    )
+
+def test_consolidate_order_mgmt_matches_group_loop_on_edge_rows():
+    # 같은 제품은 수량 합산, 빈 수량이 섞인 제품은 수량 없이 표시, 채널 → 첫 제품 순위 순 정렬
+    mgmt_df = pd.DataFrame([
+        {'날짜': TODAY, '채널': channel, '주문번호': order_no, '상품명': product, '수량': quantity,
+         '주문인': '홍길동', '수취인': f'수취인{order_no}', '전화번호': '010-1234-5678', '주소': '서울시',
+         '비고': '', '송장번호': ''}
+        for channel, order_no, product, quantity in MGMT_ROWS
+    ])
+    result = consolidate_order_mgmt(mgmt_df)
+    pd.testing.assert_frame_equal(
+        result.astype(object), _old_consolidate_order_mgmt(mgmt_df).astype(object), check_index_type=False
+    )
+    assert result.loc[result['채널'] == '쿠팡', '상품명'].item() == 'OH 2개, PH 3개'
+
+@pytest.mark.skipif(not polars_engine.is_available(), reason='polars 미설치')
+@pytest.mark.parametrize('fmt', ['xlsx', 'csv'])
+def test_polars_engine_matches_pandas(fmt):
+    order_df = _market_order_df(fmt)
+    mgmt_df = _market_mgmt_df(fmt)
+    # 수량이 정수여야 Polars 경로를 탄다 (아니면 pandas로 넘김)
+    assert polars_engine._is_supported(order_df) and polars_engine._is_supported(mgmt_df)
+    pd.testing.assert_frame_equal(
+        polars_engine.consolidate_orders(order_df).astype(object), consolidate_orders(order_df).astype(object)
+    )
+    pd.testing.assert_frame_equal(
+        polars_engine.consolidate_order_mgmt(mgmt_df).astype(object), consolidate_order_mgmt(mgmt_df).astype(object)
+    )
+
+@pytest.mark.skipif(not polars_engine.is_available(), reason='polars 미설치')
+def test_polars_engine_matches_pandas_on_edge_rows():
+    order_df = pd.DataFrame(ORDER_ROWS, columns=ORDER_COLUMNS)
+    pd.testing.assert_frame_equal(
+        polars_engine.consolidate_orders(order_df).astype(object), consolidate_orders(order_df).astype(object)
+    )
@@ -0,0 +1,95 @@
+"""백그라운드 작업 실행 테스트"""
+import threading
+import time
+
+import pytest
+
+from benchmarks.fixtures import MARKET_FILE_NAMES, make_market_files
+from delivery_helper.cache import ResultCache, clear_result_cache
+from delivery_helper.config import CHANNEL_NAMES
+from delivery_helper.jobs import JobRunner
+from delivery_helper.pipeline import build_order_file
+from delivery_helper.timing import StageTimer
+
+
+def _wait(job, timeout=30):
+    deadline = time.time() + timeout
+    while not job.finished or job.finished_at is None:
+        assert time.time() < deadline, f"작업이 끝나지 않음: {job.status}"
+        time.sleep(0.01)
+    return job
+
+
+@pytest.fixture
+def runner():
+    return JobRunner(workers=2, artifacts=ResultCache(max_entries=8, ttl=60, directory=None))
+
+
+def test_submit_runs_in_worker_and_reuses_result(runner):
+    release = threading.Event()
+    calls = []
+
+    def work(job):
+        calls.append(threading.current_thread().name)
+        job.progress('a.xlsx', stage='파싱 중', market='쿠팡')
+        job.set_stage('consolidate')
+        release.wait(10)
+        job.progress('a.xlsx', stage='완료', rows=3)
+        job.report('⚠️ 경고')
+        return {'count': 3}
+
+    job = runner.submit('key-1', work, label='발주 파일')
+    # 실행 중에 같은 입력으로 다시 제출하면 같은 작업
+    assert runner.submit('key-1', work) is job
+    assert not job.finished
+    release.set()
+    _wait(job)
+
+    assert job.status == 'done' and job.result == {'count': 3}
+    assert calls and calls[0].startswith('delivery-job')
+    assert job.stage_label != '대기'
+    assert job.messages() == ['⚠️ 경고']
+    assert job.file_table().to_dict('records') == [{'파일': 'a.xlsx', '마켓': '쿠팡', '행 수': 3, '상태': '완료'}]
+    assert runner.get(job.id) is job
+
+    # 끝난 입력은 저장된 결과로 바로 끝난 작업 (다시 실행하지 않음)
+    restored = runner.submit('key-1', work)
+    assert restored is not job and restored.restored and restored.finished
+    assert restored.result == {'count': 3} and restored.messages() == ['⚠️ 경고']
+    assert len(calls) == 1
+
+def test_failed_job_keeps_error_and_is_not_stored(runner):
+    def fail(job):
+        raise ValueError("읽을 수 없는 파일")
+
+    job = _wait(runner.submit('key-2', fail))
+    assert job.status == 'failed'
+    assert job.error == "읽을 수 없는 파일"
+    assert job.result is None
+    # 실패한 결과는 저장하지 않으므로 다시 제출하면 다시 실행
+    retry = runner.submit('key-2', lambda job: 'ok')
+    assert not retry.restored
+    assert _wait(retry).result == 'ok'
+
+def test_clear_drops_finished_jobs_and_results(runner):
+    job = _wait(runner.submit('key-3', lambda job: 1))
+    runner.clear()
+    assert runner.get(job.id) is None
+    assert not runner.submit('key-3', lambda job: 2).restored
+
+def test_pipeline_job_reports_file_progress(runner):
+    clear_result_cache()
+    files, _ = make_market_files(20, 'csv', seed=6)
+
+    def work(job):
+        return build_order_file(files, workers=1, on_error=job.report, timer=StageTimer(on_stage=job.set_stage),
+                                progress=job.progress)
+
+    job = _wait(runner.submit('key-4', work))
+    assert job.status == 'done'
+    assert job.result['order_count'] > 0
+    table = job.file_table()
+    assert list(table['파일']) == [name for name, _ in files]
+    assert list(table['마켓']) == [CHANNEL_NAMES[market] for market in MARKET_FILE_NAMES]
+    assert table['행 수'].min() > 0
+    clear_result_cache()
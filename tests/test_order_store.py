@@ -0,0 +1,126 @@
+"""발주 기록 라인 키 / 중복 제외 테스트"""
+import io
+
+import pandas as pd
+import pytest
+
+from delivery_helper.markets import read_order_table
+from delivery_helper.order_store import OrderStore, order_line_keys
+from delivery_helper.pipeline import build_order_file
+
+DAY = '2026-02-10'
+
+
+def _own_mall_file(lines, name='orders_20260210.csv'):
+    """자사몰 주문 파일 (lines: [(주문번호, 상품명, 옵션, 수량)])"""
+    df = pd.DataFrame([
+        {'주문번호': order_no, '주문자': '홍길동', '수령인': '홍길동', '핸드폰': '010-1234-5678',
+         '주소': '서울시 강남구', '비고': '', '주문상품명': product, '옵션': option, '수량': quantity}
+        for order_no, product, option, quantity in lines
+    ])
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    return name, buffer.getvalue().encode('utf-8-sig')
+
+def _table(lines):
+    return read_order_table(*_own_mall_file(lines))['table']
+
+def _ingest(store, lines):
+    new_table, skipped = store.ingest([_table(lines)], DAY)
+    options = new_table['옵션'].astype(object).fillna('')
+    return list(zip(new_table['주문번호'], new_table['상품명_원문'], options, new_table['수량'])), skipped
+
+
+@pytest.fixture
+def store():
+    with OrderStore(':memory:') as order_store:
+        yield order_store
+
+
+def test_keys_ignore_line_order():
+    morning = _table([('A1', 'OH', '', 1), ('A1', 'PH', '', 2)])
+    afternoon = _table([('A1', 'PH', '', 2), ('A1', 'OH', '', 1)])
+    assert set(order_line_keys(morning)) == set(order_line_keys(afternoon))
+
+def test_reordered_order_is_not_dispatched_twice(store):
+    _ingest(store, [('A1', 'OH', '', 1), ('A1', 'PH', '', 2)])
+    new_lines, skipped = _ingest(store, [('A1', 'PH', '', 2), ('A1', 'OH', '', 1)])
+    assert new_lines == []
+    assert skipped == 2
+
+def test_line_added_to_order_is_dispatched(store):
+    _ingest(store, [('A1', 'OH', '', 1), ('A1', 'PH', '', 2)])
+    # 오후 파일: 같은 주문에 라인이 앞쪽에 추가되고 새 주문도 생김
+    new_lines, skipped = _ingest(store, [
+        ('A1', 'SH', '', 1), ('A1', 'OH', '', 1), ('A1', 'PH', '', 2), ('B1', 'OH', '', 3),
+    ])
+    assert new_lines == [('A1', 'SH', '', 1), ('B1', 'OH', '', 3)]
+    assert skipped == 2
+
+def test_identical_lines_are_counted(store):
+    _ingest(store, [('A1', 'OH', '', 1), ('A1', 'OH', '', 1)])
+    new_lines, skipped = _ingest(store, [('A1', 'OH', '', 1), ('A1', 'OH', '', 1), ('A1', 'OH', '', 1)])
+    assert new_lines == [('A1', 'OH', '', 1)]
+    assert skipped == 2
+
+def test_option_distinguishes_lines(store):
+    _ingest(store, [('A1', 'OH', '블랙', 1)])
+    # 같은 내용 라인은 수량 순으로 짝지음 (블랙 1개는 이미 발주, 블랙 2개는 새 라인)
+    new_lines, skipped = _ingest(store, [('A1', 'OH', '화이트', 1), ('A1', 'OH', '블랙', 2), ('A1', 'OH', '블랙', 1)])
+    assert new_lines == [('A1', 'OH', '화이트', 1), ('A1', 'OH', '블랙', 2)]
+    assert skipped == 1
+
+def test_quantity_change_is_reported_not_dispatched(store):
+    _ingest(store, [('A1', 'OH', '', 1), ('B1', 'PH', '', 2)])
+    batch = store.pending_batch([_table([('A1', 'OH', '', 2), ('B1', 'PH', '', 2)])], DAY)
+    assert batch['keys'] == []
+    assert batch['skipped'] == 2
+    changes = batch['quantity_changes']
+    assert list(zip(changes['주문번호'], changes['상품명'], changes['발주 수량'], changes['현재 수량'])) == [
+        ('A1', 'OH', '1', '2'),
+    ]
+
+def test_day_table_keeps_dispatch_order(store):
+    _ingest(store, [('A1', 'OH', '', 1)])
+    _ingest(store, [('B1', 'PH', '', 2), ('A1', 'OH', '', 1)])
+    day_table = store.day_table(DAY)
+    assert list(zip(day_table['주문번호'], day_table['상품명_원문'])) == [('A1', 'OH'), ('B1', 'PH')]
+
+def test_day_table_reads_lines_recorded_before_option_column(store):
+    _ingest(store, [('A1', 'OH', '', 1)])
+    # 옵션 컬럼이 생기기 전 형식 (마지막 값 없음)
+    store._conn.execute("UPDATE order_lines SET data = json_remove(data, '$[#-1]')")
+    day_table = store.day_table(DAY)
+    assert list(day_table['주문번호']) == ['A1']
+    assert day_table['옵션'].isna().all()
+
+def test_build_order_file_does_not_record(store):
+    morning = _own_mall_file([('A1', 'OH', '', 1), ('B1', 'PH', '', 2)])
+    result = build_order_file([morning], order_store=store, day=DAY, workers=1)
+    assert len(result['pending_batch']['keys']) == 2
+    assert len(store) == 0
+    # 확정하지 않았으면 다시 만들어도 같은 주문이 들어감
+    again = build_order_file([morning], order_store=store, day=DAY, workers=1)
+    assert len(again['pending_batch']['keys']) == 2
+    assert again['order_file'] is not None
+
+    store.record(again['pending_batch'])
+    assert len(store) == 2
+    assert build_order_file([morning], order_store=store, day=DAY, workers=1)['order_file'] is None
+
+def test_record_skips_lines_confirmed_in_between(store):
+    batch = store.pending_batch([_table([('A1', 'OH', '', 1), ('B1', 'PH', '', 2)])], DAY)
+    store.ingest([_table([('A1', 'OH', '', 1)])], DAY)
+    store.record(batch)
+    assert len(store) == 2
+    assert [(line_count, skipped) for _, _, line_count, skipped, _ in store.batches(DAY)] == [(1, 0), (1, 1)]
+
+def test_undo_batch(store):
+    _ingest(store, [('A1', 'OH', '', 1)])
+    _ingest(store, [('A1', 'OH', '', 1), ('B1', 'PH', '', 2)])
+    batch_ids = [batch[0] for batch in store.batches(DAY)]
+    assert store.undo_batch(batch_ids[-1]) == 1
+    assert [batch[0] for batch in store.batches(DAY)] == batch_ids[:1]
+    new_lines, skipped = _ingest(store, [('A1', 'OH', '', 1), ('B1', 'PH', '', 2)])
+    assert new_lines == [('B1', 'PH', '', 2)]
+    assert skipped == 1
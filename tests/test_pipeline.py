@@ -0,0 +1,42 @@
+"""발주 파일 / 주문관리시트 파이프라인 테스트"""
+import pandas as pd
+import pytest
+
+from benchmarks.fixtures import make_cj_files, make_market_files
+from delivery_helper import ingest
+from delivery_helper.cache import clear_result_cache
+from delivery_helper.pipeline import build_order_file, build_order_management
+from delivery_helper.reader import clear_upload_cache
+
+TODAY = '2026.02.10'
+
+
+@pytest.fixture(autouse=True)
+def _fresh_caches():
+    clear_result_cache()
+    clear_upload_cache()
+    yield
+    clear_result_cache()
+    clear_upload_cache()
+
+
+@pytest.mark.parametrize('fmt', ['xlsx', 'csv'])
+def test_order_management_reuses_order_table(fmt, monkeypatch):
+    files, frames = make_market_files(40, fmt, seed=5)
+    cj_files = make_cj_files(frames, fmt, seed=5)
+    order_result = build_order_file(files, workers=1)
+    order_table = order_result['order_table']
+    # 두 결과 모두 같은 정규화 주문 테이블의 주문 라인을 빠짐없이 사용
+    assert order_result['order_df']['기타1'].sum() == order_table['수량'].sum()
+
+    fresh = build_order_management(files, cj_files, today_str=TODAY, workers=1)
+    clear_result_cache()
+    calls = []
+    read_order_table = ingest.read_order_table
+    monkeypatch.setattr(ingest, 'read_order_table', lambda *args: calls.append(args[0]) or read_order_table(*args))
+    reused = build_order_management(files, cj_files, today_str=TODAY, workers=1, order_table=order_table)
+
+    assert calls == []
+    pd.testing.assert_frame_equal(reused['consolidated'], fresh['consolidated'])
+    assert reused['consolidated']['수량'].sum() == order_table['수량'].sum()
+    assert set(reused['consolidated']['주문번호']) == set(order_table['주문번호'])
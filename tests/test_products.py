@@ -0,0 +1,71 @@
+"""상품명 분류 테스트 (키워드를 하나씩 찾던 이전 방식과 비교)"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from delivery_helper.products import classify_items, code_to_item, codes_to_items, identify_product, identify_products
+
+NAMES = [
+    "[정품] 스마트 OH 헤드", "ph 리퍼제품", "SH_Re 교체형", "IH 리퍼", "oh_re", "Ph-re 세트",
+    "충전 케이블 1m", "스위치 케이블", "케이블s 세트", "케이블S 스위치", "케이블SH", "휴대폰 거치대", "거치대",
+    "차량번호판 가드", "번호판", "차량용망치", "망치", "도막 측정기", "측정기", "리퍼 케이블", "기타 상품", "",
+    "SHIH 복합", 1234, None, np.nan,
+]
+
+
+def _old_identify_product(name):
+    # 키워드마다 상품명을 다시 검사하던 이전 방식
+    name_str = str(name)
+    name_upper = name_str.upper()
+    name_lower = name_str.lower()
+    is_refurb = '_RE' in name_upper or '리퍼' in name_str
+    for code in ('IH', 'OH', 'PH', 'SH'):
+        if code in name_upper:
+            return f"{code}_Re" if is_refurb else code
+    if '케이블s' in name_lower:
+        return '케이블s'
+    if '케이블' in name_str:
+        return '케이블s' if '스위치' in name_str else '케이블(일반)'
+    if '거치대' in name_str or '휴대폰' in name_str:
+        return '휴대폰거치대'
+    if '번호판' in name_str or '차량번호' in name_str:
+        return '차량번호판'
+    if '망치' in name_str:
+        return '차량용망치'
+    if '도막' in name_str or '측정기' in name_str:
+        return '도막측정기'
+    return name
+
+
+@pytest.mark.parametrize('name', NAMES, ids=repr)
+def test_identify_product_matches_keyword_scan(name):
+    expected = _old_identify_product(name)
+    result = identify_product(name)
+    assert result == expected or (pd.isna(result) and pd.isna(expected))
+    # 캐시된 결과도 같음
+    assert identify_product(name) is result
+
+def test_identify_products_classifies_each_row():
+    names = pd.Series(NAMES * 3, index=range(100, 100 + len(NAMES) * 3))
+    result = identify_products(names)
+    assert list(result.index) == list(names.index)
+    expected = [_old_identify_product(name) for name in names]
+    assert [None if pd.isna(value) else value for value in result] == \
+        [None if pd.isna(value) else value for value in expected]
+    assert isinstance(identify_products(np.array(NAMES[:3], dtype=object)), np.ndarray)
+
+def test_classify_items_prefers_product_codes():
+    names = pd.Series(["OH 헤드", "기타 상품", "스위치 케이블", "PH 리퍼"])
+    codes = pd.Series(["sh-re", "PH", "케이블", None])
+    assert classify_items(names, codes).tolist() == ['SH_Re', 'PH', '케이블s', 'PH_Re']
+
+def test_classify_items_matches_row_by_row_lookup():
+    codes = ['PH', 'sh_re', 'oh re', 'IH-RE', 'PH_Re2', ' oh ', '', None, np.nan, 12, 'SH']
+    names = pd.Series((NAMES * 2)[:len(codes)], index=range(50, 50 + len(codes)))
+    codes = pd.Series(codes, index=names.index)
+    assert codes_to_items(codes).tolist() == [code_to_item(code) for code in codes]
+    expected = [code_to_item(code) or identify_product(name) for code, name in zip(codes, names)]
+    result = classify_items(names, codes)
+    assert [None if pd.isna(value) else value for value in result] == \
+        [None if pd.isna(value) else value for value in expected]
+    assert list(result.index) == list(names.index)
@@ -0,0 +1,153 @@
+"""업로드 파일 읽기 테스트"""
+import pandas as pd
+import pytest
+from pandas.io.parsers import TextParser
+
+from benchmarks.fixtures import BANNER_ROWS, FORMATS, MARKET_FILE_NAMES, make_cj_files, make_market_files, write_frame
+from delivery_helper import reader
+from delivery_helper.cache import clear_result_cache
+from delivery_helper.config import CHANNEL_NAMES, HEADER_SCAN_ROWS
+from delivery_helper.markets import detect_market, read_market_frame
+from delivery_helper.naver import _read_naver_order_df
+from delivery_helper.pipeline import build_order_file, build_order_management
+from delivery_helper.reader import _clean_rows, _read_upload_rows, _rows_to_frame, _to_grid, read_upload_head
+
+GRIDS = {
+    'typed': [
+        ['주문번호', '수량', '금액', '메모', '주문번호'],
+        ['1001', 2, 1500.5, '', 'a'],
+        [1002, '3', '', 'TRUE', 'b'],
+        ['', '', '', '', ''],
+        ['1003', 1, '#N/A', '  ', None],
+    ],
+    'banner': [
+        ['주문 목록'],
+        [],
+        ['주문번호', '', '상품명'],
+        ['A-1', 'x', '사과'],
+        ['A-2', '', '배', '추가'],
+        [],
+    ],
+    'single_column': [
+        ['주문 목록'],
+        [],
+        ['주문번호'],
+        ['1001'],
+        ['  '],
+        [],
+        ['1002'],
+    ],
+    'header_only': [
+        ['주문번호', '상품명'],
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_upload_cache():
+    reader.clear_upload_cache()
+    yield
+    reader.clear_upload_cache()
+
+
+def _old_frame(rows, skiprows):
+    # 전체 그리드를 만들어 TextParser로 읽던 이전 방식
+    return TextParser(_to_grid(rows), header=0, skiprows=skiprows).read()
+
+
+@pytest.mark.parametrize('name', GRIDS)
+@pytest.mark.parametrize('skiprows', [0, 2])
+def test_excel_rows_match_grid_textparser(name, skiprows):
+    rows = GRIDS[name]
+    if skiprows >= len(rows):
+        pytest.skip('헤더 행 없음')
+    expected = _old_frame(rows, skiprows)
+    # 헤더보다 오른쪽에 있는 값 없는 컬럼(그리드 너비를 맞추느라 생긴 것)은 만들지 않음
+    header_width = len(next(_clean_rows([rows[skiprows]])))
+    expected = expected.loc[:, [
+        position < header_width or expected[column].notna().any()
+        for position, column in enumerate(expected.columns)
+    ]]
+    frame = _rows_to_frame(_clean_rows(rows), skiprows, is_csv=False)
+    pd.testing.assert_frame_equal(frame, expected)
+
+def test_csv_rows_skip_blank_lines_and_keep_wide_rows():
+    rows = [['주문번호', '수량'], ['1001', '2'], [], ['1002', '', '비고'], ['', '']]
+    frame = _rows_to_frame(iter(rows), 0, is_csv=True)
+    assert list(frame.columns) == ['주문번호', '수량', 'Unnamed: 2']
+    assert frame['주문번호'].tolist()[:2] == [1001, 1002]
+    assert len(frame) == 3
+    assert frame['Unnamed: 2'].tolist()[1] == '비고'
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_detect_market_and_header_row(fmt):
+    files, frames = make_market_files(30, fmt, seed=1)
+    for (file_name, content), market in zip(files, MARKET_FILE_NAMES):
+        market_key, config = detect_market(file_name, content)
+        assert (market_key, config['skip']) == (market, BANNER_ROWS.get(market, 0))
+        df = read_market_frame(file_name, content, market_key, config, strip_columns=True)
+        assert list(df.columns) == list(frames[market].columns)
+        assert len(df) == len(frames[market])
+
+        # 파일명으로 알 수 없으면 앞부분 헤더 시그니처로 감지
+        market_key, config = detect_market(f"upload.{fmt}", content)
+        assert CHANNEL_NAMES[market_key] == CHANNEL_NAMES[market]
+        assert config['skip'] == BANNER_ROWS.get(market, 0)
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_detect_shifted_header_row(fmt):
+    _, frames = make_market_files(10, fmt, seed=1, markets=['own'])
+    content = write_frame(frames['own'], fmt, banner_rows=3)
+    market_key, config = detect_market(f"orders_20260210.{fmt}", content)
+    assert (market_key, config['skip']) == ('own', 3)
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_read_upload_head_matches_full_read(fmt, monkeypatch):
+    # xlsx 앞부분은 시트 XML을 직접 읽으므로 같은 값을 내는 기본 엔진(openpyxl)과 비교
+    monkeypatch.setattr(reader, 'READER_ENGINE', 'default')
+    files, _ = make_market_files(40, fmt, seed=1)
+    for file_name, content in files:
+        head = read_upload_head(file_content=content, file_name=file_name, max_rows=HEADER_SCAN_ROWS)
+        assert head == _read_upload_rows(content, file_name)[:HEADER_SCAN_ROWS]
+
+def test_xls_is_read_once_for_detection_and_frames(monkeypatch):
+    files, _ = make_market_files(30, 'xls', seed=1, markets=['naver'])
+    file_name, content = files[0]
+    calls = []
+    excel_value_rows = reader._excel_value_rows
+    monkeypatch.setattr(reader, '_excel_value_rows', lambda *args: calls.append(args) or excel_value_rows(*args))
+    market_key, config = detect_market(file_name, content)
+    read_market_frame(file_name, content, market_key, config)
+    # 네이버 발송 파일을 만들 때 다시 감지하고 읽어도 캐시 사용
+    assert _read_naver_order_df(content, file_name) is not None
+    assert len(calls) == 1
+
+def _blank_spaces(grid):
+    # calamine은 xml:space 없이 저장된 공백뿐인 문자열을 빈 값으로 읽음
+    return [["" if isinstance(value, str) and not value.strip() else value for value in row] for row in grid]
+
+@pytest.mark.skipif(reader.CalamineWorkbook is None, reason='python-calamine 미설치')
+@pytest.mark.parametrize('fmt', ['xlsx', 'xls'])
+def test_calamine_matches_default_engine(fmt, monkeypatch):
+    files, frames = make_market_files(60, fmt, seed=2)
+    cj_files = make_cj_files(frames, fmt, seed=2)
+    results = {}
+    for engine in ('calamine', 'default'):
+        monkeypatch.setattr(reader, 'READER_ENGINE', engine)
+        assert reader.excel_engine() == engine
+        reader.clear_upload_cache()
+        clear_result_cache()
+        grids = [_blank_spaces(reader._read_excel_rows(content)) for _, content in files + cj_files]
+        order_result = build_order_file(files, workers=1)
+        mgmt_result = build_order_management(files, cj_files, today_str='2026.02.10', workers=1,
+                                             order_table=order_result['order_table'])
+        results[engine] = grids, order_result['order_df'], mgmt_result['consolidated']
+    clear_result_cache()
+
+    (calamine_grids, *calamine_frames), (default_grids, *default_frames) = results['calamine'], results['default']
+    for calamine_grid, default_grid in zip(calamine_grids, default_grids):
+        assert [[type(value) for value in row] for row in calamine_grid] == \
+            [[type(value) for value in row] for row in default_grid]
+        assert calamine_grid == default_grid
+    for calamine_frame, default_frame in zip(calamine_frames, default_frames):
+        pd.testing.assert_frame_equal(calamine_frame, default_frame)
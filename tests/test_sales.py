@@ -0,0 +1,106 @@
+"""붙여넣기 판매 집계 테스트 (줄 단위로 파싱하던 이전 방식 / 증분 갱신과 비교)"""
+import re
+
+import pandas as pd
+import pytest
+
+from benchmarks.fixtures import make_paste_text
+from delivery_helper.products import identify_product
+from delivery_helper.sales import PasteAggregator, _split_paste_line, parse_pasted_sales
+
+MIXED_TEXT = """상품명\t수량
+OH\t2
+PH, SH\t3
+  OH\t2
+케이블s 1개
+휴대폰 거치대,1
+ph_re 리퍼\t0
+OH, PH, SH, IH\t2
+수량 없음
+도막 측정기\t1,000
+OH\t2
+"""
+
+
+def _old_parse_pasted_sales(text, normalize=True):
+    # 줄마다 파싱하던 이전 방식
+    lines = [l.strip() for l in text.splitlines() if l.strip()]
+    if not lines:
+        return pd.DataFrame(columns=['상품명', '수량']), 0
+    name_idx = qty_idx = None
+    for idx, col in enumerate(_split_paste_line(lines[0])):
+        if any(k in col for k in ['상품', '품목']):
+            name_idx = idx
+        if '수량' in col:
+            qty_idx = idx
+    start_idx = 1 if name_idx is not None and qty_idx is not None else 0
+    parsed = []
+    for line in lines[start_idx:]:
+        cols = _split_paste_line(line)
+        name = qty_str = ""
+        if name_idx is not None and qty_idx is not None and len(cols) > max(name_idx, qty_idx):
+            name, qty_str = cols[name_idx], cols[qty_idx]
+        elif len(cols) >= 2:
+            name = cols[0]
+            qty_str = next((c for c in cols[1:] if re.search(r'\d', c)), "")
+        else:
+            match = re.search(r'(\d+)\s*$', line)
+            if match:
+                qty_str, name = match.group(1), line[:match.start()].strip()
+        qty_val = int(re.sub(r'[^0-9]', '', qty_str) or 0)
+        name_parts = [n.strip() for n in name.split(',') if n.strip()]
+        if not name_parts or qty_val <= 0:
+            continue
+        base_qty, remainder = divmod(qty_val, len(name_parts))
+        for idx, part in enumerate(name_parts):
+            part_qty = base_qty + (1 if idx < remainder else 0)
+            if part_qty > 0:
+                parsed.append({'상품명': identify_product(part) if normalize else part, '수량': part_qty})
+    if not parsed:
+        return pd.DataFrame(columns=['상품명', '수량']), 0
+    summary = pd.DataFrame(parsed).groupby('상품명')['수량'].sum().reset_index()
+    return summary, int(summary['수량'].sum())
+
+def _assert_same(result, expected):
+    pd.testing.assert_frame_equal(result[0], expected[0], check_dtype=False, check_index_type=False)
+    assert result[1] == expected[1]
+
+
+@pytest.mark.parametrize('normalize', [True, False])
+@pytest.mark.parametrize('text', [
+    MIXED_TEXT, MIXED_TEXT.split('\n', 1)[1], make_paste_text(300, seed=1), "", "\n  \n", "OH\t0",
+], ids=['mixed', 'no_header', 'fixture', 'empty', 'blank', 'zero'])
+def test_parse_pasted_sales_matches_line_by_line(text, normalize):
+    _assert_same(parse_pasted_sales(text, normalize=normalize), _old_parse_pasted_sales(text, normalize))
+
+def test_incremental_updates_match_full_parse():
+    base = make_paste_text(200, seed=2)
+    lines = base.split('\n')
+    edits = [
+        base,
+        base + "\nOH\t3",                            # 한 줄 추가
+        base + "\nOH\t3\nOH\t3",                     # 같은 줄 한 번 더
+        "\n".join(lines[:50] + lines[80:]),           # 중간 줄 삭제
+        "\n".join(lines[:1] + ["PH, SH\t5"] + lines[1:]),
+        base,                                         # 원래 입력으로 되돌리기
+        "품목,수량\n" + "\n".join(line.replace('\t', ',') for line in lines[1:]),  # 헤더/구분자 변경
+        "\n".join(lines[1:]),                         # 헤더 삭제
+        "",
+        base,
+    ]
+    aggregator = PasteAggregator()
+    for text in edits:
+        for normalize in (True, False):
+            _assert_same(aggregator.update(text, normalize=normalize), parse_pasted_sales(text, normalize=normalize))
+
+def test_incremental_update_parses_only_changed_lines():
+    base = make_paste_text(500, seed=3)
+    aggregator = PasteAggregator()
+    aggregator.update(base)
+    aggregator.update(base + "\n새 상품\t1")
+    assert aggregator.changed_lines == 1
+    summary, _ = aggregator.update(base + "\n새 상품\t1")
+    assert aggregator.changed_lines == 0
+    # 반환한 결과를 고쳐도 다음 결과는 그대로
+    summary.loc[0, '수량'] = -1
+    _assert_same(aggregator.update(base + "\n새 상품\t1"), parse_pasted_sales(base + "\n새 상품\t1"))
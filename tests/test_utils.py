@@ -0,0 +1,28 @@
+"""컬럼 단위 정규화 헬퍼를 행 단위 헬퍼와 비교하는 테스트"""
+import numpy as np
+import pandas as pd
+
+from delivery_helper.utils import clean_phone, clean_phones, coalesce_messages, get_message
+
+PHONES = ['010-1234-5678', '010 1234 5678', 1012345678, 1012345678.0, '+82)10.1234.5678', '', None, np.nan]
+
+
+def test_clean_phones_matches_clean_phone():
+    values = pd.Series(PHONES, index=range(10, 10 + len(PHONES)))
+    assert clean_phones(values).tolist() == [clean_phone(phone) for phone in PHONES]
+    assert list(clean_phones(values).index) == list(values.index)
+
+def test_clean_phones_on_numeric_column():
+    values = pd.Series([1012345678, 1099998888])
+    assert clean_phones(values).tolist() == [clean_phone(phone) for phone in values]
+
+def test_coalesce_messages_matches_get_message():
+    df = pd.DataFrame({
+        '배송메세지': ['문 앞', '  ', np.nan, '', 123, None],
+        '비고': ['경비실', ' 부재 시 연락 ', '택배함', np.nan, 'x', None],
+    }, index=[5, 3, 1, 0, 2, 4])
+    cols = ['배송시 요구사항', '배송메세지', '비고']
+    expected = [get_message(row, cols) for _, row in df.iterrows()]
+    result = coalesce_messages(df, cols)
+    assert result.tolist() == expected
+    assert list(result.index) == list(df.index)
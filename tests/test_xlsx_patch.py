@@ -0,0 +1,306 @@
+"""xlsx_patch 결과를 openpyxl로 통째로 고치던 이전 방식과 비교하는 테스트"""
+import io
+import re
+import zipfile
+from xml.etree import ElementTree
+
+import openpyxl
+import pytest
+from openpyxl.styles import Font
+
+from delivery_helper.config import PHONE_KEYWORDS
+from delivery_helper.excel import add_invoice_to_coupang, sort_xlsx_preserving_format
+from delivery_helper.invoices import InvoiceStore
+from delivery_helper.utils import normalize_excel_id
+
+MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+HEADER = ['주문번호', '업체상품코드', '수취인명', '수취인연락처1', '수량', '합계']
+ROWS = [
+    ['1002', 'P-30', '김철수', '010-1111-2222', 2],
+    [1001, 'P-10', '이영희', 1033334444, 1],
+    ['1003', 9, '박민수', '010-5555-6666', 3],
+    ['1004', 'P-20', '  최지우 ', None, 4],
+]
+INVOICES = {'1001': '640012345678', '1003': '640099999999'}
+
+
+def _workbook(title='Sheet'):
+    """헤더 굵게, 합계는 수식, 업체상품코드 P-10 행은 빨간 굵은 글씨"""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = title
+    ws.append(HEADER)
+    for cell in ws[1]:
+        cell.font = Font(bold=True)
+    for row_idx, row in enumerate(ROWS, start=2):
+        ws.append(row + [f'=E{row_idx}*2'])
+        ws.cell(row=row_idx, column=5).number_format = '0.00'
+        if row[1] == 'P-10':
+            for cell in ws[row_idx]:
+                cell.font = Font(bold=True, color='FF0000')
+    output = io.BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+def _rewrite(content, path, func, added=None):
+    """path 파트를 func로 고친 xlsx (added: 새로 넣을 {경로: 내용})"""
+    source = zipfile.ZipFile(io.BytesIO(content))
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w') as out:
+        for info in source.infolist():
+            data = source.read(info)
+            if info.filename == path:
+                data = func(data.decode('utf-8')).encode('utf-8')
+            out.writestr(info, data)
+        for name, data in (added or {}).items():
+            out.writestr(name, data)
+    return output.getvalue()
+
+def _rewrite_sheet(content, func, added=None):
+    return _rewrite(content, 'xl/worksheets/sheet1.xml', func, added)
+
+def _unprefixed(root):
+    # ElementTree는 접두사 없는 속성이 있으면 기본 네임스페이스로 쓰지 못하므로 접두사를 지운다
+    xml = ElementTree.tostring(root, encoding='unicode')
+    prefix = re.search(rf'xmlns:(\w+)="{MAIN_NS}"', xml).group(1)
+    return re.sub(rf'(</?){prefix}:', r'\1', xml).replace(f'xmlns:{prefix}=', 'xmlns=')
+
+def _shared_strings(content):
+    # openpyxl이 쓰는 인라인 문자열 셀을 공유 문자열 셀로 (엑셀이 저장한 파일과 같은 형태)
+    strings = []
+
+    def convert(xml):
+        root = ElementTree.fromstring(xml)
+        for cell in root.iter(f'{{{MAIN_NS}}}c'):
+            if cell.get('t') != 'inlineStr':
+                continue
+            inline = cell.find(f'{{{MAIN_NS}}}is')
+            text = ''.join(t.text or '' for t in inline.iter(f'{{{MAIN_NS}}}t'))
+            cell.remove(inline)
+            cell.set('t', 's')
+            if text not in strings:
+                strings.append(text)
+            ElementTree.SubElement(cell, f'{{{MAIN_NS}}}v').text = str(strings.index(text))
+        return _unprefixed(root)
+
+    content = _rewrite_sheet(content, convert)
+    sst = ElementTree.Element(f'{{{MAIN_NS}}}sst', count=str(len(strings)), uniqueCount=str(len(strings)))
+    for text in strings:
+        item = ElementTree.SubElement(ElementTree.SubElement(sst, f'{{{MAIN_NS}}}si'), f'{{{MAIN_NS}}}t')
+        item.text = text
+        if text != text.strip():
+            item.set('{http://www.w3.org/XML/1998/namespace}space', 'preserve')
+    content = _rewrite(content, 'xl/_rels/workbook.xml.rels', lambda xml: xml.replace('</Relationships>', (
+        '<Relationship Id="rIdSst" Target="sharedStrings.xml" Type="http://schemas.openxmlformats.org/'
+        'officeDocument/2006/relationships/sharedStrings"/></Relationships>'
+    )), added={'xl/sharedStrings.xml': _unprefixed(sst)})
+    return _rewrite(content, '[Content_Types].xml', lambda xml: xml.replace('</Types>', (
+        '<Override PartName="/xl/sharedStrings.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/></Types>'
+    )))
+
+def _prefixed(content):
+    # 기본 네임스페이스 대신 접두사(s: 등)를 쓰는 시트
+    return _rewrite_sheet(content, lambda xml: ElementTree.tostring(ElementTree.fromstring(xml), encoding='unicode'))
+
+def _empty_rows(content):
+    # 끝에 셀 없는 행 (<row/>, <row></row>), 3행에 값 없이 서식만 있는 셀 (<c/>) 추가
+    def add_rows(xml):
+        xml = re.sub(r'(<row r="3".*?)</row>', r'\1<c r="G3" s="1"/></row>', xml, count=1)
+        return xml.replace('</sheetData>', '<row r="6"/><row r="7" spans="1:6"></row></sheetData>')
+    return _rewrite_sheet(content, add_rows)
+
+def _shared_formulas(content):
+    # 합계 열을 공유 수식 하나로
+    def share(xml):
+        xml = xml.replace('<f>E2*2</f>', '<f t="shared" ref="F2:F5" si="0">E2*2</f>')
+        return re.sub(r'<f>E[3-5]\*2</f>', '<f t="shared" si="0"/>', xml)
+    return _rewrite_sheet(content, share)
+
+def _sheet_name_with_gt(content):
+    # 속성 값 안의 '>' (시트 이름에 쓸 수 있는 문자)
+    return _rewrite(content, 'xl/workbook.xml', lambda xml: xml.replace('&gt;', '>'))
+
+
+def _old_sort(content, target_col_name, keyword_cols=None):
+    """openpyxl로 정렬하던 이전 sort_xlsx_preserving_format + 텍스트 서식"""
+    wb = openpyxl.load_workbook(io.BytesIO(content))
+    ws = wb.active
+    header = [cell.value for cell in ws[1]]
+    col_idx = header.index(target_col_name)
+    rows = list(ws.iter_rows(min_row=2, values_only=False))
+    rows.sort(key=lambda x: str(x[col_idx].value) if x[col_idx].value is not None else "")
+    data_styles = [[(cell.value, cell._style) for cell in row] for row in rows]
+    ws.delete_rows(2, ws.max_row)
+    for r_idx, row_data in enumerate(data_styles, start=2):
+        for c_idx, (val, style) in enumerate(row_data, start=1):
+            cell = ws.cell(row=r_idx, column=c_idx, value=val)
+            if style:
+                cell._style = style
+    _old_text_format(ws, header, keyword_cols)
+    output = io.BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+def _old_text_format(ws, header, keyword_cols):
+    for col_idx, name in enumerate(header, start=1):
+        if not any(keyword in str(name or '') for keyword in keyword_cols or []):
+            continue
+        for row_idx in range(2, ws.max_row + 1):
+            cell = ws.cell(row=row_idx, column=col_idx)
+            if cell.value is not None:
+                cell.value = str(cell.value)
+            cell.number_format = '@'
+
+def _old_add_invoice(content, invoice_map):
+    """openpyxl로 운송장번호를 채우던 이전 add_invoice_to_coupang"""
+    wb = openpyxl.load_workbook(io.BytesIO(content))
+    ws = wb.active
+    header = [cell.value for cell in ws[1]]
+    order_col_idx = header.index('주문번호') + 1
+    if '운송장번호' in header:
+        invoice_col_idx = header.index('운송장번호') + 1
+    else:
+        invoice_col_idx = len(header) + 1
+        ws.cell(row=1, column=invoice_col_idx, value='운송장번호')
+    for row_idx in range(2, ws.max_row + 1):
+        invoice = invoice_map.get(normalize_excel_id(ws.cell(row=row_idx, column=order_col_idx).value), '')
+        cell = ws.cell(row=row_idx, column=invoice_col_idx)
+        cell.value = invoice
+        if invoice:
+            cell.number_format = '@'
+    _old_text_format(ws, header, PHONE_KEYWORDS)
+    output = io.BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def _cells(content):
+    """다시 읽은 활성 시트의 {좌표: (값, 표시 형식, 굵게, 글자색)} (기본 서식의 빈 셀 제외)"""
+    ws = openpyxl.load_workbook(io.BytesIO(content)).active
+    cells = {}
+    for row in ws.iter_rows():
+        for cell in row:
+            color = cell.font.color.rgb if cell.font.color is not None and cell.font.color.type == 'rgb' else None
+            info = (cell.value, cell.number_format, bool(cell.font.b), color)
+            if info[1:] != ('General', False, None) or (cell.value is not None and cell.value != ''):
+                cells[cell.coordinate] = info
+    return ws.title, cells
+
+VARIANTS = {
+    'inline_strings': lambda content: content,
+    'shared_strings': _shared_strings,
+    'prefixed': _prefixed,
+    'empty_rows': _empty_rows,
+    'shared_formulas': _shared_formulas,
+    'attribute_gt': _sheet_name_with_gt,
+}
+
+
+@pytest.mark.parametrize('variant', VARIANTS)
+def test_sort_matches_openpyxl(variant):
+    title = '배송>목록' if variant == 'attribute_gt' else 'Sheet'
+    content = VARIANTS[variant](_workbook(title))
+    patched = sort_xlsx_preserving_format(content, '업체상품코드', keyword_cols=PHONE_KEYWORDS)
+    assert patched is not None
+    assert _cells(patched) == _cells(_old_sort(content, '업체상품코드', PHONE_KEYWORDS))
+
+@pytest.mark.parametrize('variant', VARIANTS)
+def test_add_invoice_matches_openpyxl(variant):
+    title = '배송>목록' if variant == 'attribute_gt' else 'Sheet'
+    content = VARIANTS[variant](_workbook(title))
+    patched = add_invoice_to_coupang(content, 'DeliveryList.xlsx', INVOICES)
+    assert patched is not None
+    assert _cells(patched) == _cells(_old_add_invoice(content, INVOICES))
+
+def test_add_invoice_looks_up_store_once(monkeypatch):
+    store = InvoiceStore(':memory:')
+    store._conn.executemany(
+        "INSERT INTO invoices VALUES (?, ?, 'cj.xlsx', 'hash')", list(INVOICES.items())
+    )
+    calls = []
+    lookup = store.lookup
+    monkeypatch.setattr(store, 'lookup', lambda order_nos: calls.append(order_nos) or lookup(order_nos))
+    monkeypatch.setattr(store, 'get', None)
+    content = _workbook()
+    patched = add_invoice_to_coupang(content, 'DeliveryList.xlsx', store)
+    assert len(calls) == 1
+    assert _cells(patched) == _cells(_old_add_invoice(content, INVOICES))
+
+def test_sort_keeps_formula_of_each_row():
+    patched = sort_xlsx_preserving_format(_shared_formulas(_workbook()), '업체상품코드')
+    ws = openpyxl.load_workbook(io.BytesIO(patched)).active
+    # 공유 수식은 풀어서 각 행이 원래 수식을 그대로 가진다
+    assert [(row[1].value, row[5].value) for row in ws.iter_rows(min_row=2)] == [
+        (9, '=E4*2'), ('P-10', '=E3*2'), ('P-20', '=E5*2'), ('P-30', '=E2*2'),
+    ]
+    assert 'shared' not in zipfile.ZipFile(io.BytesIO(patched)).read('xl/worksheets/sheet1.xml').decode()
+
+def test_sort_moves_merged_cells_and_updates_dimension():
+    wb = openpyxl.load_workbook(io.BytesIO(_workbook()))
+    ws = wb.active
+    ws.merge_cells('G1:H1')
+    ws.merge_cells('C4:D4')  # 박민수 행 (업체상품코드 9 → 정렬 후 2행)
+    ws['G1'] = '메모'
+    output = io.BytesIO()
+    wb.save(output)
+
+    patched = sort_xlsx_preserving_format(output.getvalue(), '업체상품코드')
+    ws = openpyxl.load_workbook(io.BytesIO(patched)).active
+    assert sorted(str(merged) for merged in ws.merged_cells.ranges) == ['C2:D2', 'G1:H1']
+    assert ws['C2'].value == '박민수'
+    assert ws.dimensions == 'A1:H5'
+
+def test_trailing_empty_rows_are_not_sorted_to_the_top():
+    patched = sort_xlsx_preserving_format(_empty_rows(_workbook()), '업체상품코드')
+    ws = openpyxl.load_workbook(io.BytesIO(patched)).active
+    assert [ws.cell(row=row, column=2).value for row in range(2, 6)] == [9, 'P-10', 'P-20', 'P-30']
+    assert ws.max_row == 5
+
+
+def _plain_workbook(header, rows):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(header)
+    for row in rows:
+        ws.append(row)
+    output = io.BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+def _merged_rows(content):
+    ws = openpyxl.load_workbook(io.BytesIO(content)).active
+    header = [cell.value for cell in ws[1]]
+    return [dict(zip(header, row)) for row in ws.iter_rows(min_row=2, values_only=True)]
+
+def test_merge_skips_lines_already_in_earlier_files():
+    header = HEADER[:5]
+    morning = _plain_workbook(header, [['1001', 'P-10', '이영희', '010-3333-4444', 1], ['1005', 'P-50', '정우성', None, 1]])
+    evening = _plain_workbook(header, [
+        ['1005', 'P-50', '정우성', None, 1], ['1006', 'P-60', '한가인', None, 2], ['1006', 'P-60', '한가인', None, 2],
+    ])
+    merged = add_invoice_to_coupang(_workbook(), 'DeliveryList.xlsx', INVOICES,
+                                    extra_files=[('morning.xlsx', morning), ('evening.xlsx', evening)])
+    # 1001은 첫 파일 행(숫자 주문번호), 1005는 앞 파일에 있던 행이라 한 번만. 한 파일 안의 같은 라인 두 개는 유지
+    assert [str(row['주문번호']) for row in _merged_rows(merged)] == [
+        '1002', '1001', '1003', '1004', '1005', '1006', '1006',
+    ]
+
+def test_merge_maps_columns_styles_and_formulas_by_header():
+    header = ['합계', '수량', '수취인연락처1', '메모', '수취인명', '업체상품코드', '주문번호']
+    later = _plain_workbook(header, [['=B2*2', 5, '010-7777-8888', '문 앞', '강동원', 'P-70', '1007']])
+    # 엑셀이 저장한 파일처럼 수식 셀에 계산 값 저장
+    later = _rewrite_sheet(later, lambda xml: xml.replace('<f>B2*2</f><v />', '<f>B2*2</f><v>10</v>'))
+    merged = add_invoice_to_coupang(_workbook(), 'DeliveryList.xlsx', INVOICES, extra_files=[('later.xlsx', later)])
+
+    ws = openpyxl.load_workbook(io.BytesIO(merged)).active
+    assert [cell.value for cell in ws[1]] == HEADER + ['메모', '운송장번호']
+    assert _merged_rows(merged)[-1] == {
+        '주문번호': '1007', '업체상품코드': 'P-70', '수취인명': '강동원', '수취인연락처1': '010-7777-8888',
+        '수량': 5, '합계': 10, '메모': '문 앞', '운송장번호': None,
+    }
+    # 추가 행 서식은 첫 파일 2행에서 헤더 이름이 같은 컬럼 서식
+    assert [ws.cell(row=6, column=col).number_format for col in range(1, 7)] == \
+        [ws.cell(row=2, column=col).number_format for col in range(1, 7)]
+    assert ws['E6'].number_format == '0.00'
+    assert ws['D6'].number_format == '@'